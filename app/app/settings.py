@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'django_extensions',
@@ -50,7 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,17 +86,89 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# core.db.backends.postgresql adds CONN_HEALTH_CHECKS and an optional
+# in-process connection POOL. With the pool enabled, set DB_CONN_MAX_AGE
+# to 0 so connections go back to the pool at the end of each request.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'NAME': os.environ.get('DB_NAME', 'django'),
         'USER': os.environ.get('DB_USER', 'postgres'),
         'PASSWORD': os.environ.get('DB_PASSWORD', 'postgres'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+        ),
+        'POOL': {
+            'ENABLED': os.environ.get('DB_POOL', 'false').lower() == 'true',
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', '0')),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', '20')),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', '600')),
+        },
+    }
+}
+
+# Read replicas: DB_REPLICA_HOSTS is a comma-separated list of "host" or
+# "host:port" entries, each a copy of the default database. Safe requests
+# read from them (see core.middleware.ReplicaRoutingMiddleware); a client
+# that writes is pinned to the primary for STICKY_SECONDS, by a cookie and
+# by its credentials in CACHE_ALIAS, which must be shared across processes
+# (e.g. Redis).
+
+READ_REPLICAS = {
+    'ALIASES': [],
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5')),
+    'CACHE_ALIAS': 'default',
+}
+
+for index, replica in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))
+):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS['ALIASES'].append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/ref/settings/#caches
+# The default LocMemCache is private to each process. It is only correct
+# with a single worker: the organization list versions, replica pins and
+# token revocations kept here must be seen by every worker, so deploy
+# with more than one worker only with a shared backend, e.g.
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache or a
+# Redis backend and CACHE_LOCATION pointing at the server.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+# ALIAS must be shared between workers (see above): with a per-process
+# cache, a write bumps the owner's version only in the worker that handled
+# it, and the others keep serving the old lists for up to TTL seconds.
+
+ORGANIZATION_LIST_CACHE = {
+    'ALIAS': 'default',
+    'TTL': int(os.environ.get('ORGANIZATION_LIST_CACHE_TTL', '300')),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -126,6 +201,75 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Login throttling
+# Failed logins are limited per email and per client IP over a sliding
+# WINDOW (seconds); a failed email/password pair is rejected without
+# hashing for NEGATIVE_TTL seconds. Set REDIS_URL to share the state
+# between processes (requires the redis package). Behind a load balancer
+# set CLIENT_IP_HEADER (e.g. HTTP_X_FORWARDED_FOR) and TRUSTED_PROXIES,
+# or every client shares the proxy's IP limit; IP_LIMIT=0 disables it.
+
+LOGIN_THROTTLE = {
+    'EMAIL_LIMIT': int(os.environ.get('LOGIN_THROTTLE_EMAIL_LIMIT', '5')),
+    'IP_LIMIT': int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT', '50')),
+    'WINDOW': int(os.environ.get('LOGIN_THROTTLE_WINDOW', '300')),
+    'NEGATIVE_TTL': int(os.environ.get('LOGIN_THROTTLE_NEGATIVE_TTL', '60')),
+    'REDIS_URL': os.environ.get('LOGIN_THROTTLE_REDIS_URL', ''),
+    'CLIENT_IP_HEADER': os.environ.get('LOGIN_THROTTLE_CLIENT_IP_HEADER', ''),
+    'TRUSTED_PROXIES': int(os.environ.get('LOGIN_THROTTLE_TRUSTED_PROXIES', '1')),
+}
+
+
+# Password hashing
+# PASSWORD_HASHER_PROFILE picks the hasher used for new hashes. The other
+# hashers stay installed so existing hashes verify and get upgraded to the
+# current profile and parameters on the next successful login.
+
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+}
+
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+    if profile != PASSWORD_HASHER_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'PBKDF2_ITERATIONS': int(
+        os.environ.get('PASSWORD_PBKDF2_ITERATIONS', '260000')
+    ),
+    'ARGON2_TIME_COST': int(os.environ.get('PASSWORD_ARGON2_TIME_COST', '2')),
+    'ARGON2_MEMORY_COST': int(
+        os.environ.get('PASSWORD_ARGON2_MEMORY_COST', '102400')
+    ),
+    'ARGON2_PARALLELISM': int(
+        os.environ.get('PASSWORD_ARGON2_PARALLELISM', '8')
+    ),
+    'SCRYPT_WORK_FACTOR': int(
+        os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 14))
+    ),
+    'SCRYPT_BLOCK_SIZE': int(os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', '8')),
+    'SCRYPT_PARALLELISM': int(
+        os.environ.get('PASSWORD_SCRYPT_PARALLELISM', '1')
+    ),
+    # Hashing pool: 0 workers hashes inline in the request thread.
+    'MAX_WORKERS': int(
+        os.environ.get('PASSWORD_HASHING_MAX_WORKERS', str(os.cpu_count()))
+    ),
+    'MAX_PENDING': int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', '64')),
+    'TIMEOUT': float(os.environ.get('PASSWORD_HASHING_TIMEOUT', '10')),
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -154,4 +298,40 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+
+# Token authentication cache
+# SHARED_CACHE is an optional alias from CACHES used as a second tier
+# behind the in-process LRU. With it, revoked tokens and deactivated users
+# are rejected by every worker at once; without it, other workers accept
+# them until their LRU entry expires (up to TTL seconds).
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_MAX_SIZE', '10000')),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', '60')),
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE', ''),
+}
+
+# Request instrumentation (core.middleware.InstrumentationMiddleware)
+# Views may set `query_budget`; DEFAULT_QUERY_BUDGET applies to the rest.
+# QUERY_BUDGET_ACTION is 'log' or 'raise'; the test runner always raises.
+# /metrics is served to staff users and to scrapers sending METRICS_TOKEN
+# as a bearer token; with no token set only staff can read it.
+
+INSTRUMENTATION = {
+    'SERVER_TIMING': os.environ.get('SERVER_TIMING', 'true').lower() == 'true',
+    'DEFAULT_QUERY_BUDGET': None,
+    'QUERY_BUDGET_ACTION': os.environ.get('QUERY_BUDGET_ACTION', 'log'),
+    'METRICS_TOKEN': os.environ.get('METRICS_TOKEN', ''),
+}
+
+TEST_RUNNER = 'core.runner.TestRunner'
@@ -20,6 +20,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -39,5 +41,6 @@ urlpatterns = [
     path(
         'api/organizations/',
         include('organizations.urls')
-    )
+    ),
+    path('metrics', metrics_view, name='metrics'),
 ]
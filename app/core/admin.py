@@ -41,5 +41,18 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class OrganizationAdmin(admin.ModelAdmin):
+    """Define the admin pages for organizations, soft-deleted included"""
+    list_display = ['name', 'email', 'owner', 'is_active']
+    list_filter = ['is_active']
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Organization)
+admin.site.register(models.Organization, OrganizationAdmin)
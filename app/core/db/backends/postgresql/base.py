@@ -0,0 +1,170 @@
+"""
+PostgreSQL backend with connection health checks and optional pooling.
+
+Configured through extra keys of the DATABASES entry:
+
+- CONN_HEALTH_CHECKS: check a reused persistent connection with a cheap
+  query before its first use in each request, and reconnect if it died.
+- POOL: a dict with ENABLED, MIN_SIZE, MAX_SIZE, TIMEOUT and MAX_IDLE.
+  When enabled, connections are checked out of a per-process
+  `core.db.pool.ConnectionPool` and returned to it on close instead of
+  being torn down. Returned connections are rolled back and their
+  session state is cleared with DISCARD ALL, so settings, temporary
+  tables and prepared statements never leak into the next request.
+"""
+import psycopg2.extensions
+import psycopg2.extras
+from django.db.backends.postgresql import base
+
+from core.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+Database = base.Database
+
+
+def connect(conn_params):
+    """Open a psycopg2 connection set up like Django's backend does."""
+    connection = Database.connect(**conn_params)
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection, loads=lambda x: x,
+    )
+    return connection
+
+
+def check_connection(connection):
+    """Return whether `connection` still answers a trivial query."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except Database.Error:
+        return False
+    return True
+
+
+def reset_connection(connection):
+    """
+    Roll back and clear the session state; return whether it can be reused.
+
+    DISCARD ALL cannot run in a transaction block, so it runs in
+    autocommit mode. It also resets the session isolation level, which
+    psycopg2 sets on the server in autocommit mode, so that is applied
+    again for the connection's next user.
+    """
+    if connection.closed:
+        return False
+    try:
+        connection.rollback()
+        autocommit = connection.autocommit
+        isolation_level = connection.isolation_level
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('DISCARD ALL')
+        connection.autocommit = autocommit
+        connection.set_session(isolation_level=isolation_level)
+    except Database.Error:
+        return False
+    status = connection.get_transaction_status()
+    return status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL wrapper adding health checks and connection pooling."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.pool = None
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    @property
+    def pool_settings(self):
+        return self.settings_dict.get('POOL') or {}
+
+    def get_pool(self, conn_params):
+        """Return the pool for `conn_params`, or None if pooling is off."""
+        options = self.pool_settings
+        if not options.get('ENABLED'):
+            return None
+        key = (self.alias, tuple(sorted(conn_params.items())))
+
+        def create_pool():
+            pool = ConnectionPool(
+                lambda: connect(conn_params),
+                name=self.alias,
+                min_size=options.get('MIN_SIZE', 0),
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 30),
+                max_idle=options.get('MAX_IDLE', 600),
+            )
+            pool.fill()
+            return pool
+        return get_pool(key, create_pool)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        # Pooled connections may have died while idle; with health checks
+        # on, replace dead ones before handing one out.
+        for _ in range(pool.max_size + 1):
+            try:
+                connection = pool.getconn()
+            except PoolTimeout as exc:
+                raise Database.OperationalError(str(exc)) from exc
+            if not self.health_check_enabled or check_connection(connection):
+                break
+            pool.putconn(connection, discard=True)
+        else:
+            raise Database.OperationalError(
+                f'No usable connection in pool {pool.name!r}.'
+            )
+        self.pool = pool
+
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level,
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def connect(self):
+        super().connect()
+        # New and freshly checked out connections need no further check
+        # during this request.
+        self.health_check_done = True
+
+    def _close(self):
+        if self.pool is None:
+            return super()._close()
+        pool, self.pool = self.pool, None
+        # Closed inside an atomic block, Django keeps self.connection (and
+        # marks it closed_in_transaction) until the block exits, so it
+        # must not be handed to another thread: close it instead.
+        discard = self.in_atomic_block
+        with self.wrap_database_errors:
+            pool.putconn(
+                self.connection,
+                discard=discard or not reset_connection(self.connection),
+            )
+
+    def close_if_health_check_failed(self):
+        """Close the connection once per request if it stopped working."""
+        if self.connection is None or self.health_check_done:
+            return
+        if self.health_check_enabled and not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called at the start and end of every request.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
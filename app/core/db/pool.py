@@ -0,0 +1,171 @@
+"""
+In-process pool of database connections.
+"""
+import threading
+import time
+from collections import deque
+
+from core import metrics
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections with a size cap.
+
+    At most `max_size` connections are open at once; a checkout beyond
+    that waits up to `timeout` seconds for one to be returned. Idle
+    connections beyond `min_size` are closed once they have been idle for
+    `max_idle` seconds. Checkouts, waits and timeouts are counted in
+    `core.metrics` under the pool `name`.
+    """
+
+    def __init__(self, connect, name='default', min_size=0, max_size=10,
+                 timeout=30, max_idle=600):
+        self.connect = connect
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def fill(self):
+        """Open connections until `min_size` are idle or open."""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            self.putconn(conn)
+
+    def getconn(self):
+        """Check out a connection, opening one if the pool has room."""
+        with self._condition:
+            if self._closed:
+                raise PoolTimeout(f'Connection pool {self.name!r} is closed.')
+            if not self._idle and self._size >= self.max_size:
+                metrics.increment('db_pool_waits_total', pool=self.name)
+                deadline = time.monotonic() + self.timeout
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        metrics.increment(
+                            'db_pool_timeouts_total', pool=self.name,
+                        )
+                        raise PoolTimeout(
+                            f'No connection available in pool {self.name!r} '
+                            f'after {self.timeout}s.'
+                        )
+                    self._condition.wait(remaining)
+            metrics.increment('db_pool_checkouts_total', pool=self.name)
+            if self._idle:
+                conn, _ = self._idle.pop()
+                return conn
+            self._size += 1
+        return self._open()
+
+    def putconn(self, conn, discard=False):
+        """Return a checked out connection, or close it if `discard`."""
+        stale = []
+        with self._condition:
+            if discard or self._closed:
+                stale.append(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                stale += self._prune()
+            self._condition.notify()
+        for stale_conn in stale:
+            self._close(stale_conn)
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._condition:
+            self._closed = True
+            stale = [conn for conn, _ in self._idle]
+            self._size -= len(stale)
+            self._idle.clear()
+            self._condition.notify_all()
+        for conn in stale:
+            self._close(conn)
+
+    def stats(self):
+        """Return the number of open, idle and checked out connections."""
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+            }
+
+    def _open(self):
+        try:
+            return self.connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _prune(self):
+        """Drop connections idle for too long, oldest first; hold the lock."""
+        stale = []
+        cutoff = time.monotonic() - self.max_idle
+        while self._idle and self._size > self.min_size:
+            if self._idle[0][1] >= cutoff:
+                break
+            stale.append(self._idle.popleft()[0])
+            self._size -= 1
+        return stale
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """Return the pool registered under `key`, creating it with `factory`."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+    return pool
+
+
+def close_all():
+    """Close and forget every registered pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def stats():
+    """Return the summed stats of the registered pools by pool name."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    totals = {}
+    for pool in pools:
+        total = totals.setdefault(pool.name, dict.fromkeys(
+            ('size', 'idle', 'in_use'), 0,
+        ))
+        for key, value in pool.stats().items():
+            total[key] += value
+    return totals
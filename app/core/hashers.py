@@ -0,0 +1,134 @@
+"""
+Password hashers tuned from settings.
+
+The preferred hasher is chosen by `PASSWORD_HASHER_PROFILE`. Hashes made
+with other hashers or older parameters keep verifying and are upgraded
+the next time the user logs in.
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BasePasswordHasher,
+    PBKDF2PasswordHasher,
+    mask_hash,
+)
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count taken from settings."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHING['PBKDF2_ITERATIONS']
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with its cost parameters taken from settings."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHING['ARGON2_TIME_COST']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHING['ARGON2_MEMORY_COST']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHING['ARGON2_PARALLELISM']
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """
+    Scrypt hasher using the standard library.
+
+    The encoded format matches the scrypt hasher shipped with Django 4.0,
+    so hashes stay valid after a framework upgrade.
+    """
+    algorithm = 'scrypt'
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASHING['SCRYPT_WORK_FACTOR']
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_HASHING['SCRYPT_BLOCK_SIZE']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHING['SCRYPT_PARALLELISM']
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r,
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def decode(self, encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash_ = (
+            encoded.split('$', 6)
+        )
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(work_factor),
+            'salt': salt,
+            'block_size': int(block_size),
+            'parallelism': int(parallelism),
+            'hash': hash_,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password,
+            decoded['salt'],
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        current = (self.work_factor, self.block_size, self.parallelism)
+        stored = (
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return stored != current
+
+    def harden_runtime(self, password, encoded):
+        # The runtime of scrypt is governed by its parameters, which are
+        # all stored in the hash; there is nothing to pad.
+        pass
@@ -0,0 +1,100 @@
+"""
+Password hashing offloaded to a bounded worker pool.
+
+Hashing is CPU bound but the hashers used here release the GIL, so a
+small thread pool caps how many hashes run at once. A burst of logins
+then queues for a slot instead of occupying every request worker.
+Database work never runs on the pool.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolBusy(APIException):
+    """Raised when no hashing slot frees up within the timeout."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many concurrent password checks, retry later.')
+    default_code = 'hashing_pool_busy'
+
+
+class HashingPool:
+    """
+    Run hashing calls on at most `max_workers` threads.
+
+    At most `max_pending` further calls may wait for a worker; callers
+    beyond that block for up to `timeout` seconds and then get
+    HashingPoolBusy. With `max_workers` of 0 calls run inline.
+    """
+
+    def __init__(self, max_workers, max_pending, timeout):
+        self.timeout = timeout
+        self._executor = None
+        if max_workers:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='password-hashing',
+            )
+            self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def run(self, fn, *args):
+        """Call `fn(*args)` on the pool and return its result."""
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingPoolBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide hashing pool configured from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    max_workers=settings.PASSWORD_HASHING['MAX_WORKERS'],
+                    max_pending=settings.PASSWORD_HASHING['MAX_PENDING'],
+                    timeout=settings.PASSWORD_HASHING['TIMEOUT'],
+                )
+    return _pool
+
+
+def make_password(password):
+    """Hash `password` with the preferred hasher on the pool."""
+    return get_pool().run(hashers.make_password, password)
+
+
+def check_password(password, encoded):
+    """
+    Verify `password` against `encoded` on the pool.
+
+    Return a (valid, must_update) tuple; `must_update` is True when the
+    password is correct but the hash uses an outdated hasher or
+    parameters and should be replaced.
+    """
+    must_update = []
+    valid = get_pool().run(
+        hashers.check_password, password, encoded, must_update.append,
+    )
+    return valid, bool(must_update)
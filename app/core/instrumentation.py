@@ -0,0 +1,85 @@
+"""
+Per-request measurement of database, serializer and render time.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+
+class RequestStats:
+    """Query count and seconds spent per phase during one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = {'db': 0.0, 'serialize': 0.0, 'render': 0.0}
+        self._active = set()
+
+    def add(self, phase, seconds):
+        """Add `seconds` to `phase`."""
+        self.durations[phase] += seconds
+
+
+# Holds the RequestStats of the request being served, if any. Context
+# variables follow the request into sync_to_async threads.
+_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def get_stats():
+    """Return the RequestStats of the current request, or None."""
+    return _stats.get()
+
+
+@contextmanager
+def collect():
+    """Collect the stats of everything run inside the block."""
+    stats = RequestStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to `phase` of the current request.
+
+    Nested blocks of the same phase are counted once, so nested
+    serializers do not add up their children twice.
+    """
+    stats = _stats.get()
+    if stats is None or phase in stats._active:
+        yield
+        return
+    stats._active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(phase, time.perf_counter() - started)
+        stats._active.discard(phase)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries and DB time per request."""
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    stats.queries += 1
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Attach `record_query` to a newly opened database connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """Count the time spent in `to_representation` as serializer time."""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
@@ -0,0 +1,160 @@
+"""
+Command file
+Django command to load test HTTP endpoints
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, int(round(fraction * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; return (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection') != 'close'
+
+
+async def run_benchmark(url, total, concurrency, headers, timeout):
+    """Issue `total` GETs to `url` over `concurrency` keep-alive clients."""
+    parts = urlsplit(url)
+    host = parts.hostname
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    lines = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    lines += ['Connection: keep-alive', '', '']
+    request = '\r\n'.join(lines).encode('latin-1')
+
+    remaining = [total]
+    latencies = []
+    errors = [0]
+
+    async def client():
+        reader = writer = None
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(
+                        host, port, ssl=parts.scheme == 'https',
+                    )
+                writer.write(request)
+                status, keep_alive = await asyncio.wait_for(
+                    read_response(reader), timeout,
+                )
+            except (OSError, asyncio.TimeoutError, ValueError):
+                errors[0] += 1
+                keep_alive = False
+            else:
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors[0] += 1
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors[0],
+        'elapsed': elapsed,
+        'rps': total / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p90': percentile(latencies, 0.90),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django command to measure throughput and latency of HTTP endpoints.
+
+    Point it at the same endpoint served by different deployments, e.g.
+    `uvicorn app.asgi:application` and `gunicorn app.wsgi:application`,
+    to compare requests/sec and tail latency at a given concurrency.
+    """
+    help = 'Load test one or more URLs and report requests/sec and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URLs to GET.')
+        parser.add_argument(
+            '--requests', type=int, default=10000,
+            help='Requests to send per URL.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Number of concurrent keep-alive connections.',
+        )
+        parser.add_argument(
+            '--token', help='API token sent as "Authorization: Token ...".',
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='Per-request timeout in seconds.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f"Token {options['token']}"
+
+        for url in options['urls']:
+            result = asyncio.run(run_benchmark(
+                url,
+                options['requests'],
+                options['concurrency'],
+                headers,
+                options['timeout'],
+            ))
+            self.stdout.write(url)
+            self.stdout.write(
+                f"  requests: {result['requests']}  "
+                f"errors: {result['errors']}  "
+                f"elapsed: {result['elapsed']:.2f}s"
+            )
+            self.stdout.write(f"  requests/sec: {result['rps']:.1f}")
+            self.stdout.write(
+                '  latency ms: '
+                f"p50 {result['p50'] * 1000:.2f}  "
+                f"p90 {result['p90'] * 1000:.2f}  "
+                f"p99 {result['p99'] * 1000:.2f}  "
+                f"max {result['max'] * 1000:.2f}"
+            )
@@ -2,26 +2,120 @@
 Command file
 Django command to wait for DB to be available
 """
-
-from django.core.management.base import BaseCommand
+import random
 import time
-from psycopg2 import OperationalError as Psycopg2Error
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
-from django.db import connections  # noqa
+from psycopg2 import OperationalError as Psycopg2Error
+
+
+class NotReady(Exception):
+    """Raised when a database is reachable but not migrated."""
+
+
+def probe(alias, ready=False):
+    """
+    Open a connection to `alias` and run a trivial query.
+
+    With `ready`, also raise NotReady while migrations are unapplied.
+    The connection is closed afterwards so no attempt outlives its check.
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if ready:
+            executor = MigrationExecutor(connection)
+            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+            if plan:
+                raise NotReady(f'{len(plan)} unapplied migration(s)')
+    finally:
+        connection.close()
+
+
+def backoff(attempt, base, cap):
+    """Return a full-jitter exponential delay for the given attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
 
 
 class Command(BaseCommand):
-    """Django command to wait for the database to be available"""
+    """
+    Django command to wait for the databases to be available.
+
+    Each alias is probed in its own thread with a plain connection and
+    `SELECT 1`, backing off exponentially with jitter between attempts.
+    With `--ready` a database only counts once its migrations are applied,
+    which makes the command usable as a readiness probe. Exits non-zero
+    when `--timeout` passes first.
+    """
+    help = 'Wait until the databases accept connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Database alias to wait for; repeat for several. '
+                 'Defaults to "default".',
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Give up after this many seconds; 0 waits forever.',
+        )
+        parser.add_argument(
+            '--ready', action='store_true',
+            help='Also require every migration to be applied.',
+        )
+        parser.add_argument(
+            '--initial-delay', type=float, default=0.1,
+            help='Upper bound of the first retry delay in seconds.',
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=5,
+            help='Upper bound of any retry delay in seconds.',
+        )
 
     def handle(self, *args, **options):
         """Entrypoint for command"""
+        aliases = options['databases'] or ['default']
+        timeout = options['timeout']
+        deadline = time.monotonic() + timeout if timeout else None
         self.stdout.write("Waiting for database...")
-        db_up = False
-        while db_up is False:
-            try:
-                self.check(databases=['default'])
-                db_up = True
-            except (Psycopg2Error, OperationalError):
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+
+        def wait(alias):
+            attempt = 0
+            while True:
+                try:
+                    probe(alias, ready=options['ready'])
+                    return True
+                except (Psycopg2Error, OperationalError, NotReady) as exc:
+                    reason = str(exc).strip().partition('\n')[0] or (
+                        type(exc).__name__
+                    )
+                delay = backoff(
+                    attempt, options['initial_delay'], options['max_delay'],
+                )
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    delay = min(delay, remaining)
+                self.stdout.write(
+                    f"Database {alias!r} unavailable ({reason}), "
+                    f"retrying in {delay:.2f}s..."
+                )
+                time.sleep(delay)
+                attempt += 1
+
+        with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+            results = dict(zip(aliases, pool.map(wait, aliases)))
+
+        failed = [alias for alias, ok in results.items() if not ok]
+        if failed:
+            raise CommandError(
+                f"Database(s) {', '.join(failed)} not available "
+                f"after {timeout}s."
+            )
         self.stdout.write(self.style.SUCCESS("Database available!"))
@@ -0,0 +1,45 @@
+"""
+In-process metrics registry.
+"""
+import threading
+from collections import defaultdict
+
+
+class Registry:
+    """Thread-safe store of labelled counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def increment(self, name, value=1, **labels):
+        """Add `value` to the counter `name` with the given labels."""
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def get(self, name, **labels):
+        """Return the current value of a counter, 0 if never incremented."""
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def counters(self):
+        """Return a copy of every counter keyed by (name, labels)."""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        """Drop every counter."""
+        with self._lock:
+            self._counters.clear()
+
+
+registry = Registry()
+
+
+def increment(name, value=1, **labels):
+    """Increment a counter on the default registry."""
+    registry.increment(name, value, **labels)
@@ -0,0 +1,226 @@
+"""
+Middleware for the application.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from core import instrumentation, metrics
+from core.routers import get_replicas, routing
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve the ORM reads of safe requests from the read replicas.
+
+    A request that writes pins its client to the primary for
+    READ_REPLICAS['STICKY_SECONDS'], so the client's next reads see its
+    own writes despite replication lag. The pin is kept twice: under a
+    hash of the client's credentials (Authorization header or session
+    cookie) in the cache named by READ_REPLICAS['CACHE_ALIAS'], which
+    must be shared between processes, and in a short-lived cookie, which
+    also covers a write made before the client had credentials, such as
+    logging in. Client addresses are not used: behind a load balancer
+    they are shared by every client.
+
+    Works in both sync and async handler chains; under ASGI the cache
+    calls run in a worker thread so they never block the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+    pin_cookie = 'db_pinned'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Let the handler await this instance, as Django's
+            # MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not get_replicas():
+            return self.get_response(request)
+
+        keys = self.get_pin_keys(request)
+        with routing(self.use_replica(request, keys)) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            self.pin(request, response, keys)
+        return response
+
+    async def __acall__(self, request):
+        if not get_replicas():
+            return await self.get_response(request)
+
+        keys = self.get_pin_keys(request)
+        use_replica = await sync_to_async(
+            self.use_replica, thread_sensitive=False,
+        )(request, keys)
+        with routing(use_replica) as state:
+            response = await self.get_response(request)
+        if state.wrote:
+            await sync_to_async(self.pin, thread_sensitive=False)(
+                request, response, keys,
+            )
+        return response
+
+    def get_pin_keys(self, request):
+        """Return the cache keys identifying the client of `request`."""
+        credentials = request.META.get('HTTP_AUTHORIZATION') or (
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not credentials:
+            return []
+        digest = hashlib.sha256(f'auth:{credentials}'.encode()).hexdigest()
+        return [f'db-pin:{digest}']
+
+    def get_cache(self):
+        return caches[settings.READ_REPLICAS['CACHE_ALIAS']]
+
+    def use_replica(self, request, keys):
+        """Return whether the reads of `request` may go to a replica."""
+        if request.method not in self.safe_methods:
+            return False
+        if request.COOKIES.get(self.pin_cookie):
+            return False
+        return not (keys and self.get_cache().get_many(keys))
+
+    def pin(self, request, response, keys):
+        """Keep the client on the primary for the sticky window."""
+        seconds = settings.READ_REPLICAS['STICKY_SECONDS']
+        if keys:
+            self.get_cache().set_many(dict.fromkeys(keys, True), seconds)
+        response.set_cookie(
+            self.pin_cookie, '1', max_age=seconds, httponly=True,
+            secure=request.is_secure(), samesite='Lax',
+        )
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more queries than its view allows."""
+
+
+class InstrumentationMiddleware:
+    """
+    Measure the SQL queries, DB, serializer and render time of requests.
+
+    The numbers are returned in a Server-Timing header and accumulated in
+    `core.metrics` per URL name. A view may set `query_budget`, a number
+    or a dict keyed by viewset action; a request running more queries is
+    logged, or fails with QueryBudgetExceeded when
+    INSTRUMENTATION['QUERY_BUDGET_ACTION'] is 'raise', as it is under
+    the test runner.
+
+    Works in both sync and async handler chains, timing async views the
+    same way; the per-request stats live in a context variable that
+    follows the request into sync_to_async threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Let the handler await this instance, as Django's
+            # MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with instrumentation.collect() as stats:
+            response = self.get_response(request)
+        self.finish(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with instrumentation.collect() as stats:
+            response = await self.get_response(request)
+        self.finish(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def finish(self, request, response, stats, total):
+        """Record the metrics, add Server-Timing and check the budget."""
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else ''
+        self.record_metrics(request, response, view, stats, total)
+        if settings.INSTRUMENTATION['SERVER_TIMING']:
+            response['Server-Timing'] = self.server_timing(stats, total)
+        budget = self.get_query_budget(request, match.func) if match else None
+        self.check_budget(view, stats, budget)
+
+    def process_template_response(self, request, response):
+        # Only template responses (DRF's included) reach this hook; under
+        # ASGI they come from sync views, which already run in a thread.
+        stats = instrumentation.get_stats()
+        if stats is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: stats.add(
+                    'render', time.perf_counter() - started,
+                ),
+            )
+        return response
+
+    def get_query_budget(self, request, view_func):
+        """Return the query budget of the view serving `request`."""
+        budget = getattr(
+            getattr(view_func, 'cls', None), 'query_budget', None,
+        )
+        if isinstance(budget, dict):
+            actions = getattr(view_func, 'actions', None) or {}
+            budget = budget.get(actions.get(request.method.lower()))
+        if budget is None:
+            budget = settings.INSTRUMENTATION['DEFAULT_QUERY_BUDGET']
+        return budget
+
+    def server_timing(self, stats, total):
+        """Return the Server-Timing header value for `stats`."""
+        durations = stats.durations
+        return ', '.join([
+            f'db;dur={durations["db"] * 1000:.2f};'
+            f'desc="{stats.queries} queries"',
+            f'serialize;dur={durations["serialize"] * 1000:.2f}',
+            f'render;dur={durations["render"] * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+    def record_metrics(self, request, response, view, stats, total):
+        metrics.increment(
+            'http_requests_total',
+            view=view, method=request.method, status=response.status_code,
+        )
+        metrics.increment(
+            'http_request_duration_seconds_total', total, view=view,
+        )
+        metrics.increment('db_queries_total', stats.queries, view=view)
+        for phase, seconds in stats.durations.items():
+            metrics.increment(
+                f'{phase}_duration_seconds_total', seconds, view=view,
+            )
+
+    def check_budget(self, view, stats, budget):
+        """Log or raise when the request ran more queries than `budget`."""
+        if budget is None or stats.queries <= budget:
+            return
+        metrics.increment('query_budget_exceeded_total', view=view)
+        message = (
+            f'{view or "Request"} ran {stats.queries} queries, '
+            f'over its budget of {budget}.'
+        )
+        if settings.INSTRUMENTATION['QUERY_BUDGET_ACTION'] == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
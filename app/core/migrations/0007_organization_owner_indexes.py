@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_alter_organization_email'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['owner', '-id'], name='org_owner_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-id'], name='org_owner_active_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Give rows that were never updated their creation time."""
+    Organization = apps.get_model('core', 'Organization')
+    Organization.objects.filter(updated_at__isnull=True).update(
+        updated_at=models.F('created_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_organization_owner_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organization',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
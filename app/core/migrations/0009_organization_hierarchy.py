@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:35
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, Concat
+import django.db.models.deletion
+
+
+def backfill_path(apps, schema_editor):
+    """Every existing organization starts out as a root."""
+    Organization = apps.get_model('core', 'Organization')
+    Organization.objects.filter(path='').update(
+        path=Concat(
+            Cast('id', models.TextField()),
+            models.Value('/'),
+            output_field=models.TextField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_organization_updated_at_auto_now'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_path, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:36
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_organization_hierarchy'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['path'], name='org_path_idx', opclasses=['text_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:39
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Name and description are stemmed; the email is split at the "@" so the
+# local part and the domain are matched as separate lexemes.
+SEARCH_VECTOR_SQL = """
+CREATE FUNCTION core_organization_search_vector(
+    name text, email text, description text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(
+            to_tsvector('simple', replace(coalesce(email, ''), '@', ' ')),
+            'B'
+        )
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE FUNCTION core_organization_search_vector_trigger()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := core_organization_search_vector(
+        NEW.name, NEW.email, NEW.description
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+UPDATE core_organization
+SET search_vector = core_organization_search_vector(name, email, description);
+
+CREATE TRIGGER core_organization_search_vector_update
+BEFORE INSERT OR UPDATE OF name, email, description, search_vector
+ON core_organization
+FOR EACH ROW EXECUTE PROCEDURE core_organization_search_vector_trigger();
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER core_organization_search_vector_update ON core_organization;
+DROP FUNCTION core_organization_search_vector_trigger();
+DROP FUNCTION core_organization_search_vector(text, text, text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_organization_path_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='organization',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+    ]
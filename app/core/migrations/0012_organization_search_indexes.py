@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_organization_search'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='org_search_vector_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='org_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
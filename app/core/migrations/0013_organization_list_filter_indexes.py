@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:21
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_organization_search_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['owner', 'is_active', 'is_parent', '-id'], name='org_owner_flags_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['owner', 'is_parent', '-id'], name='org_owner_parent_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(django.db.models.expressions.F('owner'), django.db.models.functions.text.Lower(django.db.models.expressions.Func(django.db.models.expressions.F('email'), django.db.models.expressions.Value('@'), django.db.models.expressions.Value(2), function='split_part', output_field=models.CharField())), django.db.models.expressions.OrderBy(django.db.models.expressions.F('id'), descending=True), name='org_owner_domain_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='org_owner_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(fields=['owner', 'is_active', 'created_at', 'id'], name='org_owner_active_created_idx'),
+        ),
+    ]
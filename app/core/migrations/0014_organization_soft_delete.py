@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_organization_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrganization',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('parent_id', models.BigIntegerField(null=True)),
+                ('path', models.TextField()),
+                ('description', models.TextField(blank=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('is_parent', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorganization',
+            index=models.Index(fields=['owner', '-id'], name='archived_org_owner_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:31
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_organization_soft_delete'),
+    ]
+
+    operations = [
+        # Every API query now filters on is_active, which the
+        # org_owner_active_* and org_owner_flags_id_idx indexes lead with.
+        RemoveIndexConcurrently(
+            model_name='organization',
+            name='org_owner_parent_id_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='organization',
+            name='org_owner_created_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('updated_at', 'created_at'), condition=models.Q(('is_active', False)), name='org_inactive_changed_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Seed the counts from the existing rows; later writes keep them in step.
+BACKFILL_COUNTS_SQL = """
+INSERT INTO core_organizationcounts (owner_id, active, parents)
+SELECT owner_id,
+       count(*) FILTER (WHERE is_active),
+       count(*) FILTER (WHERE is_active AND is_parent)
+FROM core_organization
+GROUP BY owner_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_organization_soft_delete_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationCounts',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='organization_counts', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('active', models.BigIntegerField(default=0)),
+                ('parents', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL_COUNTS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 03:25
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_organization_counts'),
+    ]
+
+    operations = [
+        # Active listings use org_owner_active_id_idx, and the foreign key
+        # index covers the owner lookups that include inactive rows.
+        RemoveIndexConcurrently(
+            model_name='organization',
+            name='org_owner_id_idx',
+        ),
+        # The email domain filter only ever runs on active rows; the new
+        # index is built before the old one is dropped.
+        AddIndexConcurrently(
+            model_name='organization',
+            index=models.Index(django.db.models.expressions.F('owner'), django.db.models.functions.text.Lower(django.db.models.expressions.Func(django.db.models.expressions.F('email'), django.db.models.expressions.Value('@'), django.db.models.expressions.Value(2), function='split_part', output_field=models.CharField())), django.db.models.expressions.OrderBy(django.db.models.expressions.F('id'), descending=True), condition=models.Q(('is_active', True)), name='org_owner_active_domain_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='organization',
+            name='org_owner_domain_id_idx',
+        ),
+    ]
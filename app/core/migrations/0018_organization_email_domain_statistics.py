@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:10
+
+from django.db import migrations
+
+# The planner ignores the expression statistics of partial indexes, so
+# without these the email domain filter is estimated at a fixed 0.5% of
+# the owner's rows and org_owner_active_domain_idx loses to a bitmap scan
+# plus sort. Expression statistics need PostgreSQL 14.
+EMAIL_DOMAIN_STATISTICS_SQL = """
+CREATE STATISTICS org_email_domain_stats
+ON (lower(split_part(email::text, '@', 2)))
+FROM core_organization
+"""
+
+DROP_EMAIL_DOMAIN_STATISTICS_SQL = """
+DROP STATISTICS IF EXISTS org_email_domain_stats
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_organization_index_cleanup'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            EMAIL_DOMAIN_STATISTICS_SQL, DROP_EMAIL_DOMAIN_STATISTICS_SQL,
+        ),
+    ]
@@ -1,14 +1,35 @@
 """
 Database models for the application.
 """
+import operator
+from functools import reduce
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Coalesce, Concat, Lower, Substr
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
 
+from core import hashing
+
+
+def email_domain(field='email'):
+    """Return an expression for the lower-cased domain part of `field`."""
+    return Lower(models.Func(
+        models.F(field), models.Value('@'), models.Value(2),
+        function='split_part',
+        output_field=models.CharField(),
+    ))
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -47,20 +68,529 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return str(self.email)
 
+    def set_password(self, raw_password):
+        """Hash and set the password using the hashing pool."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Return whether `raw_password` is correct, hashing on the pool.
+
+        A correct password stored with an outdated hasher or outdated
+        parameters is re-hashed with the current profile and saved.
+        """
+        valid, must_update = hashing.check_password(
+            raw_password, self.password,
+        )
+        if must_update:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return valid
+
+
+# Adds per-owner (active, parents) deltas, or with `increment` False sets
+# absolute values; see OrganizationCounts.
+COUNTS_UPSERT = """
+INSERT INTO {counts} AS counts (owner_id, active, parents)
+{rows}
+ON CONFLICT (owner_id) DO UPDATE SET
+    active = {active},
+    parents = {parents}
+"""
+
+# Creates zero counts rows for the given owners that have none yet, so
+# they can be locked; see OrganizationCounts.reconcile.
+COUNTS_SEED = """
+INSERT INTO {counts} (owner_id, active, parents)
+SELECT {owner_pk}, 0, 0 FROM {owners} WHERE {owner_pk} = ANY(%s)
+ON CONFLICT (owner_id) DO NOTHING
+"""
+
+# Deactivates rows and takes them off their owners' counts in one
+# statement, counting only rows this statement actually changed.
+SOFT_DELETE_SQL = """
+WITH changed AS (
+    {update}
+    RETURNING owner_id, is_parent
+), deltas AS (
+    SELECT owner_id,
+           -count(*) AS active,
+           -count(*) FILTER (WHERE is_parent) AS parents
+    FROM changed
+    GROUP BY owner_id
+), counted AS (
+    {upsert}
+)
+SELECT coalesce(-sum(active), 0)::bigint FROM deltas
+"""
+
+
+class ActiveOrganizationManager(models.Manager):
+    """Manager that hides soft-deleted (inactive) organizations."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
 
 class Organization(models.Model):
-    """Organization model."""
+    """
+    Organization model.
+
+    Organizations form per-owner trees through `parent`. Each row stores
+    its materialized ancestry in `path` ("<root id>/.../<own id>/"), so a
+    subtree is one indexed prefix match and the ancestors are the ids in
+    the path. `save()` keeps the path of the row and of its descendants
+    in step with `parent`.
+
+    Deleting through the API is a soft delete: `is_active` is cleared on
+    the whole subtree and `objects` no longer returns the rows;
+    `all_objects` still does. The `archive_organizations` command later
+    moves them to `ArchivedOrganization`.
+
+    `save()`, `soft_delete_subtrees()` and deletes keep the owner's
+    `OrganizationCounts` in step in the same transaction. Writes that
+    bypass them (`bulk_update`, `QuerySet.update`) must adjust the counts
+    themselves or leave the drift to `reconcile_organization_counts`.
+    """
+    # Fields that decide what a row adds to OrganizationCounts.
+    counted_fields = ('owner_id', 'is_active', 'is_parent')
+
     name = models.CharField(max_length=255)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='children',
+    )
+    path = models.TextField(default='', editable=False)
+    # Maintained by a database trigger from name, email and description;
+    # see migration 0011.
+    search_vector = SearchVectorField(null=True, editable=False)
     description = models.TextField(blank=True)
     email = models.EmailField()
     is_parent = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=False, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    objects = ActiveOrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Owner-scoped listing: filter(owner=...).order_by('-id').
+            # Listings that include inactive rows (admin, export) are rare
+            # and make do with the owner foreign key index.
+            models.Index(
+                fields=['owner', '-id'],
+                name='org_owner_active_id_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # List filters and orderings; see organizations.filters.
+            models.Index(
+                fields=['owner', 'is_active', 'is_parent', '-id'],
+                name='org_owner_flags_id_idx',
+            ),
+            models.Index(
+                models.F('owner'),
+                email_domain(),
+                models.F('id').desc(),
+                name='org_owner_active_domain_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['owner', 'is_active', 'created_at', 'id'],
+                name='org_owner_active_created_idx',
+            ),
+            # Archival: inactive rows by last change.
+            models.Index(
+                Coalesce('updated_at', 'created_at'),
+                name='org_inactive_changed_idx',
+                condition=models.Q(is_active=False),
+            ),
+            # Subtree lookups: path LIKE '<prefix>%'.
+            models.Index(
+                fields=['path'],
+                name='org_path_idx',
+                opclasses=['text_pattern_ops'],
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='org_search_vector_idx',
+            ),
+            # Fuzzy name matching: name % '<term>'.
+            GinIndex(
+                fields=['name'],
+                name='org_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
 
     def __str__(self):
         return f"Organization(name={self.name}, email={self.email})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent_id = instance.__dict__.get('parent_id')
+        instance._remember_counted(cls.counted_fields)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        names = self.counted_fields
+        if fields is not None:
+            names = [
+                field for field in names
+                if field in fields or field.removesuffix('_id') in fields
+            ]
+        self._remember_counted(names)
+
+    def _remember_counted(self, fields):
+        """Record `fields` as stored, to tell later which ones changed."""
+        loaded = self.__dict__.setdefault('_loaded_counted', {})
+        for field in fields:
+            if field in self.__dict__:
+                loaded[field] = self.__dict__[field]
+
+    def get_unchanged_counted(self):
+        """
+        Return the counted fields still holding the value last loaded or
+        saved. Empty for an instance that was never loaded.
+        """
+        loaded = self.__dict__.get('_loaded_counted')
+        if loaded is None:
+            return set()
+        missing = object()
+        return {
+            field for field in self.counted_fields
+            if loaded.get(field, missing) == self.__dict__.get(field, missing)
+        }
+
+    def save(self, *args, **kwargs):
+        """
+        Save the row, re-root its subtree if the parent changed and
+        update the owner's counts if the row now counts differently.
+
+        Counted fields the caller left unchanged are not written, so a
+        stale instance cannot undo a concurrent change to them, e.g.
+        reactivate an organization soft deleted since it was loaded.
+        """
+        adding = self._state.adding
+        moved = getattr(self, '_loaded_parent_id', None) != self.parent_id
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self,
+        )
+        update_fields = kwargs.get('update_fields')
+        unchanged = set() if adding else self.get_unchanged_counted()
+        if unchanged:
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            update_fields = [
+                name for name in update_fields
+                if name not in unchanged and f'{name}_id' not in unchanged
+            ]
+            kwargs['update_fields'] = update_fields
+        written = self.counted_fields
+        if update_fields is not None:
+            names = set(update_fields)
+            names |= {f'{name}_id' for name in names}
+            written = [field for field in written if field in names]
+        with transaction.atomic(using=using):
+            # Only a save that writes a counted field needs the stored
+            # values, and the row lock that keeps them current.
+            old = self.get_stored_counted(using) if written else None
+            super().save(*args, **kwargs)
+            self._remember_counted(written)
+            if adding or moved or not self.path:
+                self.update_path(using=using)
+            if written:
+                # Columns left out of the UPDATE keep their stored value.
+                new = {
+                    field: getattr(self, field) if field in written
+                    else old[field]
+                    for field in self.counted_fields
+                }
+                OrganizationCounts.add(
+                    OrganizationCounts.deltas([new], [old] if old else []),
+                    using=using,
+                )
+
+    def get_stored_counted(self, using):
+        """
+        Return the stored counted field values, locking the row, or None
+        for a new row. The instance itself may be stale.
+        """
+        if self._state.adding and self.pk is None:
+            return None
+        manager = type(self)._base_manager.using(using)
+        return manager.select_for_update().filter(
+            pk=self.pk,
+        ).values(*self.counted_fields).first()
+
+    def update_path(self, using=None):
+        """
+        Rebuild `path` from the stored parent and move the descendants.
+
+        Raises ValidationError if the parent is the organization itself or
+        one of its descendants.
+        """
+        manager = type(self)._base_manager.db_manager(using)
+        paths = dict(manager.filter(
+            pk__in=[self.pk, self.parent_id],
+        ).values_list('pk', 'path'))
+        old_path = paths.get(self.pk, '')
+        parent_path = paths.get(self.parent_id, '')
+        if old_path and parent_path.startswith(old_path):
+            raise ValidationError(
+                {'parent': _('An organization cannot be its own ancestor.')},
+                code='cycle',
+            )
+
+        path = f'{parent_path}{self.pk}/'
+        if path != old_path:
+            manager.filter(pk=self.pk).update(path=path)
+            if old_path:
+                manager.filter(path__startswith=old_path).exclude(
+                    pk=self.pk,
+                ).update(path=Concat(
+                    models.Value(path),
+                    Substr('path', len(old_path) + 1),
+                ))
+        self.path = path
+        self._loaded_parent_id = self.parent_id
+
+    def get_ancestor_ids(self):
+        """Return the ids of the ancestors, root first."""
+        return [int(pk) for pk in self.path.split('/')[:-2]]
+
+    def is_descendant_of(self, other):
+        """Return whether this organization is in the subtree of `other`."""
+        return bool(other.path) and self.path.startswith(other.path)
+
+    def soft_delete(self, using=None):
+        """Deactivate the organization and its subtree."""
+        type(self).soft_delete_subtrees([self], using=using)
+        self.is_active = False
+        self._remember_counted(['is_active'])
+
+    @classmethod
+    def soft_delete_subtrees(cls, organizations, using=None):
+        """
+        Deactivate `organizations` and their subtrees in one UPDATE.
+
+        The owners' counts are decreased in the same statement. Returns
+        the number of rows deactivated.
+        """
+        if not organizations:
+            return 0
+        using = using or router.db_for_write(cls)
+        subtrees = reduce(operator.or_, (
+            models.Q(path__startswith=organization.path)
+            for organization in organizations
+        ))
+        # The UPDATE QuerySet.update() would run, extended below.
+        query = cls._base_manager.using(using).filter(
+            subtrees, is_active=True,
+        ).query.chain(UpdateQuery)
+        query.add_update_values({
+            'is_active': False,
+            'updated_at': timezone.now(),
+        })
+        update_sql, params = query.get_compiler(using).as_sql()
+        connection = connections[using]
+        sql = SOFT_DELETE_SQL.format(
+            update=update_sql,
+            upsert=OrganizationCounts.upsert_sql(
+                connection,
+                'SELECT owner_id, active, parents FROM deltas',
+            ),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+
+
+class ArchivedOrganization(models.Model):
+    """
+    Organization moved out of the hot table by `archive_organizations`.
+
+    Rows keep their id, path and timestamps. `parent_id` is a plain
+    column since the parent is archived in a later batch, or never when
+    it still has live children.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    parent_id = models.BigIntegerField(null=True)
+    path = models.TextField()
+    description = models.TextField(blank=True)
+    email = models.EmailField()
+    is_parent = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['owner', '-id'],
+                name='archived_org_owner_id_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"ArchivedOrganization(name={self.name}, email={self.email})"
+
+
+class OrganizationCounts(models.Model):
+    """
+    Denormalized per-owner counts of organizations.
+
+    `active` counts the owner's active organizations and `parents` the
+    active ones flagged `is_parent`. Rows are changed by adding deltas
+    in the transaction that changes the organizations (see
+    `Organization`), so reading an owner's counts is one primary key
+    lookup. A missing row means zero.
+    """
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='organization_counts',
+    )
+    active = models.BigIntegerField(default=0)
+    parents = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return (
+            f"OrganizationCounts(owner={self.owner_id}, "
+            f"active={self.active}, parents={self.parents})"
+        )
+
+    @staticmethod
+    def deltas(added, removed=()):
+        """
+        Return owner id -> (active, parents) deltas for rows added and
+        removed, given as objects or dicts with the counted fields.
+        """
+        deltas = {}
+        for rows, sign in ((added, 1), (removed, -1)):
+            for row in rows:
+                if not isinstance(row, dict):
+                    row = {
+                        field: getattr(row, field)
+                        for field in Organization.counted_fields
+                    }
+                if not row['is_active']:
+                    continue
+                active, parents = deltas.get(row['owner_id'], (0, 0))
+                deltas[row['owner_id']] = (
+                    active + sign,
+                    parents + sign * bool(row['is_parent']),
+                )
+        return {
+            owner_id: delta for owner_id, delta in deltas.items()
+            if delta != (0, 0)
+        }
+
+    @classmethod
+    def upsert_sql(cls, connection, rows, increment=True):
+        """Return the INSERT ... ON CONFLICT statement writing `rows`."""
+        quote = connection.ops.quote_name
+        columns = {
+            column: (
+                f'counts.{column} + EXCLUDED.{column}' if increment
+                else f'EXCLUDED.{column}'
+            )
+            for column in ('active', 'parents')
+        }
+        return COUNTS_UPSERT.format(
+            counts=quote(cls._meta.db_table), rows=rows, **columns,
+        )
+
+    @classmethod
+    def add(cls, deltas, using=None, increment=True):
+        """
+        Add owner id -> (active, parents) `deltas` with one statement.
+
+        With `increment` False the values replace the stored counts.
+        """
+        if not deltas:
+            return
+        connection = connections[using or router.db_for_write(cls)]
+        rows = 'VALUES ' + ', '.join(['(%s, %s, %s)'] * len(deltas))
+        params = [
+            value for owner_id, (active, parents) in sorted(deltas.items())
+            for value in (owner_id, active, parents)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(cls.upsert_sql(connection, rows, increment), params)
+
+    @classmethod
+    def reconcile(cls, owner_ids, using=None):
+        """
+        Recount the organizations of `owner_ids` and repair drifted rows.
+
+        The owners' count rows are created if missing and locked first,
+        so writers that commit meanwhile apply their deltas on top of the
+        repaired values. Returns owner id -> (stored, actual) for every
+        repaired owner.
+        """
+        using = using or router.db_for_write(cls)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        owners = cls._meta.get_field('owner').related_model._meta
+        seed = COUNTS_SEED.format(
+            counts=quote(cls._meta.db_table),
+            owners=quote(owners.db_table),
+            owner_pk=quote(owners.pk.column),
+        )
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(seed, [list(owner_ids)])
+            stored = {
+                owner_id: (active, parents)
+                for owner_id, active, parents in cls.objects.using(
+                    using,
+                ).select_for_update().filter(
+                    owner_id__in=owner_ids,
+                ).values_list('owner_id', 'active', 'parents')
+            }
+            actual = {
+                owner_id: (active, parents)
+                for owner_id, active, parents in Organization.objects.using(
+                    using,
+                ).filter(owner_id__in=owner_ids).values('owner_id').annotate(
+                    active=models.Count('pk'),
+                    parents=models.Count(
+                        'pk', filter=models.Q(is_parent=True),
+                    ),
+                ).values_list('owner_id', 'active', 'parents')
+            }
+            drifted = {}
+            for owner_id in stored.keys() | actual.keys():
+                counts = actual.get(owner_id, (0, 0))
+                if stored.get(owner_id, (0, 0)) != counts:
+                    drifted[owner_id] = (stored.get(owner_id, (0, 0)), counts)
+            cls.add(
+                {owner_id: counts for owner_id, (_, counts) in drifted.items()},
+                using=using,
+                increment=False,
+            )
+        return drifted
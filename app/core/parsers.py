@@ -0,0 +1,43 @@
+"""
+Parsers for the API.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# orjson turns integers outside the 64-bit range into floats, where the
+# json module keeps them exact; bodies that may hold one skip orjson.
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser that decodes with orjson when it is installed.
+
+    Returns the same data as `JSONParser`. Bodies that are not UTF-8, that
+    may hold integers orjson cannot represent exactly, or that orjson
+    rejects are handed to `JSONParser`, so lenient inputs and error
+    messages are unchanged.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming bytestream as JSON and return the data."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,46 @@
+"""
+Renderers for the API.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes with orjson when it is installed.
+
+    The output is byte-for-byte what `JSONRenderer` produces for compact,
+    non-ASCII-escaped output; indented or ASCII-only responses and data
+    orjson cannot encode are handed to `JSONRenderer` unchanged.
+    """
+    options = 0 if orjson is None else (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        fallback = orjson is None or self.ensure_ascii or not self.compact
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if fallback or data is None or indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Match JSONRenderer, which escapes U+2028 and U+2029 so that the
+        # output is also valid JavaScript.
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028',
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029',
+        )
@@ -0,0 +1,77 @@
+"""
+Database routing between the primary and the read replicas.
+
+Reads go to a replica only while a `routing(use_replica=True)` block is
+active, which `core.middleware.ReplicaRoutingMiddleware` opens for safe
+requests. Everything else - writes, unsafe requests, management commands,
+shells and tests - uses the primary.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+
+class RoutingState:
+    """Routing decision for the current request and whether it wrote."""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# Holds a mutable RoutingState so that a write flagged in a worker thread
+# (e.g. under sync_to_async) is seen by the code that opened the block.
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+@contextmanager
+def routing(use_replica):
+    """Route the reads inside the block; yield the RoutingState."""
+    state = RoutingState(use_replica)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def get_replicas():
+    """Return the database aliases of the configured read replicas."""
+    return settings.READ_REPLICAS['ALIASES']
+
+
+def uses_replica():
+    """Return whether reads in the current context go to a replica."""
+    state = _state.get()
+    return state is not None and state.use_replica and bool(get_replicas())
+
+
+class ReplicaRouter:
+    """Send allowed reads to a random replica and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if not uses_replica():
+            return PRIMARY
+        return random.choice(get_replicas())
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *get_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        if db in get_replicas():
+            return False
+        return None
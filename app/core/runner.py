@@ -0,0 +1,22 @@
+"""
+Test runner for the project.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Test runner that fails requests exceeding their query budget."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._instrumentation = override_settings(INSTRUMENTATION={
+            **settings.INSTRUMENTATION,
+            'QUERY_BUDGET_ACTION': 'raise',
+        })
+        self._instrumentation.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._instrumentation.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,100 @@
+"""
+Helpers for tests asserting the SQL cost of API endpoints.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Organization, OrganizationCounts
+
+# Numbers of organizations an endpoint is measured against.
+SCALES = (1, 100, 10000)
+
+
+def create_organizations(owner, count):
+    """
+    Create `count` organizations for `owner` and return the root.
+
+    The first organization is the root and every other one its child, so
+    the set exercises both the flat and the hierarchy endpoints.
+    """
+    root = Organization.objects.create(
+        owner=owner, name='Root', email='root@example.com',
+    )
+    Organization.objects.bulk_create([
+        Organization(
+            owner=owner,
+            parent=root,
+            name=f'Organization {i}',
+            email=f'org{i}@example.com',
+            description=f'Description {i}',
+        )
+        for i in range(1, count)
+    ], batch_size=2000)
+    Organization.objects.filter(owner=owner, path='').update(path=Concat(
+        Value(root.path), Cast('id', CharField()), Value('/'),
+    ))
+    OrganizationCounts.reconcile([owner.pk])
+    return root
+
+
+class QueryCostMixin:
+    """
+    TestCase mixin asserting queries and time of calls as data grows.
+
+    `assertQueryCost` runs a call once per scale, e.g. against owners of
+    1, 100 and 10k organizations, and fails when the number of queries
+    differs between scales - an O(1) endpoint that became O(n) - or
+    exceeds `max_queries`, or when a call takes longer than
+    `max_seconds`. Caches are cleared before each call so the cold path
+    is measured.
+    """
+    max_seconds = 2.0
+
+    def measure(self, call):
+        """Run `call`; return (response, captured queries, seconds)."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = call()
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.fail(
+                f'Unexpected status {response.status_code}: '
+                f'{getattr(response, "data", None)!r}'
+            )
+        return response, queries.captured_queries, elapsed
+
+    def assertQueryCost(self, call, scales, max_queries=None,
+                        max_seconds=None):
+        """Assert `call(fixture)` costs the same for every scale."""
+        if max_seconds is None:
+            max_seconds = self.max_seconds
+        counts = {}
+        largest = None
+        for scale, fixture in scales.items():
+            _response, queries, elapsed = self.measure(lambda: call(fixture))
+            counts[scale] = len(queries)
+            largest = queries
+            self.assertLessEqual(
+                elapsed, max_seconds,
+                f'Took {elapsed:.3f}s at scale {scale}, '
+                f'over {max_seconds}s.',
+            )
+
+        sql = '\n'.join(query['sql'] for query in largest)
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f'Query count grows with the data: {counts}\n{sql}',
+        )
+        if max_queries is not None:
+            self.assertLessEqual(
+                max(counts.values()), max_queries,
+                f'{counts} queries, over {max_queries}:\n{sql}',
+            )
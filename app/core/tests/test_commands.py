@@ -2,30 +2,155 @@
 Test custom Django management commands.
 """
 
-from unittest.mock import patch
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import ANY, patch
 from psycopg2 import OperationalError as Psycopg2Error  # noqa
 from django.core.management import call_command  # noqa
 from django.db.utils import OperationalError  # noqa
-from django.test import SimpleTestCase
+from django.core.management.base import CommandError
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TransactionTestCase
 
+from core.management.commands.wait_for_db import NotReady, probe
 
-@patch("core.management.commands.wait_for_db.Command.check")
+
+class FakeClock:
+    """Stand-in for `time` whose sleep advances monotonic."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@patch("core.management.commands.wait_for_db.probe")
 class CommandTests(SimpleTestCase):
     """Test commands."""
-    databases = ['default']
 
-    def test_wait_for_db_ready(self, patched_check):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch(
+            "core.management.commands.wait_for_db.time", self.clock,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_wait_for_db_ready(self, patched_probe):
         """Test waiting for db when db is ready."""
-        patched_check.return_value = True
-        call_command("wait_for_db")
-        patched_check.assert_called_once_with(databases=['default'])
+        call_command("wait_for_db", stdout=StringIO())
+        patched_probe.assert_called_once_with('default', ready=False)
+        self.assertEqual(self.clock.sleeps, [])
 
-    @patch("time.sleep")
-    def test_wait_for_db_delayed(self, patched_sleep, patched_check):
+    def test_wait_for_db_delayed(self, patched_probe):
         """Test waiting for db when getting OperationalError."""
-        patched_check.side_effect = (
-            [Psycopg2Error] * 2 + [OperationalError] * 3 + [True]
+        patched_probe.side_effect = (
+            [Psycopg2Error] * 2 + [OperationalError] * 3 + [None]
+        )
+        call_command("wait_for_db", stdout=StringIO())
+        self.assertEqual(patched_probe.call_count, 6)
+        patched_probe.assert_called_with('default', ready=False)
+
+    def test_wait_for_db_backs_off(self, patched_probe):
+        """Test retry delays grow exponentially up to the cap."""
+        patched_probe.side_effect = [OperationalError] * 6 + [None]
+        with patch("random.uniform", side_effect=lambda low, high: high):
+            call_command(
+                "wait_for_db", "--initial-delay=1", "--max-delay=8",
+                stdout=StringIO(),
+            )
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 8, 8, 8])
+
+    def test_wait_for_db_timeout(self, patched_probe):
+        """Test the command fails once the deadline has passed."""
+        patched_probe.side_effect = OperationalError('connection refused')
+        with self.assertRaisesMessage(CommandError, 'default'):
+            call_command("wait_for_db", "--timeout=3", stdout=StringIO())
+        self.assertAlmostEqual(sum(self.clock.sleeps), 3)
+
+    def test_wait_for_db_checks_databases_in_parallel(self, patched_probe):
+        """Test every requested alias is probed."""
+        call_command(
+            "wait_for_db", "--database=default", "--database=other",
+            "--ready", stdout=StringIO(),
+        )
+        self.assertCountEqual(
+            [call.args[0] for call in patched_probe.call_args_list],
+            ['default', 'other'],
+        )
+        patched_probe.assert_called_with(ANY, ready=True)
+
+    def test_wait_for_db_not_ready(self, patched_probe):
+        """Test unapplied migrations keep the command waiting."""
+        patched_probe.side_effect = (
+            [NotReady('1 unapplied migration(s)')] * 2 + [None]
+        )
+        out = StringIO()
+        call_command("wait_for_db", "--ready", stdout=out)
+        self.assertEqual(patched_probe.call_count, 3)
+        self.assertIn('unapplied migration', out.getvalue())
+
+
+class ProbeTests(TransactionTestCase):
+    """Test the database probe against the test database."""
+
+    def test_probe_migrated_database(self):
+        """Test a migrated database passes the readiness probe."""
+        probe('default', ready=True)
+
+    def test_probe_unapplied_migrations(self):
+        """Test a pending migration fails the readiness probe."""
+        with patch.object(
+            MigrationExecutor, 'migration_plan', return_value=[(None, False)],
+        ):
+            with self.assertRaises(NotReady):
+                probe('default', ready=True)
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler answering every GET with a small JSON body."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    """Test the HTTP benchmark command."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_benchmark_reports_throughput(self):
+        """Test the command reports requests/sec and percentiles."""
+        url = f'http://127.0.0.1:{self.server.server_port}/api/'
+        out = StringIO()
+        call_command(
+            'benchmark_http', url,
+            '--requests', '40', '--concurrency', '4',
+            stdout=out,
         )
-        call_command("wait_for_db")
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        output = out.getvalue()
+        self.assertIn('requests: 40  errors: 0', output)
+        self.assertIn('requests/sec:', output)
+        self.assertIn('p99', output)
@@ -0,0 +1,245 @@
+"""
+Tests for the database backend and connection pool.
+"""
+import threading
+from unittest.mock import patch
+
+import psycopg2.extensions
+from django.db import connection, connections, transaction
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core import metrics
+from core.db import pool as pool_module
+from core.db.backends.postgresql.base import DatabaseWrapper
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the connection pool with stand-in connections."""
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.opened = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def test_reuses_returned_connections(self):
+        """Test a returned connection is handed out again."""
+        pool = ConnectionPool(self.connect, name='test', max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(
+            metrics.registry.get('db_pool_checkouts_total', pool='test'), 2,
+        )
+
+    def test_fill_opens_min_size(self):
+        """Test filling the pool opens min_size idle connections."""
+        pool = ConnectionPool(self.connect, min_size=2, max_size=4)
+        pool.fill()
+        self.assertEqual(pool.stats(), {'size': 2, 'idle': 2, 'in_use': 0})
+
+    def test_waits_then_times_out(self):
+        """Test a checkout beyond max_size waits, then times out."""
+        pool = ConnectionPool(
+            self.connect, name='test', max_size=1, timeout=0.01,
+        )
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(
+            metrics.registry.get('db_pool_waits_total', pool='test'), 1,
+        )
+        self.assertEqual(
+            metrics.registry.get('db_pool_timeouts_total', pool='test'), 1,
+        )
+
+    def test_waiter_gets_returned_connection(self):
+        """Test a waiting checkout is served when a connection returns."""
+        pool = ConnectionPool(self.connect, max_size=1, timeout=5)
+        conn = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, [conn])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_discard_frees_a_slot(self):
+        """Test discarding closes the connection and frees its slot."""
+        pool = ConnectionPool(self.connect, max_size=1)
+        conn = pool.getconn()
+        pool.putconn(conn, discard=True)
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.getconn(), conn)
+
+    @patch('core.db.pool.time.monotonic')
+    def test_prunes_idle_connections(self, patched_monotonic):
+        """Test connections idle past max_idle are closed down to min_size."""
+        patched_monotonic.return_value = 100
+        pool = ConnectionPool(
+            self.connect, min_size=1, max_size=3, max_idle=10,
+        )
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        patched_monotonic.return_value = 200
+        pool.putconn(second)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats(), {'size': 1, 'idle': 1, 'in_use': 0})
+
+
+class DatabaseBackendTests(SimpleTestCase):
+    """Test health checks and pooling against the test database."""
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.addCleanup(pool_module.close_all)
+
+    def make_wrapper(self, alias='pooled', **settings):
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, **settings}, alias,
+        )
+        # django.contrib.postgres looks connections up by alias.
+        connections[alias] = wrapper
+        self.addCleanup(self.unregister, alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def unregister(self, alias):
+        try:
+            del connections[alias]
+        except AttributeError:
+            pass
+
+    def terminate(self, raw_connection):
+        admin = self.make_wrapper(alias='admin', POOL={})
+        with admin.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(%s)',
+                [raw_connection.get_backend_pid()],
+            )
+
+    def test_pool_reuses_connections(self):
+        """Test closing returns the connection to the pool for reuse."""
+        wrapper = self.make_wrapper(POOL={'ENABLED': True, 'MAX_SIZE': 2})
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, raw)
+        self.assertEqual(
+            metrics.registry.get('db_pool_checkouts_total', pool='pooled'), 2,
+        )
+
+    def test_pool_rolls_back_on_release(self):
+        """Test an open transaction is rolled back before reuse."""
+        wrapper = self.make_wrapper(POOL={'ENABLED': True})
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE pool_probe (id int)')
+        raw = wrapper.connection
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pool_probe')")
+            self.assertIsNone(cursor.fetchone()[0])
+        self.assertIs(wrapper.connection, raw)
+
+    def test_pool_discards_session_state(self):
+        """Test settings made by one user of a connection do not leak."""
+        wrapper = self.make_wrapper(POOL={'ENABLED': True})
+        with wrapper.cursor() as cursor:
+            cursor.execute("SET statement_timeout = '1234ms'")
+            cursor.execute('PREPARE pool_probe AS SELECT 1')
+        raw = wrapper.connection
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            self.assertNotEqual(cursor.fetchone()[0], '1234ms')
+            cursor.execute('SELECT count(*) FROM pg_prepared_statements')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertIs(wrapper.connection, raw)
+
+    def test_pool_keeps_isolation_level(self):
+        """Test a configured isolation level survives the reset."""
+        isolation_level = psycopg2.extensions.ISOLATION_LEVEL_SERIALIZABLE
+        wrapper = self.make_wrapper(
+            POOL={'ENABLED': True},
+            OPTIONS={'isolation_level': isolation_level},
+        )
+        wrapper.ensure_connection()
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SHOW transaction_isolation')
+            self.assertEqual(cursor.fetchone()[0], 'serializable')
+
+    def test_close_in_atomic_block_discards(self):
+        """Test a connection closed inside atomic is not pooled."""
+        wrapper = self.make_wrapper(POOL={'ENABLED': True, 'MAX_SIZE': 1})
+        with transaction.atomic(using=wrapper.alias):
+            wrapper.ensure_connection()
+            raw = wrapper.connection
+            wrapper.close()
+            self.assertIs(wrapper.connection, raw)
+            self.assertTrue(raw.closed)
+            self.assertEqual(wrapper.pool, None)
+            self.assertEqual(
+                pool_module.stats()['pooled'],
+                {'size': 0, 'idle': 0, 'in_use': 0},
+            )
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIsNot(wrapper.connection, raw)
+
+    def test_pool_timeout_is_operational_error(self):
+        """Test an exhausted pool raises Django's OperationalError."""
+        settings = {
+            'POOL': {'ENABLED': True, 'MAX_SIZE': 1, 'TIMEOUT': 0.01},
+        }
+        self.make_wrapper(**settings).ensure_connection()
+        with self.assertRaises(OperationalError):
+            self.make_wrapper(**settings).ensure_connection()
+
+    def test_pool_replaces_dead_connection(self):
+        """Test health checks replace a pooled connection that died."""
+        wrapper = self.make_wrapper(
+            CONN_HEALTH_CHECKS=True, POOL={'ENABLED': True},
+        )
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.terminate(raw)
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIsNot(wrapper.connection, raw)
+
+    def test_health_check_reconnects_persistent_connection(self):
+        """Test a dead persistent connection is replaced per request."""
+        wrapper = self.make_wrapper(
+            CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True, POOL={},
+        )
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        self.terminate(raw)
+        wrapper.close_if_unusable_or_obsolete()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIsNot(wrapper.connection, raw)
@@ -0,0 +1,136 @@
+"""
+Tests for password hashers and the hashing pool.
+"""
+import threading
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.hashing import HashingPool, HashingPoolBusy
+
+FAST_HASHING = {
+    **settings.PASSWORD_HASHING,
+    'PBKDF2_ITERATIONS': 1000,
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 1024,
+    'ARGON2_PARALLELISM': 1,
+    'SCRYPT_WORK_FACTOR': 2 ** 10,
+}
+
+
+@override_settings(PASSWORD_HASHING=FAST_HASHING)
+class HasherTests(SimpleTestCase):
+    """Test the tuned hashers."""
+
+    @override_settings(PASSWORD_HASHERS=['core.hashers.ScryptPasswordHasher'])
+    def test_scrypt_round_trip(self):
+        """Test scrypt hashes verify and encode their parameters."""
+        encoded = make_password('testpass123')
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.assertTrue(check_password('testpass123', encoded))
+        self.assertFalse(check_password('wrongpass', encoded))
+
+    @override_settings(
+        PASSWORD_HASHERS=['core.hashers.TunedArgon2PasswordHasher'],
+    )
+    def test_argon2_uses_configured_costs(self):
+        """Test argon2 hashes use the configured cost parameters."""
+        encoded = make_password('testpass123')
+        self.assertIn('m=1024,t=1,p=1', encoded)
+        self.assertTrue(check_password('testpass123', encoded))
+
+    @override_settings(
+        PASSWORD_HASHERS=['core.hashers.TunedPBKDF2PasswordHasher'],
+    )
+    def test_pbkdf2_uses_configured_iterations(self):
+        """Test PBKDF2 hashes use the configured iteration count."""
+        encoded = make_password('testpass123')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+
+
+@override_settings(PASSWORD_HASHING=FAST_HASHING)
+class RehashOnLoginTests(TestCase):
+    """Test legacy hashes are upgraded on a successful login."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+
+    @override_settings(PASSWORD_HASHERS=[
+        'core.hashers.ScryptPasswordHasher',
+        'core.hashers.TunedPBKDF2PasswordHasher',
+    ])
+    def test_login_upgrades_to_profile_hasher(self):
+        """Test a PBKDF2 hash becomes scrypt after logging in."""
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        user = authenticate(username='test@example.com', password='testpass123')
+        self.assertEqual(user, self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    def test_failed_login_keeps_hash(self):
+        """Test a wrong password does not touch the stored hash."""
+        self.user.password = make_password(
+            'testpass123', hasher='pbkdf2_sha1',
+        )
+        self.user.save()
+        encoded = self.user.password
+        self.assertFalse(self.user.check_password('wrongpass'))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, encoded)
+
+    def test_outdated_parameters_upgraded(self):
+        """Test a hash with outdated iterations is re-hashed."""
+        self.user.password = make_password('testpass123')
+        self.user.save()
+        with override_settings(PASSWORD_HASHING={
+            **FAST_HASHING,
+            'PBKDF2_ITERATIONS': 2000,
+        }):
+            self.assertTrue(self.user.check_password('testpass123'))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Test the bounded hashing pool."""
+
+    def test_inline_without_workers(self):
+        """Test calls run in the caller thread with no workers."""
+        pool = HashingPool(max_workers=0, max_pending=0, timeout=1)
+        self.assertEqual(pool.run(threading.get_ident), threading.get_ident())
+
+    def test_runs_on_worker_thread(self):
+        """Test calls run on a pool thread and return their result."""
+        pool = HashingPool(max_workers=2, max_pending=0, timeout=1)
+        self.addCleanup(pool.shutdown)
+        self.assertNotEqual(
+            pool.run(threading.get_ident), threading.get_ident()
+        )
+        self.assertEqual(pool.run(pow, 2, 10), 1024)
+
+    def test_busy_when_saturated(self):
+        """Test callers past the bound get HashingPoolBusy."""
+        pool = HashingPool(max_workers=1, max_pending=0, timeout=0.01)
+        self.addCleanup(pool.shutdown)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        worker = threading.Thread(target=pool.run, args=(block,))
+        worker.start()
+        started.wait()
+        try:
+            with self.assertRaises(HashingPoolBusy):
+                pool.run(pow, 2, 10)
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(pool.run(pow, 2, 10), 1024)
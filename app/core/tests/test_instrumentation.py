@@ -0,0 +1,260 @@
+"""
+Tests for request instrumentation and the metrics endpoint.
+"""
+import asyncio
+import re
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import instrumentation, metrics
+from core.db import pool as pool_module
+from core.db.pool import ConnectionPool
+from core.middleware import InstrumentationMiddleware, QueryBudgetExceeded
+from core.models import Organization
+from user.views import ManageUserView
+
+ORGANIZATION_URL = reverse('organizations:organization-list')
+ME_URL = reverse('user:me')
+METRICS_URL = reverse('metrics')
+
+
+def parse_server_timing(header):
+    """Return {metric: (duration_ms, description)} from a header value."""
+    timings = {}
+    for entry in header.split(', '):
+        name, *params = entry.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        timings[name] = (float(values['dur']), values.get('desc', ''))
+    return timings
+
+
+class TimedTests(SimpleTestCase):
+    """Test the phase timers."""
+
+    def test_nested_blocks_count_once(self):
+        """Test a phase nested in itself is not counted twice."""
+        with instrumentation.collect() as stats:
+            with patch('time.perf_counter', side_effect=[0.0, 1.0, 2.0]):
+                with instrumentation.timed('serialize'):
+                    with instrumentation.timed('serialize'):
+                        pass
+        self.assertEqual(stats.durations['serialize'], 1.0)
+
+    def test_no_request(self):
+        """Test timers do nothing outside a request."""
+        with instrumentation.timed('serialize'):
+            pass
+        self.assertIsNone(instrumentation.get_stats())
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    """Test per-request query and timing measurements."""
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Test the response reports queries and phase durations."""
+        Organization.objects.create(
+            owner=self.user, name='Org', email='org@example.com',
+        )
+        response = self.client.get(ORGANIZATION_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(
+            set(timings), {'db', 'serialize', 'render', 'total'},
+        )
+        queries = int(re.match(r'"(\d+) queries"', timings['db'][1])[1])
+        self.assertGreater(queries, 0)
+        self.assertGreater(timings['serialize'][0], 0)
+        self.assertGreater(timings['render'][0], 0)
+        self.assertGreaterEqual(timings['total'][0], timings['db'][0])
+
+    def test_metrics_recorded_per_view(self):
+        """Test counters are accumulated under the URL name."""
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        view = 'user:me'
+        self.assertEqual(metrics.registry.get(
+            'http_requests_total', view=view, method='GET', status=200,
+        ), 2)
+        self.assertGreater(metrics.registry.get(
+            'http_request_duration_seconds_total', view=view,
+        ), 0)
+
+    @override_settings(INSTRUMENTATION={
+        **settings.INSTRUMENTATION, 'SERVER_TIMING': False,
+    })
+    def test_server_timing_disabled(self):
+        """Test the header can be turned off."""
+        response = self.client.get(ME_URL)
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_budget_exceeded_raises(self):
+        """Test exceeding the budget fails when configured to raise."""
+        with patch.object(ManageUserView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.patch(ME_URL, {'name': 'New'}, format='json')
+
+    @override_settings(INSTRUMENTATION={
+        **settings.INSTRUMENTATION, 'QUERY_BUDGET_ACTION': 'log',
+    })
+    def test_budget_exceeded_logs(self):
+        """Test exceeding the budget is logged when configured to log."""
+        with patch.object(ManageUserView, 'query_budget', 0):
+            with self.assertLogs('core.middleware', 'WARNING') as logs:
+                response = self.client.patch(
+                    ME_URL, {'name': 'New'}, format='json',
+                )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('over its budget of 0', logs.output[0])
+        self.assertEqual(metrics.registry.get(
+            'query_budget_exceeded_total', view='user:me',
+        ), 1)
+
+    def test_budget_per_action(self):
+        """Test viewset budgets apply to the action being served."""
+        with patch.dict(
+            'organizations.views.OrganizationViewSet.query_budget',
+            {'create': 0},
+        ):
+            self.client.get(ORGANIZATION_URL)
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.post(
+                    ORGANIZATION_URL,
+                    {'name': 'Org', 'email': 'org@example.com'},
+                    format='json',
+                )
+
+
+class AsyncInstrumentationMiddlewareTests(TestCase):
+    """Test the middleware in an async handler chain."""
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_async_chain_is_not_adapted(self):
+        """Test the middleware is a coroutine with an async get_response."""
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(asyncio.iscoroutinefunction(
+            InstrumentationMiddleware(get_response),
+        ))
+
+    def test_async_request_timed(self):
+        """Test queries run in sync_to_async threads are counted."""
+        async def get_response(request):
+            await sync_to_async(Organization.objects.count)()
+            return HttpResponse()
+
+        response = async_to_sync(InstrumentationMiddleware(get_response))(
+            RequestFactory().get('/'),
+        )
+
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(timings['db'][1], '"1 queries"')
+        self.assertGreaterEqual(timings['total'][0], timings['db'][0])
+        self.assertEqual(metrics.registry.get(
+            'http_requests_total', view='', method='GET', status=200,
+        ), 1)
+
+
+@override_settings(INSTRUMENTATION={
+    **settings.INSTRUMENTATION, 'METRICS_TOKEN': 'secret',
+})
+class MetricsViewTests(SimpleTestCase):
+    """Test the Prometheus metrics endpoint."""
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.addCleanup(pool_module.close_all)
+        self.client.defaults['HTTP_AUTHORIZATION'] = 'Bearer secret'
+
+    def test_exposes_counters_and_pools(self):
+        """Test counters and pool gauges use the text format."""
+        metrics.increment('demo_total', 2, view='a "b"')
+        pool = pool_module.get_pool('key', lambda: ConnectionPool(
+            connect=object, name='primary',
+        ))
+        pool.getconn()
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE demo_total counter\n', body)
+        self.assertIn('demo_total{view="a \\"b\\""} 2\n', body)
+        self.assertIn(
+            'db_pool_connections{pool="primary",state="in_use"} 1\n', body,
+        )
+
+    def test_token_required(self):
+        """Test a configured token must be sent as a bearer token."""
+        self.assertEqual(
+            self.client.get(
+                METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong',
+            ).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(INSTRUMENTATION={
+        **settings.INSTRUMENTATION, 'METRICS_TOKEN': '',
+    })
+    def test_denied_without_token(self):
+        """Test an unset token refuses anonymous scrapers."""
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+
+class MetricsViewStaffTests(TestCase):
+    """Test staff access to the metrics endpoint."""
+
+    @override_settings(INSTRUMENTATION={
+        **settings.INSTRUMENTATION, 'METRICS_TOKEN': '',
+    })
+    def test_staff_allowed(self):
+        """Test staff users can read the metrics without a token."""
+        user = get_user_model().objects.create_user(
+            email='staff@example.com', password='testpass123',
+        )
+        self.client.force_login(user)
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
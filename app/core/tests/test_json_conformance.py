@@ -0,0 +1,102 @@
+"""
+Conformance of the orjson renderer and parser with DRF's JSON classes.
+
+Every test case of the organizations and user API suites is run again
+with `ORJSONRenderer.render` and `ORJSONParser.parse` wrapped so that
+each response body and each parsed request is also produced by
+`JSONRenderer` and `JSONParser` and compared, failing the test on any
+difference.
+"""
+import io
+import unittest
+from unittest.mock import patch
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from organizations.tests import test_organizations_api
+from user.tests import test_authentication, test_throttling, test_user_api
+
+API_TEST_MODULES = [
+    test_organizations_api,
+    test_authentication,
+    test_throttling,
+    test_user_api,
+]
+
+render = ORJSONRenderer.render
+parse = ORJSONParser.parse
+
+
+def checked_render(self, data, accepted_media_type=None, renderer_context=None):
+    actual = render(self, data, accepted_media_type, renderer_context)
+    expected = JSONRenderer.render(
+        self, data, accepted_media_type, renderer_context,
+    )
+    if actual != expected:
+        raise AssertionError(
+            f'ORJSONRenderer output {actual!r} != JSONRenderer {expected!r}'
+        )
+    return actual
+
+
+def parse_or_error(parse, parser, body, media_type, parser_context):
+    try:
+        return parse(parser, io.BytesIO(body), media_type, parser_context)
+    except ParseError as exc:
+        return exc
+
+
+def checked_parse(self, stream, media_type=None, parser_context=None):
+    body = stream.read()
+    actual = parse_or_error(parse, self, body, media_type, parser_context)
+    expected = parse_or_error(
+        JSONParser.parse, self, body, media_type, parser_context,
+    )
+    if isinstance(expected, ParseError):
+        if str(actual) != str(expected):
+            raise AssertionError(
+                f'ORJSONParser error {actual!r} != JSONParser {expected!r}'
+            )
+        raise actual
+    if actual != expected:
+        raise AssertionError(
+            f'ORJSONParser result {actual!r} != JSONParser {expected!r}'
+        )
+    return actual
+
+
+class JSONConformanceMixin:
+    """Compare every JSON body rendered or parsed during the test."""
+
+    def setUp(self):
+        for cls, name, method in (
+            (ORJSONRenderer, 'render', checked_render),
+            (ORJSONParser, 'parse', checked_parse),
+        ):
+            patcher = patch.object(cls, name, method)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
+
+
+def conformance_cases(module):
+    """Yield a conformance variant of every test case in `module`."""
+    for name, case in vars(module).items():
+        is_case = isinstance(case, type) and issubclass(
+            case, unittest.TestCase,
+        )
+        if is_case and case.__module__ == module.__name__:
+            yield type(f'{name}JSONConformance', (
+                JSONConformanceMixin, case,
+            ), {'__module__': __name__})
+
+
+globals().update(
+    (case.__name__, case)
+    for module in API_TEST_MODULES
+    for case in conformance_cases(module)
+)
@@ -1,7 +1,10 @@
 """
 Tests for the models
 """
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from core import models
 
@@ -66,3 +69,182 @@ class ModelTests(TestCase):
             str(organization),
             f'Organization(name={organization.name}, email={organization.email})'
         )
+
+    def test_organization_paths(self):
+        """Test paths follow the parent link and move with the subtree."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        root = models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com',
+        )
+        child = models.Organization.objects.create(
+            name='Child', owner=user, email='child@example.com', parent=root,
+        )
+        grandchild = models.Organization.objects.create(
+            name='Grandchild', owner=user, email='grandchild@example.com',
+            parent=child,
+        )
+        self.assertEqual(root.path, f'{root.pk}/')
+        self.assertEqual(grandchild.path, f'{root.pk}/{child.pk}/{grandchild.pk}/')
+        self.assertEqual(grandchild.get_ancestor_ids(), [root.pk, child.pk])
+
+        child.parent = None
+        child.save()
+        grandchild.refresh_from_db()
+        self.assertEqual(child.path, f'{child.pk}/')
+        self.assertEqual(grandchild.path, f'{child.pk}/{grandchild.pk}/')
+
+    def test_organization_cycle_rejected(self):
+        """Test an organization cannot be moved below its own subtree."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        root = models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com',
+        )
+        child = models.Organization.objects.create(
+            name='Child', owner=user, email='child@example.com', parent=root,
+        )
+        root.parent = child
+        with self.assertRaises(ValidationError):
+            root.save()
+        root.refresh_from_db()
+        self.assertIsNone(root.parent_id)
+
+    def test_organization_soft_delete(self):
+        """Test soft deleting hides the subtree from the default manager."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        root = models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com',
+        )
+        child = models.Organization.objects.create(
+            name='Child', owner=user, email='child@example.com', parent=root,
+        )
+        other = models.Organization.objects.create(
+            name='Other', owner=user, email='other@example.com',
+        )
+
+        deleted = models.Organization.soft_delete_subtrees([root])
+
+        self.assertEqual((type(deleted), deleted), (int, 2))
+        root.refresh_from_db()
+        self.assertFalse(root.is_active)
+        self.assertEqual(list(models.Organization.objects.all()), [other])
+        self.assertEqual(models.Organization.all_objects.count(), 3)
+        child.refresh_from_db()
+        self.assertFalse(child.is_active)
+        self.assertEqual(child.parent, root)
+
+    def test_organization_counts(self):
+        """Test every write keeps the owner's counts in step."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        counts = models.OrganizationCounts.objects.filter(owner=user)
+
+        root = models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com', is_parent=True,
+        )
+        child = models.Organization.objects.create(
+            name='Child', owner=user, email='child@example.com', parent=root,
+        )
+        other = models.Organization.objects.create(
+            name='Other', owner=user, email='other@example.com',
+        )
+        self.assertEqual(counts.get().active, 3)
+        self.assertEqual(counts.get().parents, 1)
+
+        other.is_parent = True
+        other.save()
+        other.name = 'Renamed'
+        other.save(update_fields=['name'])
+        self.assertEqual(counts.get().parents, 2)
+
+        root.soft_delete()
+        self.assertEqual(counts.values_list('active', 'parents').get(), (1, 1))
+
+        other.delete()
+        self.assertEqual(counts.values_list('active', 'parents').get(), (0, 0))
+
+        # The stale instance still says active but never changed it, so
+        # saving it keeps the organization deleted.
+        child.name = 'Renamed'
+        child.save()
+        root.save()
+        self.assertEqual(counts.values_list('active', 'parents').get(), (0, 0))
+        self.assertFalse(
+            models.Organization.all_objects.get(pk=child.pk).is_active,
+        )
+
+        child.refresh_from_db()
+        child.is_active = True
+        child.save()
+        self.assertEqual(counts.values_list('active', 'parents').get(), (1, 0))
+
+    def test_organization_save_locks_only_counted_changes(self):
+        """Test only saves that change a counted field lock the row."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com',
+        )
+        organization = models.Organization.objects.get()
+
+        organization.name = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            organization.save()
+        self.assertFalse(any('FOR UPDATE' in q['sql'] for q in queries))
+
+        organization.is_parent = True
+        with CaptureQueriesContext(connection) as queries:
+            organization.save()
+        self.assertTrue(any('FOR UPDATE' in q['sql'] for q in queries))
+        self.assertEqual(
+            models.OrganizationCounts.objects.get(owner=user).parents, 1,
+        )
+
+    def test_organization_counts_reconcile(self):
+        """Test reconciling repairs counts that drifted."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com', is_parent=True,
+        )
+        models.OrganizationCounts.objects.filter(owner=user).update(
+            active=7, parents=0,
+        )
+
+        drifted = models.OrganizationCounts.reconcile([user.pk])
+
+        self.assertEqual(drifted, {user.pk: ((7, 0), (1, 1))})
+        self.assertEqual(models.OrganizationCounts.reconcile([user.pk]), {})
+        counts = models.OrganizationCounts.objects.get(owner=user)
+        self.assertEqual((counts.active, counts.parents), (1, 1))
+
+    def test_organization_counts_reconcile_missing_row(self):
+        """Test reconciling creates the counts row of an owner without one."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'test123',
+        )
+        models.Organization.objects.create(
+            name='Root', owner=user, email='root@example.com',
+        )
+        models.OrganizationCounts.objects.filter(owner=user).delete()
+
+        drifted = models.OrganizationCounts.reconcile([user.pk, 0])
+
+        self.assertEqual(drifted, {user.pk: ((0, 0), (1, 0))})
+        counts = models.OrganizationCounts.objects.get(owner=user)
+        self.assertEqual((counts.active, counts.parents), (1, 0))
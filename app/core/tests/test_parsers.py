@@ -0,0 +1,57 @@
+"""
+Tests for the API parsers.
+"""
+import io
+import math
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from core.parsers import ORJSONParser
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test ORJSONParser returns what JSONParser returns."""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body), 'application/json', {'encoding': encoding},
+        )
+
+    def assertSameResult(self, body, encoding='utf-8'):
+        expected = self.parse(JSONParser(), body, encoding)
+        actual = self.parse(ORJSONParser(), body, encoding)
+        self.assertEqual(actual, expected)
+        self.assertEqual(type(actual), type(expected))
+        return actual
+
+    def test_documents(self):
+        """Test objects, arrays, numbers and unicode strings."""
+        self.assertSameResult(
+            '{"a": [1, -2.5, true, null], "b": "é \\u2028 \U0001f600"}'.encode()
+        )
+        self.assertSameResult(b'{"a": 1, "a": 2}')
+
+    def test_large_integers_stay_exact(self):
+        """Test integers beyond 64 bits are not turned into floats."""
+        result = self.assertSameResult(b'[18446744073709551616, -9300000000000000000]')
+        self.assertEqual(result[0], 2 ** 64)
+
+    def test_lenient_inputs(self):
+        """Test inputs only the json module accepts still parse."""
+        self.assertSameResult(b'"\\ud800"')
+        self.assertTrue(math.isinf(self.assertSameResult(b'1e400')))
+        self.assertSameResult('{"a": "é"}'.encode('latin-1'), 'latin-1')
+
+    def test_errors(self):
+        """Test invalid documents raise the same ParseError."""
+        for body in (b'{"a": ', b'NaN', b'\xff'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as actual:
+                    self.parse(ORJSONParser(), body)
+                self.assertEqual(
+                    str(actual.exception), str(expected.exception),
+                )
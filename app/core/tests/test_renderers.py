@@ -0,0 +1,61 @@
+"""
+Tests for the API renderers.
+"""
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test ORJSONRenderer matches JSONRenderer byte for byte."""
+
+    def assertSameOutput(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        actual = ORJSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(actual, expected)
+
+    def test_primitives(self):
+        """Test nested containers of primitive values."""
+        self.assertSameOutput(OrderedDict([
+            ('b', [1, -2, True, False, None]),
+            ('a', {'nested': ('tuple', 'values')}),
+            ('text', 'é \u2028 \u2029 \x00 \x1f "\\/'),
+            ('emoji', '\U0001f600'),
+            (1, 'non-string key'),
+        ]))
+
+    def test_datetimes(self):
+        """Test datetimes, dates and times."""
+        utc = datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, datetime.timezone.utc)
+        offset = datetime.timezone(datetime.timedelta(hours=2))
+        self.assertSameOutput({
+            'utc': utc,
+            'whole_seconds': utc.replace(microsecond=0),
+            'offset': utc.astimezone(offset),
+            'naive': utc.replace(tzinfo=None),
+            'date': utc.date(),
+            'time': utc.time(),
+        })
+
+    def test_other_types(self):
+        """Test types encoded through the DRF encoder."""
+        self.assertSameOutput({
+            'decimal': decimal.Decimal('1.50'),
+            'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Not found.'),
+            'delta': datetime.timedelta(seconds=90),
+            'bytes': b'raw',
+        })
+
+    def test_fallbacks(self):
+        """Test output orjson cannot produce goes through JSONRenderer."""
+        self.assertSameOutput({'big': 2 ** 70})
+        self.assertSameOutput({'a': [1]}, 'application/json; indent=4')
+        self.assertEqual(ORJSONRenderer().render(None), b'')
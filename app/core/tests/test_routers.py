@@ -0,0 +1,236 @@
+"""
+Tests for read replica routing.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Organization
+from core.routers import PRIMARY, ReplicaRouter, routing
+from user.authentication import get_token_cache
+
+ORGANIZATION_URL = reverse('organizations:organization-list')
+ME_URL = reverse('user:me')
+
+# A second connection to the test database stands in for a replica. It is
+# registered on import so that the test runner sets it up with the rest.
+REPLICA = 'replica_test'
+connections.settings.setdefault(REPLICA, {**connections.settings[PRIMARY]})
+REPLICA_SETTINGS = {
+    'ALIASES': [REPLICA],
+    'STICKY_SECONDS': 5,
+    'CACHE_ALIAS': 'default',
+}
+
+
+@override_settings(READ_REPLICAS=REPLICA_SETTINGS)
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the router decisions."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_requests(self):
+        """Test reads go to the primary without a routing block."""
+        self.assertEqual(self.router.db_for_read(Organization), PRIMARY)
+
+    def test_reads_use_replica_when_allowed(self):
+        """Test reads go to a replica inside a replica routing block."""
+        with routing(use_replica=True):
+            self.assertEqual(self.router.db_for_read(Organization), REPLICA)
+        with routing(use_replica=False):
+            self.assertEqual(self.router.db_for_read(Organization), PRIMARY)
+
+    @override_settings(READ_REPLICAS={**REPLICA_SETTINGS, 'ALIASES': []})
+    def test_reads_use_primary_without_replicas(self):
+        """Test reads go to the primary when no replica is configured."""
+        with routing(use_replica=True):
+            self.assertEqual(self.router.db_for_read(Organization), PRIMARY)
+
+    def test_writes_use_primary_and_are_recorded(self):
+        """Test writes go to the primary and flag the routing state."""
+        with routing(use_replica=True) as state:
+            self.assertFalse(state.wrote)
+            self.assertEqual(self.router.db_for_write(Organization), PRIMARY)
+            self.assertTrue(state.wrote)
+
+    def test_replicas_are_not_migrated(self):
+        """Test migrations only run against the primary."""
+        self.assertFalse(self.router.allow_migrate(REPLICA, 'core'))
+        self.assertIsNone(self.router.allow_migrate(PRIMARY, 'core'))
+
+
+@override_settings(READ_REPLICAS=REPLICA_SETTINGS)
+class AsyncReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """Test the middleware in an async handler chain."""
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def test_async_chain_is_not_adapted(self):
+        """Test the middleware is a coroutine with an async get_response."""
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(asyncio.iscoroutinefunction(
+            ReplicaRoutingMiddleware(get_response),
+        ))
+
+    def test_async_write_pins_client(self):
+        """Test reads route and writes pin like the sync path."""
+        routes = []
+
+        async def get_response(request):
+            routes.append(self.router.db_for_read(Organization))
+            if request.method == 'POST':
+                self.router.db_for_write(Organization)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        credentials = {'HTTP_AUTHORIZATION': 'Token abc'}
+        async_to_sync(middleware)(self.factory.get('/', **credentials))
+        response = async_to_sync(middleware)(
+            self.factory.post('/', **credentials),
+        )
+        async_to_sync(middleware)(self.factory.get('/', **credentials))
+
+        self.assertEqual(routes, [REPLICA, PRIMARY, PRIMARY])
+        self.assertIn(ReplicaRoutingMiddleware.pin_cookie, response.cookies)
+
+
+@override_settings(READ_REPLICAS=REPLICA_SETTINGS)
+class ReplicaRoutingAPITests(TestCase):
+    """
+    Test request routing against a stand-in replica.
+
+    The replica is a second connection to the test database. Each test
+    runs in a transaction per connection, so rows written through the
+    primary stay invisible to the replica, as if replication lagged.
+    """
+    databases = {PRIMARY, REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def list_names(self):
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [org['name'] for org in response.json()]
+
+    def test_safe_requests_read_from_replica(self):
+        """Test a GET does not see rows missing from the replica."""
+        Organization.objects.create(owner=self.user, name='Lagging')
+
+        self.assertEqual(self.list_names(), [])
+
+    def test_reads_stick_to_primary_after_write(self):
+        """Test a client that wrote reads its own writes."""
+        Organization.objects.create(owner=self.user, name='Lagging')
+        response = self.client.post(
+            ORGANIZATION_URL, {'name': 'Created', 'email': 'org@example.com'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertCountEqual(self.list_names(), ['Lagging', 'Created'])
+
+    def test_pin_expires(self):
+        """Test reads return to the replica once the window has passed."""
+        self.client.post(
+            ORGANIZATION_URL, {'name': 'Created', 'email': 'org@example.com'},
+            format='json',
+        )
+        # Both pins have expired: the cache entry and the cookie.
+        cache.clear()
+        self.client.cookies.clear()
+
+        self.assertEqual(self.list_names(), [])
+
+    def test_other_clients_are_not_pinned(self):
+        """Test a write does not pin clients behind the same proxy."""
+        self.client.post(
+            ORGANIZATION_URL, {'name': 'Created', 'email': 'org@example.com'}, format='json',
+            REMOTE_ADDR='10.0.0.1',
+        )
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        Organization.objects.create(owner=other, name='Lagging')
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        client.force_authenticate(other)
+
+        response = client.get(ORGANIZATION_URL)
+
+        self.assertEqual(response.json(), [])
+
+    def test_credentials_pin_clients_without_cookies(self):
+        """Test a token client is pinned even if it drops the cookie."""
+        get_token_cache().clear()
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = client.post(
+            ORGANIZATION_URL, {'name': 'Created', 'email': 'org@example.com'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        client.cookies.clear()
+
+        response = client.get(ORGANIZATION_URL)
+
+        self.assertEqual(
+            [org['name'] for org in response.json()], ['Created'],
+        )
+
+    def test_new_token_found_on_primary(self):
+        """Test a token missing from the replica is looked up again."""
+        get_token_cache().clear()
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        response = client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unsafe_requests_use_primary(self):
+        """Test a PATCH sees rows not yet on the replica."""
+        org = Organization.objects.create(owner=self.user, name='Lagging')
+        url = reverse('organizations:organization-detail', args=[org.id])
+
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        org.refresh_from_db()
+        self.assertEqual(org.name, 'Renamed')
+
+    def test_user_update_pins_client(self):
+        """Test a write through the user endpoint pins the client too."""
+        Organization.objects.create(owner=self.user, name='Lagging')
+        response = self.client.patch(ME_URL, {'name': 'New'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.list_names(), ['Lagging'])
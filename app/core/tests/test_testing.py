@@ -0,0 +1,65 @@
+"""
+Tests for the query cost test helpers.
+"""
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase
+
+from core.models import Organization
+from core.testing import QueryCostMixin, create_organizations
+
+
+class QueryCostMixinTests(QueryCostMixin, TestCase):
+    """Test the query cost assertions."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def per_row(self, count):
+        for _ in range(count):
+            Organization.objects.exists()
+        return HttpResponse()
+
+    def test_constant_cost_passes(self):
+        """Test a call with the same cost at every scale passes."""
+        self.assertQueryCost(
+            lambda count: self.per_row(1), {1: 1, 10: 10}, max_queries=1,
+        )
+
+    def test_growing_cost_fails(self):
+        """Test a call whose queries grow with the data fails."""
+        with self.assertRaisesMessage(AssertionError, '{1: 1, 10: 10}'):
+            self.assertQueryCost(self.per_row, {1: 1, 10: 10})
+
+    def test_max_queries(self):
+        """Test a call over the query limit fails."""
+        with self.assertRaisesMessage(AssertionError, 'over 1'):
+            self.assertQueryCost(
+                lambda count: self.per_row(2), {1: 1}, max_queries=1,
+            )
+
+    def test_max_seconds(self):
+        """Test a call over the time limit fails."""
+        with self.assertRaisesMessage(AssertionError, 'at scale 1'):
+            self.assertQueryCost(
+                lambda count: self.per_row(1), {1: 1}, max_seconds=0,
+            )
+
+    def test_error_response_fails(self):
+        """Test an error response is not measured."""
+        with self.assertRaisesMessage(AssertionError, 'status 404'):
+            self.assertQueryCost(
+                lambda count: HttpResponse(status=404), {1: 1},
+            )
+
+    def test_create_organizations(self):
+        """Test the fixture builds a root with children and paths."""
+        root = create_organizations(self.user, 3)
+
+        children = Organization.objects.filter(parent=root)
+        self.assertEqual(children.count(), 2)
+        for child in children:
+            self.assertEqual(child.path, f'{root.id}/{child.id}/')
@@ -0,0 +1,74 @@
+"""
+Views for the core app.
+"""
+import hmac
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from core import metrics
+from core.db import pool
+
+
+def escape_label(value):
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n',
+    )
+
+
+def format_sample(name, labels, value):
+    """Return one sample line of the Prometheus text format."""
+    if labels:
+        pairs = ','.join(
+            f'{key}="{escape_label(label)}"' for key, label in labels
+        )
+        name = f'{name}{{{pairs}}}'
+    if float(value).is_integer():
+        value = int(value)
+    return f'{name} {value}'
+
+
+def render_metrics():
+    """Return every counter and pool gauge in the Prometheus text format."""
+    samples = defaultdict(list)
+    for (name, labels), value in sorted(metrics.registry.counters().items()):
+        samples[name].append((labels, value))
+
+    lines = []
+    for name, values in samples.items():
+        lines.append(f'# TYPE {name} counter')
+        lines += [format_sample(name, labels, value) for labels, value in values]
+
+    pools = sorted(pool.stats().items())
+    if pools:
+        lines.append('# TYPE db_pool_connections gauge')
+        for name, stats in pools:
+            for state in ('idle', 'in_use'):
+                lines.append(format_sample(
+                    'db_pool_connections',
+                    (('pool', name), ('state', state)),
+                    stats[state],
+                ))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Expose the in-process metrics for Prometheus to scrape.
+
+    Scrapers send INSTRUMENTATION['METRICS_TOKEN'] as "Authorization:
+    Bearer <token>"; staff users logged in to the admin may look too.
+    Everyone else is refused, including when no token is configured.
+    """
+    token = settings.INSTRUMENTATION['METRICS_TOKEN']
+    authorized = bool(token) and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}',
+    )
+    if not authorized and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,68 @@
+"""
+Async (ASGI-native) read views for the organizations API.
+
+Django 3.2 has no async ORM interface and its cache clients block, so
+both run in `sync_to_async` threads: the list cache lookup in the
+default executor, and database work, which needs Django's per-thread
+connections, in one thread-sensitive hop. A list served from the cache
+therefore costs one thread hop and no database query.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+
+from core.models import Organization
+from organizations import cache as list_cache
+from organizations import serializers
+from user.async_views import error_response, get_user_or_error, json_response
+
+
+def list_organizations(user):
+    queryset = Organization.objects.filter(owner=user).order_by('-id')
+    return serializers.OrganizationDetailSerializer(queryset, many=True).data
+
+
+def get_cached_list(owner_id, variant):
+    """Return (version, cached payload or None) of an owner's list."""
+    version = list_cache.get_version(owner_id)
+    return version, list_cache.get_payload(owner_id, version, variant)
+
+
+def build_list(user, version, variant):
+    """Query, serialize and cache the list of `user`."""
+    data = list_organizations(user)
+    list_cache.set_payload(user.pk, version, variant, data)
+    return data
+
+
+def retrieve_organization(user, pk):
+    organization = Organization.objects.filter(owner=user, pk=pk).first()
+    if organization is None:
+        return None
+    return serializers.OrganizationSerializer(organization).data
+
+
+async def organization_list(request):
+    """List the requester's organizations."""
+    user, error = await get_user_or_error(request)
+    if error is not None:
+        return error
+
+    variant = f'{request.build_absolute_uri()}|json'
+    version, data = await sync_to_async(
+        get_cached_list, thread_sensitive=False,
+    )(user.pk, variant)
+    if data is None:
+        data = await sync_to_async(build_list)(user, version, variant)
+    return json_response(data)
+
+
+async def organization_detail(request, pk):
+    """Return one of the requester's organizations."""
+    user, error = await get_user_or_error(request)
+    if error is not None:
+        return error
+
+    data = await sync_to_async(retrieve_organization)(user, pk)
+    if data is None:
+        return error_response(exceptions.NotFound())
+    return json_response(data)
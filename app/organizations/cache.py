@@ -0,0 +1,94 @@
+"""
+Versioned per-owner cache of organization list payloads.
+
+Each owner has a version number; cached list payloads are keyed by it.
+Writes bump the version instead of deleting entries, so a payload
+computed before a write can never be served after it. Old entries simply
+age out.
+
+That guarantee only holds across processes when the cache backing it is
+shared by all of them. With a per-process backend such as LocMemCache a
+version bump is invisible to the other workers, which keep serving their
+old payloads for up to `ORGANIZATION_LIST_CACHE['TTL']` seconds.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core import metrics
+
+
+def get_cache():
+    """Return the cache backing the organization list cache."""
+    return caches[settings.ORGANIZATION_LIST_CACHE['ALIAS']]
+
+
+def version_key(owner_id):
+    return f'org-list:version:{owner_id}'
+
+
+def entry_key(owner_id, version, variant):
+    digest = hashlib.md5(variant.encode()).hexdigest()
+    return f'org-list:{owner_id}:{version}:{digest}'
+
+
+def get_version(owner_id):
+    """Return the current list version of an owner."""
+    cache = get_cache()
+    key = version_key(owner_id)
+    # Seed missing versions with a clock value so an evicted version
+    # never restarts at a number that older entries were stored under.
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def bump_version(owner_id):
+    """Invalidate every cached list payload of an owner."""
+    cache = get_cache()
+    try:
+        cache.incr(version_key(owner_id))
+    except ValueError:
+        cache.add(version_key(owner_id), time.time_ns(), None)
+
+
+def invalidate(owner_id):
+    """
+    Bump the owner's version now and again once the transaction commits.
+
+    The second bump drops payloads that a concurrent reader built from
+    the pre-commit state after the first bump.
+    """
+    bump_version(owner_id)
+    transaction.on_commit(lambda: bump_version(owner_id))
+
+
+def get_payload(owner_id, version, variant):
+    """Return a cached payload or None, counting hits and misses."""
+    data = get_cache().get(entry_key(owner_id, version, variant))
+    metrics.increment(
+        'organization_list_cache_total',
+        result='miss' if data is None else 'hit',
+    )
+    return data
+
+
+def set_payload(owner_id, version, variant, data):
+    """Store a payload under the owner's version."""
+    get_cache().set(
+        entry_key(owner_id, version, variant),
+        data,
+        settings.ORGANIZATION_LIST_CACHE['TTL'],
+    )
+
+
+def hit_ratio():
+    """Return the hit ratio since the metrics were last reset."""
+    hits = metrics.registry.get('organization_list_cache_total', result='hit')
+    misses = metrics.registry.get(
+        'organization_list_cache_total', result='miss',
+    )
+    total = hits + misses
+    return hits / total if total else 0.0
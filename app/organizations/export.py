@@ -0,0 +1,63 @@
+"""
+Streaming encoders for exporting organizations.
+"""
+import csv
+import gzip
+import json
+
+from rest_framework.utils import encoders
+
+# Output name -> (content type, file extension).
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+# Keys of a dump line written by `export_organizations` and read back by
+# `import_organizations`; the owner travels as `owner_email`.
+DUMP_FIELDS = (
+    'id', 'parent_id', 'path', 'owner_email', 'name', 'description',
+    'email', 'is_parent', 'is_active', 'created_at', 'updated_at',
+)
+
+
+def open_dump(path, mode='r'):
+    """
+    Open an NDJSON dump as text, gzip compressed if `path` ends in .gz.
+
+    When reading, gzip is detected from the file contents instead.
+    """
+    if 'r' in mode:
+        with open(path, 'rb') as dump:
+            compressed = dump.read(2) == b'\x1f\x8b'
+    else:
+        compressed = path.endswith('.gz')
+    if compressed:
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Echo:
+    """File-like object that returns what is written instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(rows):
+    """Yield one JSON document per row, newline terminated."""
+    for row in rows:
+        yield json.dumps(
+            row,
+            cls=encoders.JSONEncoder,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ) + '\n'
+
+
+def iter_csv(rows, fieldnames):
+    """Yield a CSV header line followed by one line per row."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fieldnames)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fieldnames])
@@ -0,0 +1,232 @@
+"""
+Filter backends for the organizations API.
+"""
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db.models import F, Q
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from core.models import email_domain
+
+
+class OrganizationSearchFilter(BaseFilterBackend):
+    """
+    Ranked search over name, email and description with `?search=`.
+
+    Rows match when the stored search vector matches the web-search style
+    query, or when the name is trigram-similar to it, so both indexes can
+    be combined in one bitmap scan. Results are ordered by relevance and
+    capped at `max_results`; they are not cursor-paginated. Only the
+    `list` action is searched.
+    """
+    search_param = 'search'
+    search_config = 'english'
+    max_results = 100
+
+    def get_search_term(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def is_active(self, request, view):
+        """Return whether the request asks for search results."""
+        return view.action == 'list' and bool(self.get_search_term(request))
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_active(request, view):
+            return queryset
+        term = self.get_search_term(request)
+        query = SearchQuery(
+            term, search_type='websearch', config=self.search_config,
+        )
+        return queryset.filter(
+            Q(search_vector=query) | Q(name__trigram_similar=term),
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            similarity=TrigramSimilarity('name', term),
+        ).order_by('-rank', '-similarity', '-id')[:self.max_results]
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': (
+                'Ranked full-text search over name, email and description, '
+                'with fuzzy matching on the name.'
+            ),
+            'schema': {'type': 'string'},
+        }]
+
+
+class OrganizationFilter(BaseFilterBackend):
+    """
+    Whitelisted filters and orderings for the organization list.
+
+    Supports `is_parent`, `email_domain`, a `created_after` /
+    `created_before` range and `?ordering=` by `id` or `created_at`.
+    Every accepted combination is served by an index led by the owner
+    that either follows with the `is_active` flag the default manager
+    filters on or only covers active rows (see
+    `Organization.Meta.indexes`), with the equality filters next and the
+    ordering column last; a range is only accepted on the ordering
+    column. Other combinations are refused with a 400 rather
+    than scanning all of the owner's rows. Only the `list` action is
+    filtered.
+    """
+    ordering_param = 'ordering'
+    default_ordering = '-id'
+    # Ordering key -> order_by() columns; ties are broken by id.
+    orderings = {
+        'id': ('id',),
+        'created_at': ('created_at', 'id'),
+    }
+    boolean_filters = ('is_parent',)
+    range_filters = {
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lt',
+    }
+    # (equality filters, ordering key) -> supporting index.
+    indexed = {
+        (frozenset(), 'id'): 'org_owner_active_id_idx',
+        (frozenset({'is_parent'}), 'id'): 'org_owner_flags_id_idx',
+        (frozenset({'email_domain'}), 'id'): 'org_owner_active_domain_idx',
+        (frozenset(), 'created_at'): 'org_owner_active_created_idx',
+    }
+
+    def is_active(self, request, view):
+        return view.action == 'list'
+
+    def get_filters(self, request):
+        """Return (equality filters, range lookups) from the query."""
+        params = request.query_params
+        errors = {}
+        equal = {}
+        for name in self.boolean_filters:
+            if name in params:
+                try:
+                    equal[name] = serializers.BooleanField().to_internal_value(
+                        params[name],
+                    )
+                except serializers.ValidationError as exc:
+                    errors[name] = exc.detail
+        if 'email_domain' in params:
+            domain = params['email_domain'].strip().lower()
+            if domain:
+                equal['email_domain'] = domain
+            else:
+                errors['email_domain'] = [_('This field may not be blank.')]
+
+        ranges = {}
+        for name, lookup in self.range_filters.items():
+            if name in params:
+                try:
+                    ranges[lookup] = (
+                        serializers.DateTimeField().to_internal_value(
+                            params[name],
+                        )
+                    )
+                except serializers.ValidationError as exc:
+                    errors[name] = exc.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return equal, ranges
+
+    def get_ordering_key(self, request, ranges):
+        """Return the requested ordering, e.g. '-created_at'."""
+        value = request.query_params.get(self.ordering_param, '').strip()
+        if not value:
+            # A created_at range is only indexed in created_at order.
+            return '-created_at' if ranges else self.default_ordering
+        if value.lstrip('-') not in self.orderings:
+            raise serializers.ValidationError({self.ordering_param: [
+                _('Unsupported ordering. Use one of: {keys}.').format(
+                    keys=', '.join(self.orderings),
+                ),
+            ]})
+        return value
+
+    def get_ordering(self, request, queryset, view):
+        """Return the order_by() columns; used by the cursor paginator."""
+        if not self.is_active(request, view):
+            return (self.default_ordering,)
+        _equal, ranges = self.get_filters(request)
+        key = self.get_ordering_key(request, ranges)
+        prefix = '-' if key.startswith('-') else ''
+        return tuple(
+            prefix + column for column in self.orderings[key.lstrip('-')]
+        )
+
+    def check_indexed(self, equal, ranges, key):
+        """Refuse a combination that no index serves."""
+        ordering = key.lstrip('-')
+        range_ok = all(
+            lookup.split('__')[0] == ordering for lookup in ranges
+        )
+        if range_ok and (frozenset(equal), ordering) in self.indexed:
+            return
+        supported = '; '.join(
+            ' + '.join(sorted(filters) + [f'ordering={ordering}'])
+            for filters, ordering in self.indexed
+        )
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [_(
+                'This combination of filters and ordering is not '
+                'supported. Supported combinations: {supported}. A '
+                'created_at range requires ordering by created_at.'
+            ).format(supported=supported)],
+        })
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_active(request, view):
+            return queryset
+        equal, ranges = self.get_filters(request)
+        searching = OrganizationSearchFilter().is_active(request, view)
+        if searching:
+            # Search results are ranked and capped; the GIN indexes
+            # bound the scan, so only the filters apply.
+            if self.ordering_param in request.query_params:
+                raise serializers.ValidationError({self.ordering_param: [
+                    _('Search results are ordered by relevance.'),
+                ]})
+        else:
+            key = self.get_ordering_key(request, ranges)
+            self.check_indexed(equal, ranges, key)
+
+        if 'email_domain' in equal:
+            queryset = queryset.alias(email_domain=email_domain())
+        queryset = queryset.filter(**equal, **ranges)
+        if searching:
+            return queryset
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            (name, {'type': 'boolean'}, f'Only organizations with this {name}.')
+            for name in self.boolean_filters
+        ]
+        parameters += [
+            ('email_domain', {'type': 'string'},
+             'Only organizations whose email is at this domain.'),
+            ('created_after', {'type': 'string', 'format': 'date-time'},
+             'Only organizations created at or after this time.'),
+            ('created_before', {'type': 'string', 'format': 'date-time'},
+             'Only organizations created before this time.'),
+            (self.ordering_param, {'type': 'string'},
+             'One of id, -id, created_at, -created_at. Defaults to -id, '
+             'or -created_at with a created_at range.'),
+        ]
+        return [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'description': description,
+                'schema': schema,
+            }
+            for name, schema, description in parameters
+        ]
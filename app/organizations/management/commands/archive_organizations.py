@@ -0,0 +1,126 @@
+"""
+Command file
+Django command to move long-inactive organizations to the archive table
+"""
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import ArchivedOrganization, Organization
+
+# Moves one batch of inactive leaves. Organizations that still have
+# children in the hot table are skipped: the parent FK would block their
+# delete. Their children go first, so a stale subtree drains bottom-up
+# over successive batches.
+ARCHIVE_SQL = """
+WITH batch AS (
+    SELECT o.id
+    FROM {organizations} AS o
+    WHERE NOT o.is_active
+      AND COALESCE(o.updated_at, o.created_at) < %s
+      AND NOT EXISTS (
+          SELECT 1 FROM {organizations} AS c WHERE c.parent_id = o.id
+      )
+    ORDER BY o.id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+), moved AS (
+    DELETE FROM {organizations} AS o
+    USING batch
+    WHERE o.id = batch.id
+    RETURNING {returning}
+)
+INSERT INTO {archive} ({columns}, archived_at)
+SELECT {columns}, now() FROM moved
+"""
+
+
+class Command(BaseCommand):
+    """
+    Django command to archive soft-deleted organizations.
+
+    Organizations inactive for longer than `--days` are moved, in
+    batches of `--batch-size` each in its own transaction, from the
+    organization table to `ArchivedOrganization`, keeping the hot table
+    and its indexes small. Rows locked by other transactions are left
+    for the next run.
+    """
+    help = 'Move organizations inactive for --days to the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Archive organizations inactive for this many days.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Organizations moved per transaction.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many organizations are due.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        due = Organization.all_objects.alias(
+            changed_at=Coalesce('updated_at', 'created_at'),
+        ).filter(is_active=False, changed_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'{due.count()} organizations due for archival.')
+            return
+
+        using = router.db_for_write(Organization)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        columns = ', '.join(
+            quote(field.column)
+            for field in ArchivedOrganization._meta.concrete_fields
+            if field.name != 'archived_at'
+        )
+        sql = ARCHIVE_SQL.format(
+            organizations=quote(Organization._meta.db_table),
+            archive=quote(ArchivedOrganization._meta.db_table),
+            columns=columns,
+            returning=', '.join(
+                f'o.{column}' for column in columns.split(', ')
+            ),
+        )
+
+        total = 0
+        while True:
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [cutoff, options['batch_size']])
+                    moved = cursor.rowcount
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Archived {total} organizations...')
+
+        # Rows left over either still have children or were skipped as
+        # locked by another transaction.
+        remaining = due.using(using).count()
+        parents = due.using(using).filter(Exists(
+            Organization.all_objects.filter(parent=OuterRef('pk')),
+        )).count()
+        locked = max(remaining - parents, 0)
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} organizations.'
+        ))
+        if parents:
+            self.stdout.write(
+                f'{parents} inactive organizations were kept '
+                f'because they still have children in the organization '
+                f'table.'
+            )
+        if locked:
+            self.stdout.write(
+                f'{locked} inactive organizations were locked '
+                f'by other transactions and are left for the next run.'
+            )
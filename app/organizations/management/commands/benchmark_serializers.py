@@ -0,0 +1,105 @@
+"""
+Command file
+Django command to compare the organization serialization paths
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Organization
+from core.renderers import ORJSONRenderer
+from organizations.serializers import (
+    OrganizationDetailSerializer,
+    ValuesSerializer,
+)
+
+
+def render_model_serializer(queryset):
+    """Serialize and render like the regular list view."""
+    data = OrganizationDetailSerializer(queryset, many=True).data
+    return JSONRenderer().render(data)
+
+
+def render_values_serializer(queryset):
+    """Serialize and render through the `.values()` fast path."""
+    serializer = ValuesSerializer(OrganizationDetailSerializer())
+    data = serializer.to_representation(serializer.get_values(queryset))
+    return ORJSONRenderer().render(data)
+
+
+class Command(BaseCommand):
+    """
+    Django command to benchmark list serialization of organizations.
+
+    For each size it inserts that many organizations for a throwaway
+    owner, times both serialization paths end to end (query, serialize,
+    render) and checks that they produce identical bytes. Every row is
+    rolled back afterwards.
+    """
+    help = 'Compare ModelSerializer and .values() list serialization.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Numbers of organizations to serialize.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Runs per size and path; the best run is reported.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        with transaction.atomic():
+            owner = get_user_model().objects.create(
+                email='benchmark-serializers@example.com',
+            )
+            created = 0
+            for size in sorted(options['sizes']):
+                Organization.objects.bulk_create(
+                    [
+                        Organization(
+                            owner=owner,
+                            name=f'Organization {n}',
+                            email=f'org{n}@example.com',
+                            description='Benchmark organization. ' * 8,
+                        )
+                        for n in range(created, size)
+                    ],
+                    batch_size=5000,
+                )
+                created = max(created, size)
+                queryset = Organization.objects.filter(
+                    owner=owner,
+                ).order_by('-id')[:size]
+                self.report(size, queryset, options['repeat'])
+            transaction.set_rollback(True)
+
+    def time_best(self, render, queryset, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = render(queryset.all())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def report(self, size, queryset, repeat):
+        slow, expected = self.time_best(
+            render_model_serializer, queryset, repeat,
+        )
+        fast, actual = self.time_best(
+            render_values_serializer, queryset, repeat,
+        )
+        if actual != expected:
+            raise CommandError(f'Outputs differ at {size} rows.')
+        self.stdout.write(
+            f'{size:>8} rows  '
+            f'serializer {slow * 1000:9.1f} ms  '
+            f'values {fast * 1000:9.1f} ms  '
+            f'speedup {slow / fast:5.1f}x  '
+            f'{len(actual)} bytes'
+        )
@@ -0,0 +1,103 @@
+"""
+Command file
+Django command to dump organizations to an NDJSON file
+"""
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from core.models import Organization
+from organizations.export import DUMP_FIELDS, iter_ndjson, open_dump
+
+
+def iter_rows(queryset, using, chunk_size):
+    """
+    Yield the rows of a `.values()` queryset in byte-wise `path` order.
+
+    Every path sorts before the paths of its descendants, so a parent is
+    always written, and imported, before its children. `ORDER BY path
+    USING ~<~` is what the text_pattern_ops path index can serve, but the
+    ORM cannot express it, so the query runs on a server-side cursor
+    directly. Call inside a transaction: the cursor is then not declared
+    WITH HOLD and PostgreSQL streams it instead of materializing it.
+    """
+    connection = connections[using]
+    sql, params = queryset.order_by().query.get_compiler(using).as_sql()
+    quote = connection.ops.quote_name
+    sql = (
+        f'{sql} ORDER BY {quote(Organization._meta.db_table)}.'
+        f'{quote("path")} USING ~<~'
+    )
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchmany(chunk_size)
+        # A named cursor only has a description after the first fetch.
+        columns = [column[0] for column in cursor.description or ()]
+        while rows:
+            for row in rows:
+                yield dict(zip(columns, row))
+            rows = cursor.fetchmany(chunk_size)
+
+
+class Command(BaseCommand):
+    """
+    Django command to export organizations for `import_organizations`.
+
+    Rows are read as plain values through a server-side cursor in
+    `--batch-size` chunks and written one compact JSON document per
+    line, gzip compressed when the output path ends in .gz, so memory
+    stays flat however many rows there are. Parents come before their
+    children. Owners are written by email, since user ids differ between
+    environments.
+    """
+    help = 'Export organizations as NDJSON, to a file or stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Output file; .gz compresses. Defaults to stdout.',
+        )
+        parser.add_argument(
+            '--owner', action='append', default=[],
+            help='Only export organizations of this owner email. Repeatable.',
+        )
+        parser.add_argument(
+            '--include-inactive', action='store_true',
+            help='Also export soft-deleted organizations.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Rows fetched from the database at a time.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        manager = Organization.objects
+        if options['include_inactive']:
+            manager = Organization.all_objects
+        queryset = manager.all()
+        if options['owner']:
+            queryset = queryset.filter(owner__email__in=options['owner'])
+        queryset = queryset.values(
+            *(field for field in DUMP_FIELDS if field != 'owner_email'),
+            owner_email=F('owner__email'),
+        )
+
+        to_stdout = options['output'] == '-'
+        log = self.stderr if to_stdout else self.stdout
+        using = router.db_for_read(Organization)
+        count = 0
+        with transaction.atomic(using=using):
+            rows = iter_rows(queryset, using, options['batch_size'])
+            if to_stdout:
+                for line in iter_ndjson(rows):
+                    self.stdout.write(line, ending='')
+                    count += 1
+            else:
+                with open_dump(options['output'], 'w') as output:
+                    for line in iter_ndjson(rows):
+                        output.write(line)
+                        count += 1
+                        if not count % 100000:
+                            log.write(f'Exported {count} organizations...')
+        log.write(self.style.SUCCESS(f'Exported {count} organizations.'))
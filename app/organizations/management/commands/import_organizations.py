@@ -0,0 +1,277 @@
+"""
+Command file
+Django command to load organizations from an export_organizations dump
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models.sql import InsertQuery
+from django.utils.dateparse import parse_datetime
+
+from core.models import Organization, OrganizationCounts
+from organizations import cache as list_cache
+from organizations.export import DUMP_FIELDS, open_dump
+
+
+def read_dump(path):
+    """Yield (line number, row dict) for every line of a dump."""
+    with open_dump(path) as dump:
+        for line_number, line in enumerate(dump, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'Line {line_number}: {exc}.')
+            missing = set(DUMP_FIELDS) - set(row)
+            if missing:
+                raise CommandError(
+                    f"Line {line_number}: missing {', '.join(sorted(missing))}."
+                )
+            yield line_number, row
+
+
+def insert(organizations, using):
+    """
+    INSERT `organizations` as they are, like loaddata's raw saves.
+
+    Unlike bulk_create() this skips pre_save(), so auto_now and
+    auto_now_add leave the loaded timestamps alone.
+    """
+    query = InsertQuery(Organization)
+    query.insert_values(
+        Organization._meta.concrete_fields, organizations, raw=True,
+    )
+    query.get_compiler(using).execute_sql()
+
+
+def allocate_ids(connection, count):
+    """Return `count` fresh organization ids from the id sequence."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [Organization._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    """
+    Django command to import a dump written by `export_organizations`.
+
+    Owners are matched by email: a first pass over the file collects the
+    emails and resolves them all with one query, and the import stops
+    before writing anything if one is unknown. The second pass streams
+    the rows into raw INSERTs of `--batch-size` rows. The dump lists
+    parents before children, so every batch only refers to parents that
+    are already written.
+
+    Organizations keep their ids, paths and timestamps. The first pass
+    also checks, one query per batch, that none of the ids is used here
+    by a different organization, one with another owner or path. With
+    `--new-ids` the rows get fresh ids from the sequence instead and
+    `parent_id` and `path` are rewritten to match, so a dump can be
+    merged into a database that already has organizations; the old ->
+    new id map then grows with the number of rows.
+
+    Each batch is committed on its own together with its owners' counts
+    and, unless new ids are assigned, the id sequence. Rows already
+    imported by an interrupted run are skipped, so running the import
+    again resumes it. A `--new-ids` import cannot tell its earlier rows
+    apart and would import them a second time.
+    """
+    help = 'Import organizations from an export_organizations dump.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Dump file, optionally gzipped.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows written per INSERT.',
+        )
+        parser.add_argument(
+            '--new-ids', action='store_true',
+            help='Give the rows new ids instead of keeping the dumped ones.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        path = options['path']
+        self.batch_size = options['batch_size']
+        self.new_ids = {} if options['new_ids'] else None
+        self.using = router.db_for_write(Organization)
+        try:
+            owners = self.check_dump(path)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc.strerror}.')
+
+        self.imported = self.skipped = 0
+        batch = []
+        for line_number, row in read_dump(path):
+            batch.append((line_number, row))
+            if len(batch) >= self.batch_size:
+                self.write(batch, owners)
+                batch = []
+        if batch:
+            self.write(batch, owners)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} organizations.'
+        ))
+        if self.skipped:
+            self.stdout.write(
+                f'Skipped {self.skipped} organizations imported before.'
+            )
+
+    def check_dump(self, path):
+        """
+        Return owner email -> user id for every owner in the dump.
+
+        Unless new ids are assigned, also refuse a dump whose ids are
+        used by other organizations here.
+        """
+        emails = set()
+        rows = []
+        conflicts = []
+        for _line_number, row in read_dump(path):
+            emails.add(row['owner_email'])
+            if self.new_ids is not None:
+                continue
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                conflicts += self.get_conflicts(rows)
+                rows = []
+        conflicts += self.get_conflicts(rows)
+        if conflicts:
+            raise CommandError(
+                f'{len(conflicts)} organization ids are used by other '
+                f'organizations here: {self.summarize(sorted(conflicts))}. '
+                f'Pass --new-ids to import the organizations under new ids.'
+            )
+
+        owners = dict(
+            get_user_model().objects.using(self.using).filter(
+                email__in=emails,
+            ).values_list('email', 'pk')
+        )
+        unknown = sorted(emails - set(owners))
+        if unknown:
+            raise CommandError(
+                f'{len(unknown)} owners do not exist here: '
+                f'{self.summarize(unknown)}. Create them first, e.g. with '
+                f'import_users.'
+            )
+        return owners
+
+    def get_conflicts(self, rows):
+        """
+        Return the ids of `rows` taken here by another organization.
+
+        A stored row with the dumped owner and path was written by an
+        earlier run of the same import and is not a conflict.
+        """
+        if not rows:
+            return []
+        stored = {
+            pk: (owner_email, path)
+            for pk, owner_email, path in Organization.all_objects.using(
+                self.using,
+            ).filter(
+                pk__in=[row['id'] for row in rows],
+            ).values_list('pk', 'owner__email', 'path')
+        }
+        conflicts = []
+        for row in rows:
+            dumped = (row['owner_email'], row['path'])
+            if stored.get(row['id'], dumped) != dumped:
+                conflicts.append(row['id'])
+        return conflicts
+
+    @staticmethod
+    def summarize(values):
+        """Return the first ten values, then how many more there are."""
+        shown = ', '.join(str(value) for value in values[:10])
+        if len(values) > 10:
+            shown += f' and {len(values) - 10} more'
+        return shown
+
+    def build(self, line_number, row, owners, new_id):
+        """Return the Organization for one dump row."""
+        ids = self.new_ids
+        organization_id = row['id']
+        parent_id = row['parent_id']
+        path = row['path']
+        if ids is not None:
+            try:
+                parent_id = parent_id and ids[parent_id]
+                path = ''.join(
+                    f'{ids[int(ancestor)]}/'
+                    for ancestor in path.split('/')[:-2]
+                ) + f'{new_id}/'
+            except KeyError as exc:
+                raise CommandError(
+                    f'Line {line_number}: organization {exc.args[0]} is not '
+                    f'earlier in the dump, so its new id is unknown.'
+                )
+            ids[organization_id] = organization_id = new_id
+        return Organization(
+            id=organization_id,
+            parent_id=parent_id,
+            path=path,
+            owner_id=owners[row['owner_email']],
+            name=row['name'],
+            description=row['description'],
+            email=row['email'],
+            is_parent=row['is_parent'],
+            is_active=row['is_active'],
+            created_at=parse_datetime(row['created_at']),
+            updated_at=row['updated_at'] and parse_datetime(
+                row['updated_at'],
+            ),
+        )
+
+    def write(self, rows, owners):
+        """Insert one batch of (line number, row) in its own transaction."""
+        with transaction.atomic(using=self.using):
+            if self.new_ids is not None:
+                new_ids = allocate_ids(connections[self.using], len(rows))
+            else:
+                taken = set(Organization.all_objects.using(self.using).filter(
+                    pk__in=[row['id'] for _line_number, row in rows],
+                ).values_list('pk', flat=True))
+                rows = [
+                    (line_number, row) for line_number, row in rows
+                    if row['id'] not in taken
+                ]
+                self.skipped += len(taken)
+                new_ids = [None] * len(rows)
+            batch = [
+                self.build(line_number, row, owners, new_id)
+                for (line_number, row), new_id in zip(rows, new_ids)
+            ]
+            if not batch:
+                return
+            insert(batch, self.using)
+            # The raw INSERT bypasses the counting in save().
+            OrganizationCounts.add(
+                OrganizationCounts.deltas(batch), using=self.using,
+            )
+            if self.new_ids is None:
+                self.reset_sequence()
+            for owner_id in {organization.owner_id for organization in batch}:
+                list_cache.invalidate(owner_id)
+        count = self.imported
+        self.imported += len(batch)
+        if self.imported // 100000 > count // 100000:
+            self.stdout.write(f'Imported {self.imported} organizations...')
+
+    def reset_sequence(self):
+        """Move the id sequence past the imported ids."""
+        connection = connections[self.using]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [Organization],
+            ):
+                cursor.execute(sql)
@@ -0,0 +1,54 @@
+"""
+Command file
+Django command to repair drift in the per-owner organization counts
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.models import OrganizationCounts
+
+
+class Command(BaseCommand):
+    """
+    Django command to recount every owner's organizations.
+
+    Owners are walked in id order, `--batch-size` at a time; each batch
+    is recounted from the organization table and its drifted counts rows
+    are overwritten in one transaction (see
+    `OrganizationCounts.reconcile`). Safe to run while the API is
+    serving writes.
+    """
+    help = 'Recount organizations per owner and repair drifted counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Owners recounted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        users = get_user_model().objects.order_by('pk')
+        checked = repaired = 0
+        last_id = None
+        while True:
+            batch = users.values_list('pk', flat=True)
+            if last_id is not None:
+                batch = batch.filter(pk__gt=last_id)
+            owner_ids = list(batch[:options['batch_size']])
+            if not owner_ids:
+                break
+            last_id = owner_ids[-1]
+            drifted = OrganizationCounts.reconcile(owner_ids)
+            checked += len(owner_ids)
+            repaired += len(drifted)
+            if options['verbosity'] < 2:
+                continue
+            for owner_id, (stored, actual) in sorted(drifted.items()):
+                self.stdout.write(
+                    f'Owner {owner_id}: active {stored[0]} -> {actual[0]}, '
+                    f'parents {stored[1]} -> {actual[1]}.'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} owners, repaired {repaired}.'
+        ))
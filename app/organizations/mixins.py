@@ -0,0 +1,141 @@
+"""
+View mixins for the organizations API.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from organizations import cache as list_cache
+from organizations.serializers import ValuesSerializer
+
+
+class ConditionalGetMixin:
+    """
+    Serve `list` with an ETag and `retrieve` with ETag and Last-Modified.
+
+    The validators come from aggregates over `updated_at` instead of the
+    rendered body, so a request whose If-None-Match or If-Modified-Since
+    still matches gets a 304 without the organizations being fetched or
+    serialized.
+
+    The list has no Last-Modified: the newest timestamp of the rows still
+    listed does not move when a row is deleted, or when rows with older
+    timestamps are imported, so If-Modified-Since would answer 304 for a
+    list that changed.
+    """
+
+    def make_etag(self, *parts):
+        """Return a quoted ETag scoped to the requester and query."""
+        request = self.request
+        key = repr((
+            request.user.pk,
+            request.get_full_path(),
+            request.accepted_renderer.format,
+        ) + parts)
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def get_list_validators(self):
+        """Return (etag, None) for the list endpoint."""
+        # The count catches deletes, the max id inserts and the max
+        # timestamp updates. This aggregate reads every active row of the
+        # owner (an index-only scan at best) and runs on every list
+        # request, before the payload cache is consulted.
+        aggregate = self.get_queryset().aggregate(
+            count=Count('id'),
+            max_id=Max('id'),
+            last_modified=Max(Coalesce('updated_at', 'created_at')),
+        )
+        etag = self.make_etag(
+            aggregate['count'], aggregate['max_id'], aggregate['last_modified'],
+        )
+        return etag, None
+
+    def get_retrieve_validators(self):
+        """Return (etag, last_modified) for the detail endpoint."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = self.get_queryset().filter(**{
+            self.lookup_field: self.kwargs[lookup_url_kwarg],
+        }).values_list(
+            Coalesce('updated_at', 'created_at'), flat=True,
+        ).first()
+        if last_modified is None:
+            raise NotFound()
+        return self.make_etag(last_modified), last_modified
+
+    def conditional_response(self, request, validators, view, *args, **kwargs):
+        """Return a 304 if the validators match, else the full response."""
+        etag, last_modified = validators
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp,
+        )
+        if response is None:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_list_validators(), super().list,
+            *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_retrieve_validators(), super().retrieve,
+            *args, **kwargs
+        )
+
+
+class CachedListMixin:
+    """
+    Serve `list` from the versioned per-owner payload cache.
+
+    Entries are keyed by the full request URI and the renderer, so each
+    page, filter and format is cached separately.
+    """
+
+    def list(self, request, *args, **kwargs):
+        owner_id = request.user.pk
+        variant = (
+            f'{request.build_absolute_uri()}|{request.accepted_renderer.format}'
+        )
+        version = list_cache.get_version(owner_id)
+        data = list_cache.get_payload(owner_id, version, variant)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            list_cache.set_payload(owner_id, version, variant, response.data)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Serve `list` through `ValuesSerializer` instead of the ModelSerializer.
+
+    The response data is identical to the regular `list`, so pagination,
+    caching and every renderer behave the same; only the cost of building
+    it changes.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = ValuesSerializer(self.get_serializer())
+        queryset = serializer.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(queryset))
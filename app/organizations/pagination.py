@@ -0,0 +1,27 @@
+"""
+Pagination for the organizations API.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class OrganizationCursorPagination(CursorPagination):
+    """
+    Opaque-cursor keyset pagination over the `-id` ordering.
+
+    Pages are fetched with `WHERE id < <cursor>` instead of an OFFSET, so
+    the cost of a page does not grow with its depth. Pagination is opt-in:
+    it only applies when the client sends `page_size` or `cursor`, so the
+    plain list response is unchanged for existing clients.
+    """
+    ordering = '-id'
+    page_size = None
+    default_page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped at `max_page_size`."""
+        page_size = super().get_page_size(request)
+        if page_size is None and self.cursor_query_param in request.query_params:
+            return self.default_page_size
+        return page_size
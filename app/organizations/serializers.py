@@ -1,14 +1,123 @@
 """
 Serializer for the Organization model.
 """
+import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.translation import gettext as _
 from rest_framework import serializers
-from core.models import Organization
+from rest_framework.settings import ISO_8601, api_settings
+from core.instrumentation import TimedSerializerMixin, timed
+from core.models import Organization, OrganizationCounts
+
+
+class OrganizationListSerializer(
+    TimedSerializerMixin, serializers.ListSerializer,
+):
+    """
+    List serializer that writes organizations in bulk.
+
+    `create` issues a single `bulk_create` and `update` a single
+    `bulk_update`; the caller is expected to wrap `save()` in a
+    transaction. For updates, `instance` must be a list aligned
+    index-by-index with the submitted data.
+    """
+    max_length = 1000
+
+    def to_internal_value(self, data):
+        """Reject oversized batches before validating any item."""
+        if isinstance(data, list) and len(data) > self.max_length:
+            message = _(
+                'Ensure this list has no more than {max_length} items.'
+            ).format(max_length=self.max_length)
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='max_length')
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        """Create and return organizations with one INSERT."""
+        model = self.child.Meta.model
+        organizations = model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data]
+        )
+        # bulk_create() bypasses save(), so count the new rows here.
+        OrganizationCounts.add(OrganizationCounts.deltas(organizations))
+        # bulk_create() bypasses save(), so build the paths here now that
+        # the ids are known. Parents always exist before the batch.
+        parent_paths = dict(model.objects.filter(
+            pk__in={organization.parent_id for organization in organizations},
+        ).values_list('pk', 'path'))
+        for organization in organizations:
+            parent_path = parent_paths.get(organization.parent_id, '')
+            organization.path = f'{parent_path}{organization.pk}/'
+            organization._loaded_parent_id = organization.parent_id
+        model.objects.bulk_update(organizations, ['path'])
+        return organizations
+
+    def update(self, instance, validated_data):
+        """Update and return organizations with one UPDATE."""
+        # bulk_update() skips auto_now, so stamp updated_at here.
+        now = timezone.now()
+        fields = {'updated_at'}
+        moved = []
+        for organization, attrs in zip(instance, validated_data):
+            parent_id = organization.parent_id
+            for attr, value in attrs.items():
+                setattr(organization, attr, value)
+                fields.add(attr)
+            organization.updated_at = now
+            if organization.parent_id != parent_id:
+                moved.append(organization)
+        self.child.Meta.model.objects.bulk_update(instance, fields)
+        # Re-rooting rewrites whole subtrees, so it goes one move at a
+        # time; each move sees the paths left by the previous one.
+        try:
+            for organization in moved:
+                organization.update_path()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(
+                serializers.as_serializer_error(exc)
+            )
+        return instance
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OwnedOrganizationField(serializers.PrimaryKeyRelatedField):
+    """Primary key field limited to the requester's organizations."""
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Organization.objects.none()
+        return Organization.objects.filter(owner=request.user)
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin that renders only the fields named in `fields`.
+
+    Pass `fields=[...]` when instantiating; by default every field is
+    rendered. Unknown names are ignored here and should be rejected by
+    the caller.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class OrganizationSerializer(
+    TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer,
+):
     """
     Serializer for the Organization model.
     """
+    parent = OwnedOrganizationField(allow_null=True, required=False)
+
     class Meta:
         model = Organization
         fields = (
@@ -16,6 +125,7 @@ class OrganizationSerializer(serializers.ModelSerializer):
             'name',
             'email',
             'description',
+            'parent',
             'created_at',
             'updated_at',
         )
@@ -23,6 +133,18 @@ class OrganizationSerializer(serializers.ModelSerializer):
             'id',
             'created_at',
         )
+        list_serializer_class = OrganizationListSerializer
+
+    def validate_parent(self, parent):
+        """Reject parents that would put the organization in a cycle."""
+        instance = self.instance
+        if not isinstance(instance, Organization) or parent is None:
+            return parent
+        if parent.is_descendant_of(instance):
+            raise serializers.ValidationError(
+                _('An organization cannot be its own ancestor.')
+            )
+        return parent
 
 
 class OrganizationDetailSerializer(OrganizationSerializer):
@@ -34,3 +156,110 @@ class OrganizationDetailSerializer(OrganizationSerializer):
             'is_parent',
             'is_active',
         )
+
+
+class OrganizationCountsSerializer(serializers.ModelSerializer):
+    """Serializer for an owner's organization counts."""
+
+    class Meta:
+        model = OrganizationCounts
+        fields = ('active', 'parents')
+        read_only_fields = fields
+
+
+def datetime_converter(field):
+    """
+    Return a fast equivalent of `field.to_representation` for datetimes.
+
+    DRF resolves the current timezone for every value; this resolves it
+    once. Anything other than aware datetimes in ISO 8601 output goes
+    through the field itself.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    if output_format is None or field_timezone is None:
+        return field.to_representation
+    if output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime.datetime) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path producing the output of a ModelSerializer.
+
+    Rows are read with `.values()` and converted column by column, which
+    skips DRF's per-field attribute lookup and bound-field machinery. The
+    result is the same list of dicts the wrapped serializer's `.data`
+    would be, in the same key order. Only plain model fields and primary
+    key relations are supported.
+    """
+    # Fields whose to_representation() is the identity on database values.
+    passthrough_fields = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer):
+        self.columns = []
+        self.fields = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if '.' in field.source or field.source == '*':
+                raise TypeError(
+                    f'Field {field.field_name!r} is not a model column.'
+                )
+            column = field.source
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                column = f'{column}_id'
+            self.columns.append((field.field_name, column))
+            self.fields.append(field)
+
+    def get_values(self, queryset):
+        """Return `queryset` as `.values()` rows with the needed columns."""
+        # The primary key and the ordering columns are always read so
+        # that keyset pagination can take its position from the rows.
+        columns = [queryset.model._meta.pk.attname]
+        columns += [column for _, column in self.columns]
+        columns += [
+            name.lstrip('-') for name in queryset.query.order_by
+            if isinstance(name, str)
+        ]
+        return queryset.values(*dict.fromkeys(columns))
+
+    def to_representation(self, rows):
+        """Convert `.values()` rows into representation dicts."""
+        with timed('serialize'):
+            return self._to_representation(rows)
+
+    def _to_representation(self, rows):
+        fields = []
+        for (name, column), field in zip(self.columns, self.fields):
+            if isinstance(field, self.passthrough_fields):
+                converter = None
+            elif isinstance(field, serializers.DateTimeField):
+                converter = datetime_converter(field)
+            else:
+                converter = field.to_representation
+            fields.append((name, column, converter))
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, converter in fields:
+                value = row[column]
+                if converter is not None and value is not None:
+                    value = converter(value)
+                item[name] = value
+            data.append(item)
+        return data
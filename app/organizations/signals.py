@@ -0,0 +1,28 @@
+"""
+Signal handlers for the organizations app.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Organization, OrganizationCounts
+from organizations import cache as list_cache
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_list_cache(sender, instance, **kwargs):
+    """Invalidate the owner's cached lists on every row write."""
+    list_cache.invalidate(instance.owner_id)
+
+
+@receiver(post_delete, sender=Organization)
+def update_counts_on_delete(sender, instance, using, **kwargs):
+    """Take a deleted active organization off its owner's counts."""
+    deltas = OrganizationCounts.deltas([], [instance])
+    for owner_id, (active, parents) in deltas.items():
+        # An UPDATE, not an upsert: when the owner is being deleted too,
+        # its counts row may already be gone.
+        OrganizationCounts.objects.using(using).filter(
+            owner_id=owner_id,
+        ).update(active=F('active') + active, parents=F('parents') + parents)
@@ -0,0 +1,368 @@
+"""
+Test custom Django management commands of the organizations app.
+"""
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import (
+    ArchivedOrganization,
+    Organization,
+    OrganizationCounts,
+)
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    """Test the serialization benchmark command."""
+
+    def test_benchmark_reports_each_size(self):
+        """Test every size is reported and nothing is left behind."""
+        out = StringIO()
+        call_command(
+            'benchmark_serializers',
+            '--sizes', '5', '20',
+            '--repeat', '1',
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('5 rows', lines[0])
+        self.assertIn('20 rows', lines[1])
+        self.assertIn('speedup', lines[1])
+        self.assertFalse(Organization.objects.exists())
+
+
+class ArchiveOrganizationsCommandTests(TestCase):
+    """Test moving long-inactive organizations to the archive table."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.long_ago = timezone.now() - datetime.timedelta(days=60)
+
+    def create(self, name, parent=None, is_active=True, changed=None):
+        organization = Organization.objects.create(
+            owner=self.user, name=name, email=f'{name}@example.com',
+            parent=parent,
+        )
+        Organization.objects.filter(pk=organization.pk).update(
+            is_active=is_active, updated_at=changed or timezone.now(),
+        )
+        return organization
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_organizations', *args, stdout=out)
+        return out.getvalue()
+
+    def test_archives_stale_subtree(self):
+        """Test a stale subtree is archived leaves first, keeping paths."""
+        root = self.create('root', is_active=False, changed=self.long_ago)
+        child = self.create(
+            'child', root, is_active=False, changed=self.long_ago,
+        )
+        grandchild = self.create(
+            'grandchild', child, is_active=False, changed=self.long_ago,
+        )
+        live = self.create('live')
+
+        out = self.archive('--batch-size=1')
+
+        self.assertIn('Archived 3 organizations.', out)
+        self.assertEqual(list(Organization.all_objects.all()), [live])
+        archived = ArchivedOrganization.objects.get(pk=grandchild.pk)
+        self.assertEqual(archived.path, grandchild.path)
+        self.assertEqual(archived.parent_id, child.pk)
+        self.assertEqual(archived.owner, self.user)
+        self.assertEqual(
+            set(ArchivedOrganization.objects.values_list('pk', flat=True)),
+            {root.pk, child.pk, grandchild.pk},
+        )
+
+    def test_keeps_recent_and_parents_of_live_children(self):
+        """Test recent rows and parents with live children stay."""
+        parent = self.create('parent', is_active=False, changed=self.long_ago)
+        self.create('child', parent)
+        recent = self.create('recent', is_active=False)
+
+        out = self.archive()
+
+        self.assertIn('Archived 0 organizations.', out)
+        self.assertIn('1 inactive organizations were kept', out)
+        self.assertNotIn('locked', out)
+        self.assertEqual(
+            Organization.all_objects.filter(
+                pk__in=[parent.pk, recent.pk],
+            ).count(),
+            2,
+        )
+        self.assertFalse(ArchivedOrganization.objects.exists())
+
+    def test_dry_run(self):
+        """Test a dry run only counts the due organizations."""
+        self.create('stale', is_active=False, changed=self.long_ago)
+
+        out = self.archive('--dry-run')
+
+        self.assertIn('1 organizations due for archival.', out)
+        self.assertEqual(Organization.all_objects.count(), 1)
+
+
+class ExportImportOrganizationsCommandTests(TestCase):
+    """Test moving organizations between databases with a dump."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'organizations.ndjson.gz')
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        # The child has the lower id, so id order would put it first.
+        self.child = Organization.objects.create(
+            owner=self.user, name='Child', email='child@example.com',
+        )
+        self.root = Organization.objects.create(
+            owner=self.user, name='Root', email='root@example.com',
+            description='Top level',
+        )
+        self.child.parent = self.root
+        self.child.save()
+        self.deleted = Organization.objects.create(
+            owner=self.other, name='Deleted', email='deleted@example.com',
+        )
+        self.deleted.soft_delete()
+        Organization.all_objects.filter(pk=self.root.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=400),
+        )
+
+    def snapshot(self):
+        return list(Organization.all_objects.order_by('pk').values(
+            'id', 'parent_id', 'path', 'owner__email', 'name',
+            'description', 'email', 'is_parent', 'is_active', 'created_at',
+            'updated_at',
+        ))
+
+    def test_round_trip(self):
+        """Test a gzipped dump restores ids, paths, owners and timestamps."""
+        before = self.snapshot()
+        out = StringIO()
+        call_command(
+            'export_organizations', self.path, '--include-inactive',
+            '--batch-size=1', stdout=out,
+        )
+        self.assertIn('Exported 3 organizations.', out.getvalue())
+        with gzip.open(self.path, 'rt') as dump:
+            ids = [json.loads(line)['id'] for line in dump]
+        self.assertEqual(ids.index(self.root.pk), 0)
+        self.assertLess(ids.index(self.root.pk), ids.index(self.child.pk))
+
+        Organization.all_objects.all().delete()
+        out = StringIO()
+        call_command(
+            'import_organizations', self.path, '--batch-size=2', stdout=out,
+        )
+
+        self.assertIn('Imported 3 organizations.', out.getvalue())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(
+            OrganizationCounts.objects.get(owner=self.user).active, 2,
+        )
+        self.assertEqual(
+            OrganizationCounts.objects.get(owner=self.other).active, 0,
+        )
+        new = Organization.objects.create(
+            owner=self.user, name='New', email='new@example.com',
+        )
+        self.assertGreater(new.pk, max(row['id'] for row in before))
+
+    def test_rerun_skips_imported_rows(self):
+        """Test rows an earlier run already imported are skipped."""
+        before = self.snapshot()
+        call_command(
+            'export_organizations', self.path, '--include-inactive',
+            stdout=StringIO(),
+        )
+        Organization.all_objects.filter(pk=self.deleted.pk).delete()
+
+        out = StringIO()
+        call_command(
+            'import_organizations', self.path, '--batch-size=2', stdout=out,
+        )
+
+        self.assertIn('Imported 1 organizations.', out.getvalue())
+        self.assertIn('Skipped 2 organizations imported before.', out.getvalue())
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(
+            OrganizationCounts.objects.get(owner=self.user).active, 2,
+        )
+
+    def test_taken_ids_abort_before_writing(self):
+        """Test ids used by other organizations here stop the import."""
+        call_command(
+            'export_organizations', self.path, '--include-inactive',
+            stdout=StringIO(),
+        )
+        Organization.all_objects.filter(pk=self.deleted.pk).delete()
+        Organization.all_objects.filter(pk=self.root.pk).update(
+            owner=self.other,
+        )
+        before = self.snapshot()
+
+        with self.assertRaisesMessage(
+            CommandError,
+            f'1 organization ids are used by other organizations here: '
+            f'{self.root.pk}. Pass --new-ids',
+        ):
+            call_command('import_organizations', self.path, stdout=StringIO())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_new_ids_rewrite_parents_and_paths(self):
+        """Test --new-ids imports next to the rows whose ids it reuses."""
+        call_command(
+            'export_organizations', self.path, '--owner=user@example.com',
+            stdout=StringIO(),
+        )
+        before = self.snapshot()
+
+        out = StringIO()
+        call_command(
+            'import_organizations', self.path, '--new-ids', '--batch-size=1',
+            stdout=out,
+        )
+
+        self.assertIn('Imported 2 organizations.', out.getvalue())
+        rows = self.snapshot()
+        self.assertEqual(rows[:len(before)], before)
+        root, child = rows[len(before):]
+        self.assertEqual(
+            (root['name'], root['parent_id'], root['path']),
+            ('Root', None, f"{root['id']}/"),
+        )
+        self.assertEqual(
+            (child['name'], child['parent_id'], child['path']),
+            ('Child', root['id'], f"{root['id']}/{child['id']}/"),
+        )
+        self.assertEqual(child['owner__email'], 'user@example.com')
+        self.assertEqual(
+            OrganizationCounts.objects.get(owner=self.user).active, 4,
+        )
+
+    def test_failed_import_keeps_committed_batches(self):
+        """Test an import failing halfway keeps the batches before it."""
+        with open(self.path, 'w') as dump:
+            for row in (
+                {'id': 900, 'parent_id': None, 'path': '900/'},
+                {'id': 902, 'parent_id': 901, 'path': '900/901/902/'},
+            ):
+                dump.write(json.dumps({
+                    **row, 'owner_email': 'user@example.com', 'name': 'Org',
+                    'description': '', 'email': 'org@example.com',
+                    'is_parent': False, 'is_active': True,
+                    'created_at': '2026-01-01T00:00:00Z',
+                    'updated_at': None,
+                }) + '\n')
+        before = self.snapshot()
+
+        with self.assertRaisesMessage(
+            CommandError, 'Line 2: organization 901 is not earlier',
+        ):
+            call_command(
+                'import_organizations', self.path, '--new-ids',
+                '--batch-size=1', stdout=StringIO(),
+            )
+        rows = self.snapshot()
+        self.assertEqual(rows[:len(before)], before)
+        self.assertEqual(
+            [(row['name'], row['parent_id']) for row in rows[len(before):]],
+            [('Org', None)],
+        )
+        self.assertEqual(
+            OrganizationCounts.objects.get(owner=self.user).active, 3,
+        )
+
+    def test_export_to_stdout(self):
+        """Test stdout gets active organizations of the selected owners."""
+        out = StringIO()
+        err = StringIO()
+        call_command(
+            'export_organizations', '--owner=user@example.com',
+            stdout=out, stderr=err,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows], [self.root.pk, self.child.pk],
+        )
+        self.assertEqual(rows[0]['owner_email'], 'user@example.com')
+        self.assertIn('Exported 2 organizations.', err.getvalue())
+
+    def test_unknown_owner_aborts_before_writing(self):
+        """Test nothing is imported when an owner email is unknown."""
+        call_command(
+            'export_organizations', self.path, '--include-inactive',
+            stdout=StringIO(),
+        )
+        Organization.all_objects.all().delete()
+        self.other.delete()
+
+        with self.assertRaisesMessage(
+            CommandError, '1 owners do not exist here: other@example.com',
+        ):
+            call_command('import_organizations', self.path, stdout=StringIO())
+        self.assertFalse(Organization.all_objects.exists())
+
+
+class ReconcileOrganizationCountsCommandTests(TestCase):
+    """Test repairing drifted organization counts."""
+
+    def test_repairs_drifted_counts(self):
+        """Test drifted and missing counts rows are recounted."""
+        users = [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com',
+                password='testpass123',
+            )
+            for i in range(3)
+        ]
+        for user in users:
+            Organization.objects.create(
+                owner=user, name='Root', email='root@example.com',
+                is_parent=True,
+            )
+        OrganizationCounts.objects.filter(owner=users[0]).update(active=5)
+        OrganizationCounts.objects.filter(owner=users[1]).delete()
+
+        out = StringIO()
+        call_command(
+            'reconcile_organization_counts', '--batch-size=2',
+            verbosity=2, stdout=out,
+        )
+
+        self.assertIn('Checked 3 owners, repaired 2.', out.getvalue())
+        self.assertIn(
+            f'Owner {users[0].pk}: active 5 -> 1, parents 1 -> 1.',
+            out.getvalue(),
+        )
+        self.assertEqual(
+            list(OrganizationCounts.objects.order_by('owner').values_list(
+                'active', 'parents',
+            )),
+            [(1, 1)] * 3,
+        )
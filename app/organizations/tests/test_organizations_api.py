@@ -1,21 +1,37 @@
 """
 Test the Organizations API endpoints.
 """
+import csv
+import datetime
+import io
+import json
 
+from core import metrics
 from core.models import Organization
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from organizations import cache as list_cache
+from organizations.pagination import OrganizationCursorPagination
 from organizations.serializers import (
     OrganizationSerializer,
-    OrganizationDetailSerializer
+    OrganizationDetailSerializer,
+    OrganizationListSerializer,
 )
 
 # from organizations import urls
 
 ORGANIZATION_URL = reverse('organizations:organization-list')
+BULK_URL = reverse('organizations:organization-bulk')
+EXPORT_URL = reverse('organizations:organization-export')
+COUNTS_URL = reverse('organizations:organization-counts')
+ASYNC_URL = reverse('organizations:organization-async-list')
 
 
 def create_organization(user, **params):
@@ -183,16 +199,1098 @@ class PrivateOrganizationsAPITests(TestCase):
         self.assertEqual(organization.description, payload['description'])
 
     def test_delete_organization(self):
-        """Test deleting an organization."""
+        """Test deleting an organization soft deletes it."""
         organization = create_organization(user=self.user)
         url = get_organization_detail_url(organization.id)
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         organizations = Organization.objects.filter(id=organization.id)
         self.assertFalse(organizations.exists())
+        organization.refresh_from_db()
+        self.assertFalse(organization.is_active)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(ORGANIZATION_URL).data, [])
 
     def test_organization_not_found(self):
         """Test organization not found."""
         url = get_organization_detail_url(99999)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrganizationPaginationAPITests(TestCase):
+    """Test cursor pagination of the organizations list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        Organization.objects.bulk_create([
+            Organization(
+                owner=self.user,
+                name=f'Organization {i}',
+                email=f'org{i}@example.com',
+            )
+            for i in range(50)
+        ])
+
+    def test_list_unpaginated_by_default(self):
+        """Test the list is a plain array when no page is requested."""
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 50)
+
+    def test_walk_pages_with_cursor(self):
+        """Test following `next` links returns every organization once."""
+        ids = []
+        url = ORGANIZATION_URL + '?page_size=20'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(org['id'] for org in response.data['results'])
+            url = response.data['next']
+        expected = list(
+            Organization.objects.filter(owner=self.user)
+            .order_by('-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_page_size_capped(self):
+        """Test the page size cannot exceed the configured maximum."""
+        max_page_size = OrganizationCursorPagination.max_page_size
+        response = self.client.get(
+            ORGANIZATION_URL, {'page_size': max_page_size + 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(response.data['results']), max_page_size)
+
+    def test_deep_page_is_keyset_query(self):
+        """Test deep pages cost the same query as the first page."""
+        response = self.client.get(ORGANIZATION_URL, {'page_size': 5})
+        url = response.data['next']
+        for _ in range(8):
+            url = self.client.get(url).data['next']
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as first_page:
+            self.client.get(ORGANIZATION_URL, {'page_size': 5})
+        with CaptureQueriesContext(connection) as deep_page:
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(first_page), len(deep_page))
+        deep_sql = deep_page.captured_queries[-1]['sql']
+        self.assertIn('"core_organization"."id" <', deep_sql)
+        self.assertNotIn('OFFSET', deep_sql)
+
+
+class BulkOrganizationsAPITests(TestCase):
+    """Test the bulk organizations endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        """Test creating a batch of organizations with one INSERT."""
+        payload = [
+            {'name': f'Organization {i}', 'email': f'org{i}@example.com'}
+            for i in range(3)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        organizations = Organization.objects.filter(owner=self.user)
+        self.assertEqual(organizations.count(), 3)
+        inserts = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT INTO "core_organization"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+    def test_bulk_create_per_item_errors(self):
+        """Test invalid items are reported by position and nothing saved."""
+        payload = [
+            {'name': 'Valid', 'email': 'valid@example.com'},
+            {'name': 'Invalid', 'email': 'not-an-email'},
+        ]
+        response = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('email', response.data[1])
+        self.assertFalse(Organization.objects.exists())
+
+    def test_bulk_create_too_many(self):
+        """Test oversized batches are rejected."""
+        max_length = OrganizationListSerializer.max_length
+        payload = [{'name': 'Org', 'email': 'org@example.com'}] * (
+            max_length + 1
+        )
+        response = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        """Test partially updating a batch of organizations."""
+        first = create_organization(user=self.user)
+        second = create_organization(user=self.user)
+        payload = [
+            {'id': first.id, 'name': 'First'},
+            {'id': second.id, 'description': 'Second'},
+        ]
+        response = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.name, 'First')
+        self.assertEqual(second.description, 'Second')
+
+    def test_bulk_update_other_users_organization(self):
+        """Test organizations of another user cannot be updated."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        organization = create_organization(user=other_user)
+        payload = [{'id': organization.id, 'name': 'Hijacked'}]
+        response = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data[0])
+        organization.refresh_from_db()
+        self.assertNotEqual(organization.name, 'Hijacked')
+
+    def test_bulk_delete(self):
+        """Test deleting a batch of organizations by id."""
+        organizations = [create_organization(user=self.user) for _ in range(3)]
+        ids = [organization.id for organization in organizations[:2]]
+        response = self.client.delete(BULK_URL, ids, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        remaining = Organization.objects.filter(owner=self.user)
+        self.assertEqual(list(remaining), [organizations[2]])
+        self.assertEqual(
+            Organization.all_objects.filter(owner=self.user).count(), 3,
+        )
+
+    def test_bulk_delete_boolean_id(self):
+        """Test a JSON boolean is not taken for the id 1 or 0."""
+        organization = create_organization(user=self.user)
+        response = self.client.delete(
+            BULK_URL, [organization.id, True], format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data[1], {'id': ['A valid integer is required.']},
+        )
+        self.assertTrue(
+            Organization.objects.filter(id=organization.id).exists()
+        )
+
+    def test_bulk_delete_unknown_id(self):
+        """Test nothing is deleted when an id is not found."""
+        organization = create_organization(user=self.user)
+        response = self.client.delete(
+            BULK_URL, [organization.id, 99999], format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertTrue(
+            Organization.objects.filter(id=organization.id).exists()
+        )
+
+
+class ExportOrganizationsAPITests(TestCase):
+    """Test the streaming organizations export."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_export_ndjson(self):
+        """Test exporting one JSON document per organization."""
+        create_organization(user=self.user, name='First')
+        create_organization(user=self.user, name='Second')
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_organization(user=other_user, name='Other')
+
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        organizations = Organization.objects.filter(
+            owner=self.user
+        ).order_by('-id')
+        serializer = OrganizationDetailSerializer(organizations, many=True)
+        self.assertEqual(rows, json.loads(json.dumps(serializer.data)))
+
+    def test_export_csv(self):
+        """Test exporting organizations as CSV with a header row."""
+        create_organization(user=self.user, name='Comma, Inc.')
+
+        response = self.client.get(EXPORT_URL, {'output': 'csv'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'Comma, Inc.')
+        self.assertEqual(
+            tuple(rows[0]), OrganizationDetailSerializer.Meta.fields
+        )
+
+    def test_export_invalid_output(self):
+        """Test an unknown output format is rejected."""
+        response = self.client.get(EXPORT_URL, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetAPITests(TestCase):
+    """Test ETag and Last-Modified handling."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.organization = create_organization(user=self.user)
+
+    def test_updated_at_set_on_write(self):
+        """Test updated_at is maintained on create and update."""
+        created = self.organization.updated_at
+        self.assertIsNotNone(created)
+        url = get_organization_detail_url(self.organization.id)
+        self.client.patch(url, {'name': 'Renamed'})
+        self.organization.refresh_from_db()
+        self.assertGreater(self.organization.updated_at, created)
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match on the list returns 304."""
+        response = self.client.get(ORGANIZATION_URL)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                ORGANIZATION_URL, HTTP_IF_NONE_MATCH=etag,
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_list_etag_changes_on_write(self):
+        """Test creating, updating or deleting changes the list ETag."""
+        etag = self.client.get(ORGANIZATION_URL)['ETag']
+        url = get_organization_detail_url(self.organization.id)
+
+        self.client.patch(url, {'name': 'Renamed'})
+        response = self.client.get(ORGANIZATION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        self.client.delete(url)
+        response = self.client.get(ORGANIZATION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_list_ignores_if_modified_since(self):
+        """Test a delete is not hidden behind an unchanged timestamp."""
+        other = create_organization(user=self.user, name='Other')
+        since = self.client.get(
+            get_organization_detail_url(other.id),
+        )['Last-Modified']
+        self.client.delete(get_organization_detail_url(other.id))
+
+        response = self.client.get(
+            ORGANIZATION_URL, HTTP_IF_MODIFIED_SINCE=since,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_bulk_update_changes_etag(self):
+        """Test bulk updates stamp updated_at and change the ETag."""
+        etag = self.client.get(ORGANIZATION_URL)['ETag']
+        self.client.patch(
+            BULK_URL,
+            [{'id': self.organization.id, 'name': 'Renamed'}],
+            format='json',
+        )
+        response = self.client.get(ORGANIZATION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_varies_with_query(self):
+        """Test paginated and unpaginated lists do not share an ETag."""
+        etag = self.client.get(ORGANIZATION_URL)['ETag']
+        response = self.client.get(
+            ORGANIZATION_URL, {'page_size': 10}, HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_not_modified(self):
+        """Test conditional GET on the detail endpoint."""
+        url = get_organization_detail_url(self.organization.id)
+        response = self.client.get(url)
+
+        not_modified = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        since = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_not_found(self):
+        """Test conditional handling keeps 404 for unknown ids."""
+        url = get_organization_detail_url(99999)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ListCacheAPITests(TestCase):
+    """Test the per-owner organization list cache."""
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.organization = create_organization(user=self.user)
+
+    def test_repeat_list_served_from_cache(self):
+        """Test the second list request skips the organizations query."""
+        first = self.client.get(ORGANIZATION_URL)
+        with self.assertNumQueries(1):
+            second = self.client.get(ORGANIZATION_URL)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(list_cache.hit_ratio(), 0.5)
+
+    def test_create_invalidates(self):
+        """Test a created organization shows up in the next list."""
+        self.client.get(ORGANIZATION_URL)
+        self.client.post(ORGANIZATION_URL, {
+            'name': 'New Organization',
+            'email': 'new@example.com',
+        })
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(len(response.data), 2)
+
+    def test_update_and_delete_invalidate(self):
+        """Test updates and deletes are visible in the next list."""
+        url = get_organization_detail_url(self.organization.id)
+        self.client.get(ORGANIZATION_URL)
+        self.client.patch(url, {'name': 'Renamed'})
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(response.data[0]['name'], 'Renamed')
+
+        self.client.delete(url)
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(response.data, [])
+
+    def test_bulk_writes_invalidate(self):
+        """Test bulk endpoints invalidate the owner's cached lists."""
+        self.client.get(ORGANIZATION_URL)
+        self.client.post(
+            BULK_URL,
+            [{'name': 'Bulk', 'email': 'bulk@example.com'}],
+            format='json',
+        )
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(len(response.data), 2)
+
+        self.client.patch(
+            BULK_URL,
+            [{'id': self.organization.id, 'name': 'Bulk Renamed'}],
+            format='json',
+        )
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertIn('Bulk Renamed', [org['name'] for org in response.data])
+
+    def test_cache_scoped_to_owner(self):
+        """Test owners never see each other's cached lists."""
+        self.client.get(ORGANIZATION_URL)
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(other_user)
+        response = self.client.get(ORGANIZATION_URL)
+        self.assertEqual(response.data, [])
+
+
+class AsyncOrganizationViewsTests(TestCase):
+    """Test the async read views of the organizations API."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.organization = create_organization(user=self.user)
+
+    def test_async_list_matches_sync_list(self):
+        """Test the async list returns the same body as the DRF view."""
+        sync_response = self.client.get(ORGANIZATION_URL)
+        cache.clear()
+        async_response = self.client.get(ASYNC_URL)
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    def test_async_detail_matches_sync_detail(self):
+        """Test the async detail returns the same body as the DRF view."""
+        sync_response = self.client.get(
+            get_organization_detail_url(self.organization.id)
+        )
+        async_response = self.client.get(
+            reverse(
+                'organizations:organization-async-detail',
+                args=[self.organization.id],
+            )
+        )
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    def test_async_detail_other_owner_not_found(self):
+        """Test the async detail is scoped to the owner."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        organization = create_organization(user=other_user)
+        response = self.client.get(
+            reverse(
+                'organizations:organization-async-detail',
+                args=[organization.id],
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_list_requires_token(self):
+        """Test the async list rejects missing and invalid tokens."""
+        response = APIClient().get(ASYNC_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get(ASYNC_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_list_get_only(self):
+        """Test the async list only accepts GET."""
+        response = self.client.post(ASYNC_URL, {})
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+
+class OrganizationHierarchyAPITests(TestCase):
+    """Test the parent link and the subtree endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.root = create_organization(user=self.user, name='Root')
+        self.child = create_organization(
+            user=self.user, name='Child', parent=self.root,
+        )
+        self.grandchild = create_organization(
+            user=self.user, name='Grandchild', parent=self.child,
+        )
+        self.other_root = create_organization(user=self.user, name='Other')
+
+    def get_action_url(self, organization, action):
+        return reverse(
+            f'organizations:organization-{action}', args=[organization.id],
+        )
+
+    def test_create_with_parent(self):
+        """Test creating an organization below an existing one."""
+        payload = {
+            'name': 'New',
+            'email': 'new@example.com',
+            'parent': self.grandchild.id,
+        }
+        response = self.client.post(ORGANIZATION_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        organization = Organization.objects.get(id=response.data['id'])
+        self.assertEqual(
+            organization.path, f'{self.grandchild.path}{organization.id}/',
+        )
+
+    def test_delete_deactivates_subtree(self):
+        """Test deleting an organization soft deletes its descendants."""
+        response = self.client.delete(get_organization_detail_url(self.child.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCountEqual(
+            Organization.objects.filter(owner=self.user),
+            [self.root, self.other_root],
+        )
+        self.assertEqual(
+            self.client.get(
+                self.get_action_url(self.root, 'descendant-count'),
+            ).data,
+            {'count': 0},
+        )
+
+    def test_bulk_delete_deactivates_subtrees(self):
+        """Test a bulk delete soft deletes every subtree in the batch."""
+        response = self.client.delete(
+            BULK_URL, [self.child.id, self.other_root.id], format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(Organization.objects.filter(owner=self.user)), [self.root],
+        )
+
+    def test_deleted_parent_rejected(self):
+        """Test a soft-deleted organization cannot become a parent."""
+        self.other_root.soft_delete()
+        response = self.client.patch(
+            get_organization_detail_url(self.root.id),
+            {'parent': self.other_root.id},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', response.data)
+
+    def test_parent_of_other_owner_rejected(self):
+        """Test a parent must belong to the requester."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        foreign = create_organization(user=other_user)
+        payload = {
+            'name': 'New',
+            'email': 'new@example.com',
+            'parent': foreign.id,
+        }
+        response = self.client.post(ORGANIZATION_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', response.data)
+
+    def test_descendants(self):
+        """Test listing the subtree with a single query for the rows."""
+        url = self.get_action_url(self.root, 'descendants')
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data],
+            [self.grandchild.id, self.child.id],
+        )
+
+    def test_descendants_paginated(self):
+        """Test the subtree listing uses the cursor pagination."""
+        url = self.get_action_url(self.root, 'descendants')
+        response = self.client.get(url, {'page_size': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_descendant_count(self):
+        """Test counting the subtree."""
+        url = self.get_action_url(self.root, 'descendant-count')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'count': 2})
+
+    def test_ancestors(self):
+        """Test listing the ancestors root first."""
+        url = self.get_action_url(self.grandchild, 'ancestors')
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data],
+            [self.root.id, self.child.id],
+        )
+
+    def test_move_subtree(self):
+        """Test re-parenting moves the whole subtree."""
+        url = get_organization_detail_url(self.child.id)
+        response = self.client.patch(url, {'parent': self.other_root.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f'{self.other_root.id}/{self.child.id}/{self.grandchild.id}/',
+        )
+        response = self.client.get(
+            self.get_action_url(self.root, 'descendant-count')
+        )
+        self.assertEqual(response.data, {'count': 0})
+
+    def test_move_below_descendant_rejected(self):
+        """Test an organization cannot become its own ancestor."""
+        url = get_organization_detail_url(self.root.id)
+        response = self.client.patch(url, {'parent': self.grandchild.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', response.data)
+
+    def test_bulk_create_with_parent(self):
+        """Test bulk-created organizations get their paths."""
+        payload = [
+            {'name': 'A', 'email': 'a@example.com', 'parent': self.child.id},
+            {'name': 'B', 'email': 'b@example.com'},
+        ]
+        response = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        first, second = Organization.objects.filter(
+            id__in=[item['id'] for item in response.data],
+        ).order_by('id')
+        self.assertEqual(first.path, f'{self.child.path}{first.id}/')
+        self.assertEqual(second.path, f'{second.id}/')
+
+    def test_bulk_move_cycle_rejected(self):
+        """Test a batch of moves forming a cycle is rolled back."""
+        payload = [
+            {'id': self.other_root.id, 'parent': self.grandchild.id},
+            {'id': self.root.id, 'parent': self.other_root.id},
+        ]
+        response = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.root.refresh_from_db()
+        self.other_root.refresh_from_db()
+        self.assertIsNone(self.root.parent_id)
+        self.assertIsNone(self.other_root.parent_id)
+
+
+class OrganizationSearchAPITests(TestCase):
+    """Test ranked search over the organizations list."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.acme = create_organization(
+            user=self.user,
+            name='Acme Logistics',
+            email='contact@acme.example.com',
+            description='Freight and shipping.',
+        )
+        self.globex = create_organization(
+            user=self.user,
+            name='Globex',
+            email='info@globex.example.com',
+            description='Logistics consulting for Acme and others.',
+        )
+        self.initech = create_organization(
+            user=self.user,
+            name='Initech',
+            email='hello@initech.example.com',
+            description='Software.',
+        )
+
+    def search(self, term, **params):
+        return self.client.get(ORGANIZATION_URL, {'search': term, **params})
+
+    def test_search_ranks_name_above_description(self):
+        """Test a name match ranks above a description match."""
+        response = self.search('logistics')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data],
+            [self.acme.id, self.globex.id],
+        )
+
+    def test_search_stems_and_matches_email_domain(self):
+        """Test stemmed words and email domains match."""
+        response = self.search('shipped')
+        self.assertEqual([item['id'] for item in response.data], [self.acme.id])
+
+        response = self.search('initech.example.com')
+        self.assertEqual(
+            [item['id'] for item in response.data], [self.initech.id],
+        )
+
+    def test_search_websearch_syntax(self):
+        """Test quoted phrases and negation are supported."""
+        response = self.search('acme -freight')
+        self.assertEqual(
+            [item['id'] for item in response.data], [self.globex.id],
+        )
+
+    def test_search_fuzzy_name(self):
+        """Test a misspelled name is matched through trigrams."""
+        response = self.search('Glbex')
+        self.assertEqual(
+            [item['id'] for item in response.data], [self.globex.id],
+        )
+
+    def test_search_vector_follows_updates(self):
+        """Test the stored vector is refreshed when the row changes."""
+        self.initech.description = 'Printers and staplers.'
+        self.initech.save()
+
+        response = self.search('stapler')
+        self.assertEqual(
+            [item['id'] for item in response.data], [self.initech.id],
+        )
+
+    def test_search_limited_to_user(self):
+        """Test search only returns the requester's organizations."""
+        other_user = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_organization(user=other_user, name='Acme Rival')
+
+        response = self.search('acme')
+        self.assertEqual(
+            {item['id'] for item in response.data},
+            {self.acme.id, self.globex.id},
+        )
+
+    def test_search_not_paginated(self):
+        """Test search results are a single ranked page."""
+        response = self.search('logistics', page_size=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 2)
+
+    def test_blank_search_lists_everything(self):
+        """Test an empty search term is ignored."""
+        response = self.search('  ')
+        self.assertEqual(len(response.data), 3)
+
+
+class SparseFieldsAPITests(TestCase):
+    """Test `?fields=` projections."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.organization = create_organization(
+            user=self.user, description='x' * 1000,
+        )
+
+    def get_organization_selects(self, queries):
+        return [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT "core_organization"."id"')
+        ]
+
+    def test_list_fields(self):
+        """Test the list renders and selects only the requested fields."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ORGANIZATION_URL, {'fields': 'id,name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [{'id': self.organization.id, 'name': self.organization.name}],
+        )
+        selects = self.get_organization_selects(queries)
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"description"', selects[0])
+
+    def test_retrieve_fields(self):
+        """Test the detail view honours the projection."""
+        url = get_organization_detail_url(self.organization.id)
+        response = self.client.get(url, {'fields': 'name,email'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'name': self.organization.name,
+            'email': self.organization.email,
+        })
+
+    def test_paginated_fields(self):
+        """Test the projection applies to cursor pages."""
+        response = self.client.get(
+            ORGANIZATION_URL, {'fields': 'name', 'page_size': 10},
+        )
+        self.assertEqual(
+            response.data['results'], [{'name': self.organization.name}],
+        )
+
+    def test_export_fields(self):
+        """Test the CSV export only has the requested columns."""
+        response = self.client.get(
+            EXPORT_URL, {'output': 'csv', 'fields': 'id,name'},
+        )
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'name'])
+        self.assertEqual(
+            rows[1], [str(self.organization.id), self.organization.name],
+        )
+
+    def test_unknown_field_rejected(self):
+        """Test unknown field names return a 400."""
+        response = self.client.get(
+            ORGANIZATION_URL, {'fields': 'id,password'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', str(response.data['fields']))
+
+    def test_fields_ignored_on_write(self):
+        """Test the projection does not limit write responses."""
+        url = get_organization_detail_url(self.organization.id)
+        response = self.client.patch(
+            f'{url}?fields=name', {'name': 'Renamed'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('description', response.data)
+
+
+class OrganizationFilterAPITests(TestCase):
+    """Test the list filters and orderings."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        self.organizations = []
+        for i, (is_parent, email) in enumerate([
+            (True, 'a@Acme.com'),
+            (False, 'b@example.com'),
+            (True, 'c@acme.com'),
+            (False, 'd@example.com'),
+        ]):
+            organization = create_organization(
+                user=self.user, name=f'Organization {i}', email=email,
+                is_parent=is_parent,
+            )
+            Organization.objects.filter(pk=organization.pk).update(
+                created_at=start - datetime.timedelta(days=i),
+            )
+            self.organizations.append(organization)
+
+    def get_names(self, params):
+        response = self.client.get(ORGANIZATION_URL, params)
+        self.assertEqual(
+            response.status_code, status.HTTP_200_OK, response.data,
+        )
+        return [org['name'] for org in response.data]
+
+    def test_is_parent_filter(self):
+        """Test filtering on is_parent."""
+        self.assertEqual(
+            self.get_names({'is_parent': 'true'}),
+            ['Organization 2', 'Organization 0'],
+        )
+        self.assertEqual(
+            self.get_names({'is_parent': 'false'}),
+            ['Organization 3', 'Organization 1'],
+        )
+
+    def test_email_domain_filter(self):
+        """Test the email domain filter ignores case."""
+        self.assertEqual(
+            self.get_names({'email_domain': 'ACME.com'}),
+            ['Organization 2', 'Organization 0'],
+        )
+
+    def test_created_range_orders_by_created_at(self):
+        """Test a created_at range is ordered newest first by default."""
+        self.assertEqual(
+            self.get_names({
+                'created_after': '2025-12-30T00:00:00Z',
+                'created_before': '2026-01-01T00:00:00Z',
+            }),
+            ['Organization 1', 'Organization 2'],
+        )
+
+    def test_ordering(self):
+        """Test ordering by created_at and id in both directions."""
+        self.assertEqual(self.get_names({'ordering': 'created_at'}), [
+            'Organization 3', 'Organization 2',
+            'Organization 1', 'Organization 0',
+        ])
+        self.assertEqual(self.get_names({'ordering': 'id'}), [
+            'Organization 0', 'Organization 1',
+            'Organization 2', 'Organization 3',
+        ])
+
+    def test_created_range_ascending(self):
+        """Test a created_at range in ascending order."""
+        self.assertEqual(
+            self.get_names({
+                'created_after': '2025-12-31T00:00:00Z',
+                'ordering': 'created_at',
+            }),
+            ['Organization 1', 'Organization 0'],
+        )
+
+    def test_cursor_pages_follow_ordering(self):
+        """Test cursor pages walk the requested ordering."""
+        names = []
+        url = ORGANIZATION_URL + '?ordering=created_at&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names += [org['name'] for org in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(names, [
+            'Organization 3', 'Organization 2',
+            'Organization 1', 'Organization 0',
+        ])
+
+    def test_paginated_projection_follows_ordering(self):
+        """Test a projection without the ordering column still pages."""
+        response = self.client.get(ORGANIZATION_URL, {
+            'ordering': '-created_at', 'page_size': 2, 'fields': 'name',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'name': 'Organization 0'}, {'name': 'Organization 1'},
+        ])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [
+            {'name': 'Organization 2'}, {'name': 'Organization 3'},
+        ])
+
+    def test_invalid_values_rejected(self):
+        """Test malformed filter values return a 400."""
+        for params in [
+            {'is_parent': 'maybe'},
+            {'created_after': 'yesterday'},
+            {'email_domain': ' '},
+            {'ordering': 'name'},
+        ]:
+            with self.subTest(**params):
+                response = self.client.get(ORGANIZATION_URL, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST,
+                )
+                self.assertIn(next(iter(params)), response.data)
+
+    def test_unindexed_combinations_rejected(self):
+        """Test combinations without a supporting index return a 400."""
+        for params in [
+            {'is_parent': 'true', 'ordering': 'created_at'},
+            {'email_domain': 'acme.com', 'is_parent': 'true'},
+            {'created_after': '2026-01-01T00:00:00Z', 'ordering': '-id'},
+        ]:
+            with self.subTest(**params):
+                response = self.client.get(ORGANIZATION_URL, params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST,
+                )
+                self.assertIn(
+                    'not supported', str(response.data['non_field_errors']),
+                )
+
+    def test_search_with_filters(self):
+        """Test filters narrow search results but ordering is refused."""
+        self.assertEqual(
+            self.get_names({'search': 'organization', 'is_parent': 'true'}),
+            ['Organization 2', 'Organization 0'],
+        )
+        response = self.client.get(
+            ORGANIZATION_URL, {'search': 'organization', 'ordering': 'id'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OrganizationCountsAPITests(TestCase):
+    """Test the per-owner organization counts endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_counts_without_organizations(self):
+        """Test an owner without organizations gets zero counts."""
+        response = self.client.get(COUNTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'active': 0, 'parents': 0})
+
+    def test_counts_follow_writes(self):
+        """Test creates, bulk creates and deletes update the counts."""
+        root = create_organization(user=self.user)
+        create_organization(user=self.user, is_parent=False, parent=root)
+        create_organization(user=create_user(
+            email='other@example.com',
+            password='testpass123',
+        ))
+        self.client.post(
+            ORGANIZATION_URL,
+            {'name': 'New', 'email': 'new@example.com'},
+        )
+        self.client.post(BULK_URL, [
+            {'name': f'Batch {i}', 'email': f'batch{i}@example.com'}
+            for i in range(3)
+        ], format='json')
+
+        response = self.client.get(COUNTS_URL)
+        self.assertEqual(response.data, {'active': 6, 'parents': 1})
+
+        self.client.delete(get_organization_detail_url(root.id))
+
+        response = self.client.get(COUNTS_URL)
+        self.assertEqual(response.data, {'active': 4, 'parents': 0})
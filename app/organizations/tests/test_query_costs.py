@@ -0,0 +1,168 @@
+"""
+Test the organizations API does not issue more queries as data grows.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Organization
+from core.testing import SCALES, QueryCostMixin, create_organizations
+
+ORGANIZATION_URL = reverse('organizations:organization-list')
+BULK_URL = reverse('organizations:organization-bulk')
+EXPORT_URL = reverse('organizations:organization-export')
+COUNTS_URL = reverse('organizations:organization-counts')
+
+
+def detail_url(organization, action='detail'):
+    """Return the URL of a detail route for `organization`."""
+    return reverse(
+        f'organizations:organization-{action}', args=[organization.id],
+    )
+
+
+class OrganizationQueryCostTests(QueryCostMixin, TestCase):
+    """Test each organizations endpoint at 1, 100 and 10k organizations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = {}
+        for scale in SCALES:
+            user = get_user_model().objects.create_user(
+                email=f'user{scale}@example.com',
+                password='testpass123',
+            )
+            root = create_organizations(user, scale)
+            leaf = Organization.objects.filter(owner=user).latest('id')
+            cls.fixtures[scale] = (user, root, leaf)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def assertGetCost(self, url, max_queries, **kwargs):
+        """Assert GETs of `url(root, leaf)` have a constant cost."""
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).get(
+                url(*fixture[1:]),
+            ),
+            self.fixtures, max_queries=max_queries, **kwargs,
+        )
+
+    def test_list(self):
+        """Test listing every organization."""
+        self.assertGetCost(lambda root, leaf: ORGANIZATION_URL, 2)
+
+    def test_list_page(self):
+        """Test listing one cursor page."""
+        self.assertGetCost(
+            lambda root, leaf: ORGANIZATION_URL + '?page_size=100', 2,
+        )
+
+    def test_list_projection(self):
+        """Test listing a `?fields=` projection."""
+        self.assertGetCost(
+            lambda root, leaf: ORGANIZATION_URL + '?fields=id,name', 2,
+        )
+
+    def test_search(self):
+        """Test ranked search."""
+        self.assertGetCost(
+            lambda root, leaf: ORGANIZATION_URL + '?search=organization', 2,
+        )
+
+    def test_retrieve(self):
+        """Test retrieving one organization."""
+        self.assertGetCost(lambda root, leaf: detail_url(leaf), 2)
+
+    def test_descendants(self):
+        """Test listing a page of descendants."""
+        self.assertGetCost(
+            lambda root, leaf: (
+                detail_url(root, 'descendants') + '?page_size=100'
+            ),
+            2,
+        )
+
+    def test_descendant_count(self):
+        """Test counting descendants."""
+        self.assertGetCost(
+            lambda root, leaf: detail_url(root, 'descendant-count'), 2,
+        )
+
+    def test_ancestors(self):
+        """Test listing the ancestors of a leaf."""
+        # A single organization is its own leaf and has no ancestors.
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).get(
+                detail_url(fixture[2], 'ancestors'),
+            ),
+            {scale: self.fixtures[scale] for scale in SCALES[1:]},
+            max_queries=2,
+        )
+
+    def test_counts(self):
+        """Test reading the organization counts."""
+        self.assertGetCost(lambda root, leaf: COUNTS_URL, 1)
+
+    def test_export(self):
+        """Test streaming the export."""
+        self.assertGetCost(lambda root, leaf: EXPORT_URL, 3, max_seconds=5)
+
+    def test_create(self):
+        """Test creating an organization under an existing parent."""
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).post(
+                ORGANIZATION_URL,
+                {
+                    'name': 'New', 'email': 'new@example.com',
+                    'parent': fixture[1].id,
+                },
+                format='json',
+            ),
+            self.fixtures, max_queries=7,
+        )
+
+    def test_partial_update(self):
+        """Test renaming an organization."""
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).patch(
+                detail_url(fixture[2]), {'name': 'Renamed'}, format='json',
+            ),
+            self.fixtures, max_queries=4,
+        )
+
+    def test_destroy(self):
+        """Test deleting a leaf organization."""
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).delete(
+                detail_url(fixture[2]),
+            ),
+            self.fixtures, max_queries=3,
+        )
+
+    def test_bulk_create(self):
+        """Test creating a batch of organizations."""
+        payload = [
+            {'name': f'Batch {i}', 'email': f'batch{i}@example.com'}
+            for i in range(10)
+        ]
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).post(
+                BULK_URL, payload, format='json',
+            ),
+            self.fixtures, max_queries=5,
+        )
+
+    def test_bulk_update(self):
+        """Test renaming a batch of organizations."""
+        self.assertQueryCost(
+            lambda fixture: self.client_for(fixture[0]).patch(
+                BULK_URL,
+                [{'id': fixture[2].id, 'name': 'Renamed'}],
+                format='json',
+            ),
+            self.fixtures, max_queries=4,
+        )
@@ -0,0 +1,195 @@
+"""
+Query plan regression tests for the organizations listing.
+"""
+import datetime
+import os
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models.functions import Coalesce
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+
+from core.models import Organization
+from organizations.filters import (
+    OrganizationFilter,
+    OrganizationSearchFilter,
+)
+
+# Owners get 1000 rows each, enough that a page is a small part of the
+# owner's rows; below 100000 rows in all, a backward scan of the primary
+# key starts to win. Set QUERY_PLAN_ROWS (e.g. 1000000) to check the
+# plans at production scale.
+ORGANIZATION_COUNT = int(os.environ.get('QUERY_PLAN_ROWS', '100000'))
+OWNER_COUNT = max(ORGANIZATION_COUNT // 1000, 1)
+ROWS_PER_OWNER = ORGANIZATION_COUNT // OWNER_COUNT
+
+
+def scanned_relations(plan):
+    """Yield (node type, relation or index name) for every plan node."""
+    yield plan['Node Type'], plan.get('Index Name', plan.get('Relation Name'))
+    for child in plan.get('Plans', []):
+        yield from scanned_relations(child)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL.')
+class OrganizationListingPlanTests(TestCase):
+    """Test the owner-scoped listing is served from an index at scale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO core_user (
+                    password, is_superuser, email, name, is_active, is_staff
+                )
+                SELECT '', false, 'owner' || n || '@example.com', '',
+                       true, false
+                FROM generate_series(1, %s) AS n
+                """,
+                [OWNER_COUNT],
+            )
+            cursor.execute(
+                """
+                INSERT INTO core_organization (
+                    id, name, owner_id, description, email,
+                    is_parent, is_active, created_at, path
+                )
+                SELECT row.id, 'Organization ' || row.n,
+                       first_user.id + row.n %% %s, '', 'org@example.com',
+                       row.n %% 20 = 0, row.n %% 10 <> 0,
+                       now() - row.n * interval '1 second', row.id || '/'
+                FROM (
+                    SELECT n, nextval(
+                        pg_get_serial_sequence('core_organization', 'id')
+                    ) AS id
+                    FROM generate_series(1, %s) AS n
+                ) AS row,
+                (SELECT min(id) AS id FROM core_user) AS first_user
+                """,
+                [OWNER_COUNT, ORGANIZATION_COUNT],
+            )
+            cursor.execute('ANALYZE core_user')
+            cursor.execute('ANALYZE core_organization')
+        cls.owner_id = Organization.objects.values_list(
+            'owner_id', flat=True
+        ).first()
+
+    def get_plan_nodes(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0][0]['Plan']
+        return list(scanned_relations(plan))
+
+    def assertIndexScan(self, queryset, index_name):
+        nodes = self.get_plan_nodes(queryset)
+        self.assertNotIn(('Seq Scan', 'core_organization'), nodes)
+        self.assertNotIn('Sort', [node_type for node_type, _ in nodes])
+        index_scans = [
+            name for node_type, name in nodes
+            if node_type in ('Index Scan', 'Index Only Scan')
+        ]
+        self.assertIn(index_name, index_scans, nodes)
+
+    def test_owner_listing_uses_partial_index(self):
+        """Test the listing page is an ordered scan of active (owner, -id)."""
+        queryset = Organization.objects.filter(
+            owner_id=self.owner_id,
+        ).order_by('-id')[:100]
+        self.assertIndexScan(queryset, 'org_owner_active_id_idx')
+
+    def test_deep_page_uses_composite_index(self):
+        """Test a keyset page deep into the listing stays an index scan."""
+        last_id = Organization.objects.filter(
+            owner_id=self.owner_id,
+        ).order_by('id').values_list('id', flat=True)[ROWS_PER_OWNER // 2]
+        queryset = Organization.objects.filter(
+            owner_id=self.owner_id,
+            id__lt=last_id,
+        ).order_by('-id')[:100]
+        self.assertIndexScan(queryset, 'org_owner_active_id_idx')
+
+    def test_all_objects_listing_uses_owner_index(self):
+        """Test listing soft-deleted rows too does not scan the table."""
+        queryset = Organization.all_objects.filter(
+            owner_id=self.owner_id,
+        ).order_by('-id')[:100]
+        self.assertNotIn(
+            ('Seq Scan', 'core_organization'), self.get_plan_nodes(queryset),
+        )
+
+    def test_archival_uses_inactive_index(self):
+        """Test finding long-inactive rows uses the partial index."""
+        queryset = Organization.all_objects.alias(
+            changed_at=Coalesce('updated_at', 'created_at'),
+        ).filter(
+            is_active=False,
+            changed_at__lt=timezone.now() - datetime.timedelta(days=30),
+        )
+        nodes = self.get_plan_nodes(queryset)
+        self.assertNotIn(('Seq Scan', 'core_organization'), nodes)
+        self.assertIn(
+            'org_inactive_changed_idx', [name for _, name in nodes], nodes,
+        )
+
+    def test_subtree_uses_path_index(self):
+        """Test a subtree lookup is a prefix scan of the path index."""
+        organization = Organization.objects.filter(
+            owner_id=self.owner_id,
+        ).first()
+        queryset = Organization.objects.filter(
+            owner_id=self.owner_id,
+            path__startswith=organization.path,
+        ).exclude(pk=organization.pk)
+        nodes = self.get_plan_nodes(queryset)
+        self.assertNotIn(('Seq Scan', 'core_organization'), nodes)
+        self.assertIn('org_path_idx', [name for _, name in nodes], nodes)
+
+    def test_search_uses_gin_indexes(self):
+        """Test a search combines the full-text and trigram indexes."""
+        request = Request(RequestFactory().get('/', {'search': '424242'}))
+        view = SimpleNamespace(action='list')
+        # One owner's active rows are few enough to be read through the
+        # partial owner index; across owners only the GIN indexes help.
+        scoped = OrganizationSearchFilter().filter_queryset(
+            request,
+            Organization.objects.filter(owner_id=self.owner_id),
+            view,
+        )
+        self.assertNotIn(
+            ('Seq Scan', 'core_organization'), self.get_plan_nodes(scoped),
+        )
+        queryset = OrganizationSearchFilter().filter_queryset(
+            request, Organization.objects.all(), view,
+        )
+        nodes = self.get_plan_nodes(queryset)
+        self.assertNotIn(('Seq Scan', 'core_organization'), nodes)
+        index_names = [name for _, name in nodes]
+        self.assertIn('org_search_vector_idx', index_names, nodes)
+        self.assertIn('org_name_trgm_idx', index_names, nodes)
+
+    def test_list_filters_use_indexes(self):
+        """Test every accepted filter and ordering combination is indexed."""
+        values = {
+            'is_parent': 'false',
+            'email_domain': 'Example.com',
+        }
+        for filters, ordering in OrganizationFilter.indexed:
+            params = {name: values[name] for name in filters}
+            params['ordering'] = f'-{ordering}'
+            if ordering == 'created_at':
+                params['created_after'] = '2000-01-01T00:00:00Z'
+            with self.subTest(**params):
+                request = Request(RequestFactory().get('/', params))
+                queryset = OrganizationFilter().filter_queryset(
+                    request,
+                    Organization.objects.filter(owner_id=self.owner_id),
+                    SimpleNamespace(action='list'),
+                )[:100]
+                nodes = self.get_plan_nodes(queryset)
+                self.assertNotIn(('Seq Scan', 'core_organization'), nodes)
+                self.assertNotIn('Sort', [node_type for node_type, _ in nodes])
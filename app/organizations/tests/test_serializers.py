@@ -0,0 +1,77 @@
+"""
+Tests for the organization serializers.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Organization
+from core.renderers import ORJSONRenderer
+from organizations.serializers import (
+    OrganizationDetailSerializer,
+    ValuesSerializer,
+)
+
+
+class ValuesSerializerTests(TestCase):
+    """Test the `.values()` fast path matches the ModelSerializer."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        root = Organization.objects.create(
+            owner=user,
+            name='Ünïcode \u2028 line \u2029 "quoted" \\ <tag>',
+            email='root@example.com',
+            description='Tabs\tnewlines\n and emoji \U0001f600',
+            is_parent=True,
+        )
+        Organization.objects.create(
+            owner=user,
+            name='Child',
+            email='child@example.com',
+            parent=root,
+            is_active=False,
+        )
+        orphan = Organization.objects.create(
+            owner=user, name='Never updated', email='orphan@example.com',
+        )
+        Organization.objects.filter(pk=orphan.pk).update(updated_at=None)
+        self.queryset = Organization.all_objects.order_by('id')
+
+    def render_both(self, fields=None):
+        expected = JSONRenderer().render(
+            OrganizationDetailSerializer(
+                self.queryset, many=True, fields=fields,
+            ).data
+        )
+        serializer = ValuesSerializer(
+            OrganizationDetailSerializer(fields=fields)
+        )
+        actual = ORJSONRenderer().render(
+            serializer.to_representation(
+                serializer.get_values(self.queryset)
+            )
+        )
+        return expected, actual
+
+    def test_output_is_byte_identical(self):
+        """Test the fast path renders the same bytes as the serializer."""
+        expected, actual = self.render_both()
+        self.assertEqual(actual, expected)
+        self.assertIn(b'\\u2028', actual)
+
+    def test_projection_is_byte_identical(self):
+        """Test projections render the same bytes as the serializer."""
+        expected, actual = self.render_both(fields=['name', 'updated_at'])
+        self.assertEqual(actual, expected)
+
+    def test_reads_only_needed_columns(self):
+        """Test only the projected columns and the key are selected."""
+        serializer = ValuesSerializer(
+            OrganizationDetailSerializer(fields=['name', 'parent'])
+        )
+        row = serializer.get_values(self.queryset).first()
+        self.assertEqual(set(row), {'id', 'name', 'parent_id'})
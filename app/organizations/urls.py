@@ -6,7 +6,7 @@ from django.urls import (
     include
 )
 from rest_framework.routers import DefaultRouter
-from organizations import views
+from organizations import async_views, views
 
 
 router = DefaultRouter()
@@ -15,5 +15,15 @@ router.register('', views.OrganizationViewSet, basename='organization')
 app_name = 'organizations'
 
 urlpatterns = [
+    path(
+        'async/',
+        async_views.organization_list,
+        name='organization-async-list',
+    ),
+    path(
+        'async/<int:pk>/',
+        async_views.organization_detail,
+        name='organization-async-detail',
+    ),
     path('', include(router.urls)),
 ]
@@ -2,40 +2,295 @@
 View for organizations API
 """
 
-from rest_framework import viewsets
+from django.db import transaction
+from django.db.models.functions import Length
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext as _
+from rest_framework import serializers as drf_serializers
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 
-from core.models import Organization
+from core.models import Organization, OrganizationCounts
+from organizations import cache as list_cache
 from organizations import serializers
+from organizations.export import EXPORT_FORMATS, iter_csv, iter_ndjson
+from organizations.filters import OrganizationFilter, OrganizationSearchFilter
+from organizations.mixins import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+)
+from organizations.pagination import OrganizationCursorPagination
+from user.authentication import CachedTokenAuthentication
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(
+    ConditionalGetMixin,
+    CachedListMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for the Organization model.
     """
     queryset = Organization.objects.all()
     serializer_class = serializers.OrganizationSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    pagination_class = OrganizationCursorPagination
+    filter_backends = [OrganizationFilter, OrganizationSearchFilter]
     http_method_names = ['get', 'post', 'patch', 'delete', 'put']
+    export_chunk_size = 2000
+    # Read actions that accept a `?fields=` projection.
+    projected_actions = (
+        'list', 'retrieve', 'descendants', 'ancestors', 'export',
+    )
+    # Most SQL queries per request, independent of the number of rows
+    # (see core.middleware.InstrumentationMiddleware). bulk_update has
+    # none since it moves each reparented subtree separately.
+    query_budget = {
+        'list': 3,
+        'retrieve': 3,
+        'create': 7,
+        'update': 6,
+        'partial_update': 8,
+        'destroy': 3,
+        'bulk': 7,
+        'bulk_destroy': 6,
+        'descendants': 2,
+        'descendant_count': 2,
+        'ancestors': 2,
+        'counts': 1,
+    }
 
     def get_queryset(self):
         """
-        Optionally restricts the returned organizations to a given user,
-        by filtering against a `user` query parameter in the URL.
+        Return the requester's organizations, newest first.
+
+        The list filters and orderings are applied by `OrganizationFilter`.
+        """
+        queryset = self.queryset.filter(owner=self.request.user)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            queryset = queryset.only(*fields)
+        return queryset.order_by('-id')
+
+    def get_requested_fields(self):
+        """
+        Return the field names requested with `?fields=`, or None.
+
+        Every requested name must be a field of the action's serializer;
+        the same names limit both the rendered output and the SELECT.
         """
-        return self.queryset.filter(owner=self.request.user).order_by('-id')
+        value = self.request.query_params.get('fields', '')
+        if self.action not in self.projected_actions or not value.strip():
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        available = self.get_serializer_class().Meta.fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise drf_serializers.ValidationError({
+                'fields': [_('Unknown fields: {fields}.').format(
+                    fields=', '.join(unknown),
+                )]
+            })
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer, limited to the requested fields."""
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        """Return search results as one ranked page instead of a cursor."""
+        if OrganizationSearchFilter().is_active(self.request, self):
+            return None
+        return super().paginate_queryset(queryset)
 
     def perform_create(self, serializer):
         """Set the owner to the authenticated user."""
         serializer.save(owner=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Soft delete the organization and its subtree."""
+        instance.soft_delete()
+        list_cache.invalidate(instance.owner_id)
+
+    def get_bulk_organizations(self, ids):
+        """
+        Return the requester's organizations for `ids`, in the same order.
+
+        Raises a ValidationError with one entry per submitted id when an
+        id is malformed, repeated or not found in the owner's scope.
+        """
+        max_length = serializers.OrganizationListSerializer.max_length
+        if not isinstance(ids, list) or len(ids) > max_length:
+            message = _(
+                'Expected a list of at most {max_length} items.'
+            ).format(max_length=max_length)
+            raise drf_serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            })
+
+        # JSON true and false arrive as bools, which are ints in Python.
+        valid = [
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in ids
+        ]
+        organizations = self.get_queryset().in_bulk([
+            pk for pk, is_valid in zip(ids, valid) if is_valid
+        ])
+        errors = []
+        seen = set()
+        for pk, is_valid in zip(ids, valid):
+            if not is_valid:
+                errors.append({'id': [_('A valid integer is required.')]})
+            elif pk in seen:
+                errors.append({'id': [_('Duplicate id.')]})
+            elif pk not in organizations:
+                errors.append({'id': [_('Not found.')]})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            raise drf_serializers.ValidationError(errors)
+        return [organizations[pk] for pk in ids]
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Create a batch of organizations in one transaction."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+            list_cache.invalidate(request.user.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a batch of organizations by id."""
+        items = request.data
+        if isinstance(items, list) and all(
+            isinstance(item, dict) for item in items
+        ):
+            ids = [item.get('id') for item in items]
+        else:
+            ids = items
+        organizations = self.get_bulk_organizations(ids)
+        serializer = self.get_serializer(
+            organizations,
+            data=items,
+            many=True,
+            partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+            list_cache.invalidate(request.user.pk)
+        return Response(serializer.data)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """Soft delete a batch of organizations given a list of ids."""
+        organizations = self.get_bulk_organizations(request.data)
+        with transaction.atomic():
+            Organization.soft_delete_subtrees(organizations)
+            list_cache.invalidate(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_descendants_queryset(self, organization):
+        """Return the subtree below `organization`, as one prefix match."""
+        return self.get_queryset().filter(
+            path__startswith=organization.path,
+        ).exclude(pk=organization.pk)
+
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        """List every organization in the subtree below this one."""
+        queryset = self.get_descendants_queryset(self.get_object())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='descendants/count')
+    def descendant_count(self, request, pk=None):
+        """Count the organizations in the subtree below this one."""
+        queryset = self.get_descendants_queryset(self.get_object())
+        return Response({'count': queryset.count()})
+
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        """List the ancestors of this organization, root first."""
+        organization = self.get_object()
+        queryset = self.get_queryset().filter(
+            pk__in=organization.get_ancestor_ids(),
+        ).order_by(Length('path'))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """
+        Return how many active and active parent organizations the
+        requester has, read from the denormalized counts row.
+        """
+        counts = OrganizationCounts.objects.filter(
+            owner=request.user,
+        ).first() or OrganizationCounts(owner=request.user)
+        serializer = self.get_serializer(counts)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every organization of the requester as NDJSON or CSV.
+
+        Rows are read with a server-side cursor and encoded one at a time,
+        so memory stays flat and the first bytes go out before the query
+        has been fully consumed. Select the encoding with `?output=` and the
+        columns with `?fields=`.
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise drf_serializers.ValidationError({
+                'output': [_('Expected one of: {choices}.').format(
+                    choices=', '.join(EXPORT_FORMATS),
+                )]
+            })
+        content_type, extension = EXPORT_FORMATS[output]
+
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(organization)
+            for organization in self.get_queryset().iterator(
+                chunk_size=self.export_chunk_size,
+            )
+        )
+        if output == 'csv':
+            content = iter_csv(rows, list(serializer.fields))
+        else:
+            content = iter_ndjson(rows)
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="organizations.{extension}"'
+        )
+        return response
+
     def get_serializer_class(self):
         """
         Return the appropriate serializer class based on the action.
         """
-        if self.action == 'list':
+        if self.action in ('list', 'descendants', 'ancestors', 'export'):
             return serializers.OrganizationDetailSerializer
+        if self.action == 'counts':
+            return serializers.OrganizationCountsSerializer
         return self.serializer_class
@@ -0,0 +1,54 @@
+"""
+Async (ASGI-native) read views for the user API.
+
+These views return the same bodies as their DRF counterparts. Without a
+shared token cache, requests whose token is in the in-process cache never
+leave the event loop (see `user.authentication.aauthenticate`).
+"""
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import exceptions, status
+
+from core.renderers import ORJSONRenderer
+from user.authentication import CachedTokenAuthentication, aauthenticate
+from user.serializers import ManageUserSerializer
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """Return `data` rendered exactly as the DRF JSON renderer would."""
+    return HttpResponse(
+        ORJSONRenderer().render(data),
+        content_type='application/json',
+        status=status_code,
+    )
+
+
+def error_response(exc):
+    """Return the JSON error response DRF would send for `exc`."""
+    response = json_response({'detail': exc.detail}, exc.status_code)
+    if isinstance(exc, (
+        exceptions.NotAuthenticated,
+        exceptions.AuthenticationFailed,
+    )):
+        response['WWW-Authenticate'] = CachedTokenAuthentication.keyword
+    return response
+
+
+async def get_user_or_error(request):
+    """Return (user, None) or (None, error response) for a GET request."""
+    if request.method != 'GET':
+        return None, HttpResponseNotAllowed(['GET'])
+    try:
+        user = await aauthenticate(request)
+    except exceptions.AuthenticationFailed as exc:
+        return None, error_response(exc)
+    if user is None:
+        return None, error_response(exceptions.NotAuthenticated())
+    return user, None
+
+
+async def me(request):
+    """Return the authenticated user."""
+    user, error = await get_user_or_error(request)
+    if error is not None:
+        return error
+    return json_response(ManageUserSerializer(user).data)
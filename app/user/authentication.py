@@ -0,0 +1,293 @@
+"""
+Authentication classes for the API.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from core.routers import routing, uses_replica
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU of token key -> Token with a per-entry TTL.
+
+    Each entry also keeps the user's revocation version it was cached
+    under (None without a shared tier). A reverse index of user id ->
+    token keys lets entries be dropped when the user changes without a
+    database lookup.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (token, version) for `key`, or None if missing or stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, version, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return token, version
+
+    def set(self, key, token, version=None):
+        """Cache `token` under `key`, evicting the least recently used."""
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (token, version, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(token.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        """Drop the entry for `key` if present."""
+        with self._lock:
+            self._remove(key)
+
+    def delete_user(self, user_id):
+        """Drop every entry belonging to `user_id`."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0].user_id
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    """Return the process-wide token cache configured from settings."""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache(
+                    max_size=settings.TOKEN_AUTH_CACHE['MAX_SIZE'],
+                    ttl=settings.TOKEN_AUTH_CACHE['TTL'],
+                )
+    return _token_cache
+
+
+def get_shared_token_cache():
+    """Return the shared cache tier, or None when it is not configured."""
+    alias = settings.TOKEN_AUTH_CACHE.get('SHARED_CACHE')
+    if not alias:
+        return None
+    return caches[alias]
+
+
+def shared_cache_key(key):
+    """Return the shared cache key for a token key."""
+    return f'token-auth:{key}'
+
+
+def user_version_key(user_id):
+    """Return the shared cache key of a user's revocation version."""
+    return f'token-auth:user-version:{user_id}'
+
+
+def get_user_version(shared, user_id):
+    """Return the user's current revocation version, creating it if missing."""
+    return shared.get_or_set(user_version_key(user_id), time.time_ns, None)
+
+
+def revoke_user(shared, user_id):
+    """Move the user's version on so every process drops their tokens."""
+    try:
+        shared.incr(user_version_key(user_id))
+    except ValueError:
+        # Missing: entries cached under the old version no longer match.
+        pass
+
+
+def pack_token(token, version):
+    """
+    Return the shared cache payload for a token.
+
+    Only plain field values are stored, and never the password hash: the
+    user is rebuilt with the password deferred, so it is read from the
+    database only by the code that needs it.
+    """
+    user = token.user
+    return {
+        'version': version,
+        'user_id': token.user_id,
+        'created': token.created,
+        'user': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname != 'password'
+        },
+    }
+
+
+def unpack_token(model, key, data):
+    """Rebuild the token and its user from a shared cache payload."""
+    user_model = get_user_model()
+    values = data['user']
+    user = user_model.from_db(
+        router.db_for_read(user_model), list(values), list(values.values()),
+    )
+    token = model.from_db(
+        router.db_for_read(model),
+        ['key', 'user_id', 'created'],
+        [key, data['user_id'], data['created']],
+    )
+    token.user = user
+    return token
+
+
+def invalidate_token(token):
+    """Remove a token from every cache tier."""
+    get_token_cache().delete(token.key)
+    shared = get_shared_token_cache()
+    if shared is not None:
+        shared.delete(shared_cache_key(token.key))
+        revoke_user(shared, token.user_id)
+
+
+def invalidate_user(user):
+    """Remove every cached token of `user` from every cache tier."""
+    get_token_cache().delete_user(user.pk)
+    shared = get_shared_token_cache()
+    if shared is not None:
+        revoke_user(shared, user.pk)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the resolved token and user.
+
+    Lookups go to the in-process LRU first, then to the optional shared
+    cache, and only then to the database. Entries are invalidated by the
+    signals in `user.signals`.
+
+    With a shared cache, every entry records the user's revocation
+    version; the signals move it on, and an LRU hit is checked against it
+    with one cache read, so a deleted token or a deactivated user is
+    rejected by every process on its next request. Without one, the
+    other processes keep accepting the token until their entry expires,
+    up to `TOKEN_AUTH_CACHE['TTL']` seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        """Return (user, token) for `key`, using the caches when possible."""
+        local = get_token_cache()
+        shared = get_shared_token_cache()
+        token = None
+        entry = local.get(key)
+        if entry is not None:
+            token, version = entry
+            if shared is not None and version != shared.get(
+                user_version_key(token.user_id),
+            ):
+                local.delete(key)
+                token = None
+        if token is None:
+            version = None
+            if shared is not None:
+                data = shared.get(shared_cache_key(key))
+                if data is not None and data['version'] == shared.get(
+                    user_version_key(data['user_id']),
+                ):
+                    token = unpack_token(self.get_model(), key, data)
+                    version = data['version']
+            if token is None:
+                user, token = self.lookup(key)
+                if shared is not None:
+                    version = get_user_version(shared, token.user_id)
+                    shared.set(
+                        shared_cache_key(key),
+                        pack_token(token, version),
+                        settings.TOKEN_AUTH_CACHE['TTL'],
+                    )
+            local.set(key, token, version)
+
+        # Hand each request its own copies so that views mutating
+        # request.user never touch the cached instances.
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return (token.user, token)
+
+    def lookup(self, key):
+        """Resolve `key` from the database, retrying replica misses."""
+        try:
+            return super().authenticate_credentials(key)
+        except exceptions.AuthenticationFailed:
+            if not uses_replica():
+                raise
+        # A token created moments ago, e.g. by logging in from a client
+        # that keeps no cookies, may not have reached the replica yet.
+        with routing(use_replica=False):
+            return super().authenticate_credentials(key)
+
+
+async def aauthenticate(request):
+    """
+    Authenticate a plain Django request from an async view.
+
+    Returns the user, or None when no token was sent, and raises
+    AuthenticationFailed for a bad token. Without a shared cache tier a
+    token found in the in-process LRU is resolved without leaving the
+    event loop; otherwise one thread hop runs the regular cached lookup,
+    since the shared cache client blocks.
+    """
+    authentication = CachedTokenAuthentication()
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != authentication.keyword.lower().encode():
+        return None
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+
+    entry = get_token_cache().get(key)
+    if entry is not None and get_shared_token_cache() is None:
+        return copy.copy(entry[0].user)
+    user, _token = await sync_to_async(
+        authentication.authenticate_credentials
+    )(key)
+    return user
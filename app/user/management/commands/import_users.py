@@ -0,0 +1,254 @@
+"""
+Command file
+Django command to bulk import users from a CSV or JSON Lines file
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model, hashers
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import router, transaction
+
+from user.serializers import UserSerializer
+
+FORMATS = ('csv', 'jsonl')
+
+
+def read_rows(path, file_format):
+    """Yield (line number, row dict or None if unparsable) from `path`."""
+    with open(path, newline='', encoding='utf-8-sig') as source:
+        if file_format == 'csv':
+            reader = csv.DictReader(source)
+            if 'email' not in (reader.fieldnames or ()):
+                raise CommandError(f'{path} has no "email" column.')
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+class Command(BaseCommand):
+    """
+    Django command to create users in bulk.
+
+    Each row has an `email` and optional `name` and `password` columns
+    (CSV) or keys (JSON Lines). Rows are read in chunks of
+    `--batch-size`: emails are validated and normalized like
+    `UserManager.create_user` does, emails already in the table are
+    skipped with one query per chunk, the remaining passwords are hashed
+    on `--workers` processes and the users are written with one
+    `bulk_create`. Rows without a password get an unusable one.
+
+    After every committed chunk the number of rows done is saved to
+    `--state-file`, so an interrupted import resumes after the last
+    committed chunk; the file is removed once the import completes. A
+    chunk replayed after a crash is harmless because existing emails are
+    skipped. A user signing up through the API between the check and
+    the write is left alone by the unique email index (the row is still
+    reported as created).
+    """
+    help = 'Create users in bulk from a CSV or JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON Lines file to import.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='File format. Defaults to the file extension.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows hashed and written per transaction.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Processes hashing passwords; 0 hashes inline.',
+        )
+        parser.add_argument(
+            '--state-file',
+            help='Progress file for resuming. Defaults to PATH.import-state.',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore a saved state and start from the first row.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        path = options['path']
+        file_format = options['format'] or (
+            os.path.splitext(path)[1].lstrip('.').lower()
+        )
+        if file_format == 'ndjson':
+            file_format = 'jsonl'
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Cannot tell the format of {path}; pass --format.'
+            )
+        try:
+            stat = os.stat(path)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc.strerror}.')
+
+        self.user_model = get_user_model()
+        self.using = router.db_for_write(self.user_model)
+        self.state_file = options['state_file'] or f'{path}.import-state'
+        self.source = {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        self.state = self.load_state(options['restart'])
+        done = self.state['rows']
+        if done:
+            self.stdout.write(f'Resuming after row {done}.')
+
+        workers = options['workers']
+        executor = None
+        if workers:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=django.setup,
+            )
+        self.started = time.monotonic()
+        self.processed = 0
+        try:
+            chunk = []
+            for index, (line_number, row) in enumerate(
+                read_rows(path, file_format)
+            ):
+                if index < done:
+                    continue
+                chunk.append((line_number, row))
+                if len(chunk) >= options['batch_size']:
+                    self.import_chunk(chunk, executor, workers)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, executor, workers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.state['created']} users "
+            f"({self.state['duplicates']} duplicates skipped, "
+            f"{self.state['invalid']} invalid rows)."
+        ))
+
+    def load_state(self, restart):
+        """Return the saved progress, or a fresh state."""
+        state = {**self.source, 'rows': 0, 'created': 0, 'duplicates': 0,
+                 'invalid': 0}
+        if restart or not os.path.exists(self.state_file):
+            return state
+        with open(self.state_file) as state_file:
+            saved = json.load(state_file)
+        if any(saved.get(key) != value for key, value in self.source.items()):
+            raise CommandError(
+                f'{self.state_file} was saved for a different file or an '
+                f'older version of it; pass --restart to import from the '
+                f'first row.'
+            )
+        state.update(saved)
+        return state
+
+    def save_state(self):
+        """Write the progress atomically."""
+        temp_file = f'{self.state_file}.tmp'
+        with open(temp_file, 'w') as state_file:
+            json.dump(self.state, state_file)
+        os.replace(temp_file, self.state_file)
+
+    def clean(self, line_number, row):
+        """Return (email, name, password) for a row, or None if invalid."""
+        if row is None:
+            self.stderr.write(f'Line {line_number}: not a JSON object.')
+            return None
+        email = self.user_model.objects.normalize_email(
+            str(row.get('email') or '').strip()
+        )
+        name = str(row.get('name') or '').strip()
+        password = row.get('password') or None
+        errors = []
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append(f'invalid email {email!r}')
+        for field, value in (('email', email), ('name', name)):
+            max_length = self.user_model._meta.get_field(field).max_length
+            if len(value) > max_length:
+                errors.append(f'{field} longer than {max_length} characters')
+        min_length = (
+            UserSerializer.Meta.extra_kwargs['password']['min_length']
+        )
+        if password is not None and len(str(password)) < min_length:
+            errors.append(f'password shorter than {min_length} characters')
+        if errors:
+            self.stderr.write(f"Line {line_number}: {'; '.join(errors)}.")
+            return None
+        return email, name, password if password is None else str(password)
+
+    def import_chunk(self, chunk, executor, workers):
+        """Validate, de-duplicate, hash and write one chunk of rows."""
+        rows = {}
+        for line_number, row in chunk:
+            cleaned = self.clean(line_number, row)
+            if cleaned is None:
+                self.state['invalid'] += 1
+            elif cleaned[0] in rows:
+                self.state['duplicates'] += 1
+            else:
+                rows[cleaned[0]] = cleaned
+
+        existing = set(
+            self.user_model.objects.using(self.using).filter(
+                email__in=list(rows),
+            ).values_list('email', flat=True)
+        )
+        self.state['duplicates'] += len(existing)
+        new = [row for email, row in rows.items() if email not in existing]
+
+        passwords = [password for _, _, password in new]
+        if executor is None:
+            hashes = list(map(hashers.make_password, passwords))
+        else:
+            hashes = list(executor.map(
+                hashers.make_password,
+                passwords,
+                chunksize=max(1, len(passwords) // (workers * 4)),
+            ))
+
+        users = [
+            self.user_model(email=email, name=name, password=encoded)
+            for (email, name, _), encoded in zip(new, hashes)
+        ]
+        with transaction.atomic(using=self.using):
+            self.user_model.objects.using(self.using).bulk_create(
+                users, ignore_conflicts=True,
+            )
+        self.state['created'] += len(users)
+        self.state['rows'] += len(chunk)
+        self.save_state()
+        self.processed += len(chunk)
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f"Processed {self.state['rows']} rows: "
+            f"{self.state['created']} created, "
+            f"{self.state['duplicates']} duplicates, "
+            f"{self.state['invalid']} invalid "
+            f"({self.processed / max(elapsed, 1e-9):.0f} rows/s)."
+        )
@@ -10,8 +10,11 @@ from django.contrib.auth import (
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from core.instrumentation import TimedSerializerMixin
+from user.throttling import client_ip, get_login_throttle
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
     class Meta:
@@ -30,7 +33,9 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class ManageUserSerializer(serializers.ModelSerializer):
+class ManageUserSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer,
+):
     """Serializer for managing the authenticated user."""
     class Meta:
         model = get_user_model()
@@ -65,14 +70,24 @@ class AuthTokenSerializer(serializers.Serializer):
         """Validate and authenticate user"""
         email = attrs.get('email')
         password = attrs.get('password')
+        request = self.context.get('request')
+        ip = client_ip(request) if request else None
+        msg = _('Unable to authenticate user')
+
+        throttle = get_login_throttle()
+        attempt = throttle.acquire(email, ip)
+        if throttle.is_known_failure(email, password):
+            throttle.release(email, ip, attempt)
+            raise serializers.ValidationError(msg, code='authorization')
 
         user = authenticate(
-            request=self.context.get('request'),
+            request=request,
             username=email,
             password=password
         )
         if not user:
-            msg = _('Unable to authenticate user')
+            throttle.record_failure(email, password)
             raise serializers.ValidationError(msg, code='authorization')
+        throttle.record_success(email, ip, attempt)
         attrs['user'] = user
         return attrs
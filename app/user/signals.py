@@ -0,0 +1,28 @@
+"""
+Signal handlers for the user app.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_token, invalidate_user
+from user.throttling import get_login_throttle
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_tokens_on_user_save(sender, instance, **kwargs):
+    """Drop cached tokens so password and is_active changes apply."""
+    invalidate_user(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_failed_logins_on_user_save(sender, instance, **kwargs):
+    """Drop cached login failures so a new password works at once."""
+    get_login_throttle().forget(instance.email)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token_on_delete(sender, instance, **kwargs):
+    """Drop a deleted token from the caches."""
+    invalidate_token(instance)
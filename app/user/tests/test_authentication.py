@@ -0,0 +1,186 @@
+"""
+Tests for the cached token authentication.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    TokenCache,
+    get_token_cache,
+    revoke_user,
+    shared_cache_key,
+)
+
+ME_URL = reverse('user:me')
+ME_ASYNC_URL = reverse('user:me-async')
+
+
+class FakeToken:
+    """Minimal stand-in for a Token in cache unit tests."""
+
+    def __init__(self, key, user_id):
+        self.key = key
+        self.user_id = user_id
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test the in-process token LRU."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry is evicted past max size."""
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', FakeToken('a', 1))
+        cache.set('b', FakeToken('b', 2))
+        cache.get('a')
+        cache.set('c', FakeToken('c', 3))
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(len(cache), 2)
+
+    @patch('user.authentication.time.monotonic')
+    def test_entries_expire(self, patched_monotonic):
+        """Test entries are not returned after their TTL."""
+        patched_monotonic.return_value = 100
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set('a', FakeToken('a', 1))
+
+        patched_monotonic.return_value = 159
+        self.assertIsNotNone(cache.get('a'))
+        patched_monotonic.return_value = 160
+        self.assertIsNone(cache.get('a'))
+
+    def test_delete_user(self):
+        """Test every entry of a user can be dropped at once."""
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set('a', FakeToken('a', 1))
+        cache.set('b', FakeToken('b', 2))
+        cache.delete_user(1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests with cached tokens."""
+
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_request_skips_database(self):
+        """Test a cached token authenticates without queries."""
+        self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 100,
+        'TTL': 60,
+        'SHARED_CACHE': 'default',
+    })
+    def test_shared_cache_tier(self):
+        """Test a token cached by another process skips the database."""
+        cache.clear()
+        self.client.get(ME_URL)
+        get_token_cache().clear()
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.token.delete()
+        get_token_cache().clear()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 100,
+        'TTL': 60,
+        'SHARED_CACHE': 'default',
+    })
+    def test_shared_cache_stores_no_password(self):
+        """Test the shared tier keeps field values but not the hash."""
+        cache.clear()
+        self.client.get(ME_URL)
+
+        data = cache.get(shared_cache_key(self.token.key))
+        self.assertEqual(data['user']['email'], self.user.email)
+        self.assertNotIn('password', data['user'])
+
+        get_token_cache().clear()
+        res = self.client.patch(ME_URL, {'name': 'Other Name'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 100,
+        'TTL': 60,
+        'SHARED_CACHE': 'default',
+    })
+    def test_revocation_reaches_other_processes(self):
+        """Test an LRU hit is rejected once another process revokes."""
+        cache.clear()
+        self.client.get(ME_URL)
+        # Deactivate as another process would: its signal only reaches
+        # the shared cache, not this process's LRU.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False,
+        )
+        revoke_user(cache, self.user.pk)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates(self):
+        """Test updating the password drops the cached entry."""
+        self.client.get(ME_URL)
+        res = self.client.patch(ME_URL, {'password': 'newpassword123'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(get_token_cache().get(self.token.key))
+
+    def test_inactive_user_rejected(self):
+        """Test deactivating a user rejects their cached token."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token rejects it even if it was cached."""
+        self.client.get(ME_URL)
+        self.token.delete()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_name_change_not_stale(self):
+        """Test profile changes are visible on the next request."""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'New Name'})
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['name'], 'New Name')
+
+    def test_async_me_matches_sync_me(self):
+        """Test the async profile view returns the same body."""
+        sync_response = self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            async_response = self.client.get(ME_ASYNC_URL)
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.content, sync_response.content)
@@ -0,0 +1,126 @@
+"""
+Test custom Django management commands of the user app.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+
+class ImportUsersCommandTests(TestCase):
+    """Test bulk importing users from a file."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as source:
+            source.write(content)
+        return path
+
+    def import_users(self, *args):
+        out = StringIO()
+        err = StringIO()
+        call_command(
+            'import_users', *args, '--workers=0', stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        """Test valid rows are created and the rest are reported."""
+        get_user_model().objects.create_user('taken@example.com', 'pass123')
+        path = self.write('users.csv', (
+            'email,name,password\n'
+            'one@EXAMPLE.com,One,secret1\n'
+            'two@example.com,Two,\n'
+            'one@example.com,Again,secret1\n'
+            'taken@example.com,Taken,secret1\n'
+            'not-an-email,Bad,secret1\n'
+            'short@example.com,Short,pw\n'
+        ))
+
+        out, err = self.import_users(path, '--batch-size=4')
+
+        self.assertIn('Imported 2 users (2 duplicates skipped, 2 invalid', out)
+        self.assertIn('Processed 4 rows', out)
+        self.assertIn('Line 6: invalid email', err)
+        self.assertIn('Line 7: password shorter than 5 characters', err)
+        one = get_user_model().objects.get(email='one@example.com')
+        self.assertEqual(one.name, 'One')
+        self.assertTrue(one.check_password('secret1'))
+        two = get_user_model().objects.get(email='two@example.com')
+        self.assertFalse(two.has_usable_password())
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertFalse(os.path.exists(f'{path}.import-state'))
+
+    def test_import_jsonl_with_process_pool(self):
+        """Test JSON Lines rows are hashed on worker processes."""
+        path = self.write('users.jsonl', '\n'.join([
+            json.dumps({'email': 'a@example.com', 'password': 'secret1'}),
+            'not json',
+            json.dumps({'email': 'b@example.com', 'password': 'secret2'}),
+        ]))
+
+        out = StringIO()
+        call_command(
+            'import_users', path, '--workers=2', stdout=out, stderr=StringIO(),
+        )
+
+        self.assertIn('Imported 2 users', out.getvalue())
+        user = get_user_model().objects.get(email='b@example.com')
+        self.assertTrue(user.check_password('secret2'))
+
+    def test_resume_from_state(self):
+        """Test an import resumes after the last committed chunk."""
+        path = self.write('users.csv', (
+            'email\nfirst@example.com\nsecond@example.com\n'
+        ))
+        state_file = os.path.join(self.directory, 'state.json')
+        stat = os.stat(path)
+        with open(state_file, 'w') as state:
+            json.dump({
+                'path': os.path.abspath(path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'rows': 1,
+                'created': 1,
+                'duplicates': 0,
+                'invalid': 0,
+            }, state)
+
+        out, _err = self.import_users(path, f'--state-file={state_file}')
+
+        self.assertIn('Resuming after row 1.', out)
+        self.assertIn('Imported 2 users', out)
+        self.assertEqual(
+            list(get_user_model().objects.values_list('email', flat=True)),
+            ['second@example.com'],
+        )
+        self.assertFalse(os.path.exists(state_file))
+
+    def test_state_for_changed_file_refused(self):
+        """Test a state saved for another version of the file is refused."""
+        path = self.write('users.csv', 'email\nfirst@example.com\n')
+        with open(f'{path}.import-state', 'w') as state:
+            json.dump({'path': os.path.abspath(path), 'size': 1}, state)
+
+        with self.assertRaisesMessage(CommandError, '--restart'):
+            self.import_users(path)
+
+        out, _err = self.import_users(path, '--restart')
+        self.assertIn('Imported 1 users', out)
+
+    def test_csv_without_email_column(self):
+        """Test a CSV file without an email column is refused."""
+        path = self.write('users.csv', 'name\nOne\n')
+
+        with self.assertRaisesMessage(CommandError, 'no "email" column'):
+            self.import_users(path)
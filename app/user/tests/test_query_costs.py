@@ -0,0 +1,73 @@
+"""
+Test the user API does not issue more queries as data grows.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.testing import SCALES, QueryCostMixin, create_organizations
+from user.throttling import get_login_throttle
+
+CREATE_USER_URL = reverse('user:create')
+TOKEN_URL = reverse('user:token')
+ME_URL = reverse('user:me')
+
+
+class UserQueryCostTests(QueryCostMixin, TestCase):
+    """Test the user endpoints for owners of 1, 100 and 10k organizations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {}
+        for scale in SCALES:
+            user = get_user_model().objects.create_user(
+                email=f'user{scale}@example.com',
+                password='testpass123',
+            )
+            create_organizations(user, scale)
+            cls.users[scale] = user
+
+    def setUp(self):
+        get_login_throttle().store.flushdb()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_me(self):
+        """Test retrieving the authenticated user."""
+        self.assertQueryCost(
+            lambda user: self.client_for(user).get(ME_URL),
+            self.users, max_queries=0,
+        )
+
+    def test_update_me(self):
+        """Test updating the authenticated user."""
+        self.assertQueryCost(
+            lambda user: self.client_for(user).patch(
+                ME_URL, {'name': 'New Name'}, format='json',
+            ),
+            self.users, max_queries=2,
+        )
+
+    def test_create_token(self):
+        """Test logging in."""
+        self.assertQueryCost(
+            lambda user: APIClient().post(TOKEN_URL, {
+                'email': user.email, 'password': 'testpass123',
+            }),
+            self.users, max_queries=5,
+        )
+
+    def test_create_user(self):
+        """Test signing up."""
+        self.assertQueryCost(
+            lambda user: APIClient().post(CREATE_USER_URL, {
+                'email': f'new-{user.email}',
+                'password': 'testpass123',
+                'name': 'New User',
+            }),
+            self.users, max_queries=2,
+        )
@@ -0,0 +1,210 @@
+"""
+Tests for login throttling.
+"""
+import sys
+import types
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+
+from core import metrics
+from user.throttling import (
+    LocalMemoryStore,
+    LoginThrottle,
+    client_ip,
+    create_store,
+    get_login_throttle,
+)
+
+TOKEN_URL = reverse('user:token')
+
+
+class LoginThrottleTests(SimpleTestCase):
+    """Test the throttle against the local store."""
+
+    def setUp(self):
+        self.throttle = LoginThrottle(
+            store=LocalMemoryStore(),
+            email_limit=3,
+            ip_limit=5,
+            window=60,
+            negative_ttl=10,
+        )
+
+    def test_email_limit(self):
+        """Test an email is throttled after too many failures."""
+        for i in range(3):
+            self.throttle.acquire('a@example.com', '10.0.0.1')
+            self.throttle.record_failure('a@example.com', str(i))
+        with self.assertRaises(Throttled):
+            self.throttle.acquire('A@example.com', '10.0.0.2')
+
+    def test_ip_limit(self):
+        """Test an IP is throttled across different emails."""
+        for i in range(5):
+            self.throttle.acquire(f'{i}@example.com', '10.0.0.1')
+        with self.assertRaises(Throttled):
+            self.throttle.acquire('new@example.com', '10.0.0.1')
+        self.throttle.acquire('new@example.com', '10.0.0.2')
+
+    def test_concurrent_attempts_limited(self):
+        """Test attempts in flight count before any of them fails."""
+        for _ in range(3):
+            self.throttle.acquire('a@example.com', None)
+        with self.assertRaises(Throttled):
+            self.throttle.acquire('a@example.com', None)
+
+    def test_rejected_and_released_attempts_not_counted(self):
+        """Test only attempts that were let through and kept count."""
+        attempt = self.throttle.acquire('a@example.com', None)
+        self.throttle.release('a@example.com', None, attempt)
+        for _ in range(3):
+            self.throttle.acquire('a@example.com', None)
+        for _ in range(2):
+            with self.assertRaises(Throttled):
+                self.throttle.acquire('a@example.com', None)
+
+    def test_success_releases_ip_attempt(self):
+        """Test a good login does not count against its IP."""
+        for i in range(5):
+            attempt = self.throttle.acquire(f'{i}@example.com', '10.0.0.1')
+            self.throttle.record_success(f'{i}@example.com', '10.0.0.1', attempt)
+        self.throttle.acquire('new@example.com', '10.0.0.1')
+
+    @patch('user.throttling.time.time')
+    def test_window_slides(self, patched_time):
+        """Test failures older than the window stop counting."""
+        patched_time.return_value = 1000
+        for i in range(3):
+            self.throttle.acquire('a@example.com', None)
+        patched_time.return_value = 1061
+        self.throttle.acquire('a@example.com', None)
+
+    @patch('user.throttling.time.time')
+    def test_negative_cache_expires(self, patched_time):
+        """Test a failed pair is remembered only for the negative TTL."""
+        patched_time.return_value = 1000
+        self.throttle.record_failure('a@example.com', 'bad')
+        self.assertTrue(self.throttle.is_known_failure('a@example.com', 'bad'))
+        self.assertFalse(self.throttle.is_known_failure('a@example.com', 'ok'))
+        patched_time.return_value = 1011
+        self.assertFalse(self.throttle.is_known_failure('a@example.com', 'bad'))
+
+    def test_forget(self):
+        """Test forgetting an email clears its failed pairs."""
+        self.throttle.record_failure('a@example.com', 'bad')
+        self.throttle.forget('a@example.com')
+        self.assertFalse(self.throttle.is_known_failure('a@example.com', 'bad'))
+
+    @override_settings(LOGIN_THROTTLE={'REDIS_URL': 'redis://cache:6379/1'})
+    def test_redis_store(self):
+        """Test a Redis URL selects a redis client as the store."""
+        client = LocalMemoryStore()
+        redis = types.SimpleNamespace(
+            Redis=types.SimpleNamespace(from_url=lambda url: client),
+        )
+        with patch.dict(sys.modules, {'redis': redis}):
+            self.assertIs(create_store(), client)
+
+
+class ClientIPTests(SimpleTestCase):
+    """Test picking the client address the IP limit applies to."""
+
+    def setUp(self):
+        self.request = RequestFactory().post(
+            '/', REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2, 3.3.3.3',
+        )
+
+    def test_remote_addr_by_default(self):
+        """Test forwarded headers are ignored unless configured."""
+        self.assertEqual(client_ip(self.request), '10.0.0.1')
+
+    @override_settings(LOGIN_THROTTLE={
+        'CLIENT_IP_HEADER': 'HTTP_X_FORWARDED_FOR',
+        'TRUSTED_PROXIES': 2,
+    })
+    def test_trusted_proxy_header(self):
+        """Test the entry added by the outermost trusted proxy is used."""
+        self.assertEqual(client_ip(self.request), '2.2.2.2')
+
+    @override_settings(LOGIN_THROTTLE={
+        'CLIENT_IP_HEADER': 'HTTP_X_FORWARDED_FOR',
+        'TRUSTED_PROXIES': 1,
+    })
+    def test_missing_header_falls_back(self):
+        """Test a request that bypassed the proxies uses REMOTE_ADDR."""
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+
+
+class LoginThrottleAPITests(TestCase):
+    """Test throttling through the token endpoint."""
+
+    def setUp(self):
+        get_login_throttle().store.flushdb()
+        metrics.registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+
+    def test_throttled_after_failures(self):
+        """Test the endpoint returns 429 once the email limit is hit."""
+        limit = get_login_throttle().email_limit
+        for i in range(limit):
+            res = self.client.post(TOKEN_URL, {
+                'email': 'test@example.com',
+                'password': f'wrong{i}',
+            })
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+        })
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(
+            metrics.registry.get(
+                'login_rejections_total', reason='email_limit',
+            ),
+            1,
+        )
+
+    def test_repeated_failure_skips_authenticate(self):
+        """Test a repeated bad pair is rejected before authenticate()."""
+        payload = {'email': 'test@example.com', 'password': 'wrong'}
+        self.client.post(TOKEN_URL, payload)
+
+        with patch('user.serializers.authenticate') as patched_authenticate:
+            res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        patched_authenticate.assert_not_called()
+        self.assertEqual(
+            metrics.registry.get(
+                'login_rejections_total', reason='negative_cache',
+            ),
+            1,
+        )
+
+    def test_password_change_clears_negative_cache(self):
+        """Test a pair that failed works once it becomes the password."""
+        payload = {'email': 'test@example.com', 'password': 'newpass123'}
+        self.client.post(TOKEN_URL, payload)
+        self.user.set_password('newpass123')
+        self.user.save()
+
+        res = self.client.post(TOKEN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
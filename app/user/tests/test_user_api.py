@@ -9,6 +9,8 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from user.throttling import get_login_throttle
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
@@ -24,6 +26,7 @@ class PublicUserApiTests(TestCase):
 
     def setUp(self):
         self.client = APIClient()
+        get_login_throttle().store.flushdb()
 
     def test_create_user_success(self):
         """Test creating a user is successful"""
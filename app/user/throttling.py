@@ -0,0 +1,286 @@
+"""
+Login throttling and negative-result caching.
+
+Login attempts are counted in sliding windows per email and per client
+IP, and the exact failed (email, password) pair is remembered for a short
+time. Both checks run before `authenticate()`, so repeated bad attempts
+are turned away without paying the password hash cost.
+
+State lives in a store exposing the subset of the Redis sorted-set API
+used below, including MULTI/EXEC pipelines. `LocalMemoryStore` implements
+it in process; pointing `LOGIN_THROTTLE['REDIS_URL']` at a Redis server
+shares it between processes.
+"""
+import hashlib
+import hmac
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+
+from core import metrics
+
+
+class LocalMemoryPipeline:
+    """Queue store commands and run them under its lock, like MULTI/EXEC."""
+
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._store, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        with self._store._lock:
+            results = [
+                method(*args, **kwargs)
+                for method, args, kwargs in self._commands
+            ]
+        self._commands = []
+        return results
+
+
+class LocalMemoryStore:
+    """In-process stand-in for the Redis sorted-set commands used here."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sets = {}
+        self._expires = {}
+
+    def _get(self, key):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._sets.pop(key, None)
+            self._expires.pop(key, None)
+        return self._sets.get(key)
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            members = self._get(key)
+            if members is None:
+                members = self._sets[key] = {}
+            added = len(set(mapping) - set(members))
+            members.update(mapping)
+            return added
+
+    def zrem(self, key, *members):
+        with self._lock:
+            current = self._get(key) or {}
+            removed = 0
+            for member in members:
+                removed += current.pop(member, None) is not None
+            return removed
+
+    def zremrangebyscore(self, key, min_score, max_score):
+        with self._lock:
+            members = self._get(key) or {}
+            stale = [
+                member for member, score in members.items()
+                if min_score <= score <= max_score
+            ]
+            for member in stale:
+                del members[member]
+            return len(stale)
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._get(key) or {})
+
+    def zscore(self, key, member):
+        with self._lock:
+            return (self._get(key) or {}).get(member)
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if self._get(key) is None:
+                return False
+            self._expires[key] = time.time() + seconds
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                deleted += self._sets.pop(key, None) is not None
+                self._expires.pop(key, None)
+            return deleted
+
+    def pipeline(self):
+        return LocalMemoryPipeline(self)
+
+    def flushdb(self):
+        with self._lock:
+            self._sets.clear()
+            self._expires.clear()
+
+
+class LoginThrottle:
+    """Sliding-window login limits plus a negative-result cache."""
+
+    def __init__(self, store, email_limit, ip_limit, window, negative_ttl):
+        self.store = store
+        self.email_limit = email_limit
+        self.ip_limit = ip_limit
+        self.window = window
+        self.negative_ttl = negative_ttl
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+    def _email_key(self, email):
+        return f'login:email:{self._digest(email.lower())}'
+
+    def _ip_key(self, ip):
+        return f'login:ip:{self._digest(ip)}'
+
+    def _negative_key(self, email):
+        return f'login:negative:{self._digest(email.lower())}'
+
+    @staticmethod
+    def _credentials_digest(email, password):
+        return hmac.new(
+            settings.SECRET_KEY.encode(),
+            f'{email.lower()}\0{password}'.encode(),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def _windows(self, email, ip):
+        windows = [(self._email_key(email), self.email_limit, 'email_limit')]
+        if ip and self.ip_limit:
+            windows.append((self._ip_key(ip), self.ip_limit, 'ip_limit'))
+        return windows
+
+    def _reject(self, reason, wait=None):
+        metrics.increment('login_rejections_total', reason=reason)
+        raise Throttled(wait=wait)
+
+    def is_known_failure(self, email, password):
+        """Return whether this exact pair failed within the negative TTL."""
+        expires_at = self.store.zscore(
+            self._negative_key(email),
+            self._credentials_digest(email, password),
+        )
+        if expires_at is None or expires_at <= time.time():
+            return False
+        metrics.increment('login_rejections_total', reason='negative_cache')
+        return True
+
+    def acquire(self, email, ip):
+        """
+        Count an attempt against the email and IP limits.
+
+        The attempt is added and each window counted in one MULTI/EXEC,
+        so concurrent attempts see each other and at most the limit get
+        through. Raises Throttled, taking the attempt back, when a window
+        is over its limit. Returns the attempt id for `release` and
+        `record_success`; a failed attempt simply stays counted.
+        """
+        now = time.time()
+        ttl = math.ceil(self.window)
+        attempt = uuid.uuid4().hex
+        windows = self._windows(email, ip)
+        pipeline = self.store.pipeline()
+        for key, _limit, _reason in windows:
+            pipeline.zremrangebyscore(key, 0, now - self.window)
+            pipeline.zadd(key, {attempt: now})
+            pipeline.zcard(key)
+            pipeline.expire(key, ttl)
+        counts = pipeline.execute()[2::4]
+        for (_key, limit, reason), count in zip(windows, counts):
+            if count > limit:
+                self.release(email, ip, attempt)
+                self._reject(reason, self.window)
+        return attempt
+
+    def release(self, email, ip, attempt):
+        """Stop counting an attempt."""
+        pipeline = self.store.pipeline()
+        for key, _limit, _reason in self._windows(email, ip):
+            pipeline.zrem(key, attempt)
+        pipeline.execute()
+
+    def record_failure(self, email, password):
+        """Remember a failed pair; its attempt stays counted."""
+        now = time.time()
+        negative_key = self._negative_key(email)
+        self.store.zremrangebyscore(negative_key, 0, now)
+        self.store.zadd(negative_key, {
+            self._credentials_digest(email, password): now + self.negative_ttl,
+        })
+        self.store.expire(negative_key, math.ceil(self.negative_ttl))
+        metrics.increment('login_failures_total')
+
+    def record_success(self, email, ip, attempt):
+        """Clear the window of an email after a good login."""
+        self.release(email, ip, attempt)
+        self.store.delete(self._email_key(email))
+
+    def forget(self, email):
+        """Drop remembered failures, e.g. after the password changed."""
+        self.store.delete(self._negative_key(email))
+
+
+def client_ip(request):
+    """
+    Return the IP address the login throttle counts a request under.
+
+    By default this is REMOTE_ADDR. Behind proxies that is the proxy, so
+    `LOGIN_THROTTLE['CLIENT_IP_HEADER']` names the META key the proxies
+    append the client address to (e.g. HTTP_X_FORWARDED_FOR) and
+    TRUSTED_PROXIES how many of them append to it: the entry the
+    outermost trusted proxy added is used, since earlier ones can be
+    forged by the client.
+    """
+    config = settings.LOGIN_THROTTLE
+    header = config.get('CLIENT_IP_HEADER')
+    if header:
+        addresses = [
+            address.strip()
+            for address in request.META.get(header, '').split(',')
+            if address.strip()
+        ]
+        proxies = config.get('TRUSTED_PROXIES', 1)
+        if len(addresses) >= proxies:
+            return addresses[-proxies]
+    return request.META.get('REMOTE_ADDR')
+
+
+def create_store():
+    """Return the store configured by `LOGIN_THROTTLE['REDIS_URL']`."""
+    redis_url = settings.LOGIN_THROTTLE.get('REDIS_URL')
+    if redis_url:
+        import redis
+        return redis.Redis.from_url(redis_url)
+    return LocalMemoryStore()
+
+
+_login_throttle = None
+_login_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    """Return the process-wide login throttle configured from settings."""
+    global _login_throttle
+    if _login_throttle is None:
+        with _login_throttle_lock:
+            if _login_throttle is None:
+                config = settings.LOGIN_THROTTLE
+                _login_throttle = LoginThrottle(
+                    store=create_store(),
+                    email_limit=config['EMAIL_LIMIT'],
+                    ip_limit=config['IP_LIMIT'],
+                    window=config['WINDOW'],
+                    negative_ttl=config['NEGATIVE_TTL'],
+                )
+    return _login_throttle
@@ -4,7 +4,7 @@ URL routing for users API.
 
 from django.urls import path
 
-from user import views
+from user import async_views, views
 
 app_name = 'user'
 
@@ -14,5 +14,6 @@ urlpatterns for the user API.
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('me/', views.ManageUserView.as_view(), name='me')
+    path('me/', views.ManageUserView.as_view(), name='me'),
+    path('me/async/', async_views.me, name='me-async'),
 ]